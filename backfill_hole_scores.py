@@ -5,15 +5,26 @@ Scrapes Tag Heuer scorecard URLs to extract hole-by-hole scores and stores
 them permanently in each player's round data. This means future Lambda
 invocations won't need to re-scrape for best/worst hole stats.
 
+Rounds are processed by a small worker pool that shares a token bucket, so
+Tag Heuer sees at most REQUESTS_PER_SECOND. Writes are partial UpdateItems
+that touch only players[i].hole_scores. Finished rounds go to a checkpoint
+file, so an interrupted --apply run picks up where it stopped.
+
 Usage:
     python backfill_hole_scores.py          # Dry run (preview changes)
     python backfill_hole_scores.py --apply  # Apply changes to DynamoDB
 """
 import boto3
+import json
+import os
 import requests
+import time
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 from load_credentials import load_credentials
+from rate_limit import TokenBucket
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, query_rounds
 import re
 import sys
 import urllib3
@@ -22,7 +33,15 @@ urllib3.disable_warnings()
 load_credentials()
 
 dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
-table = dynamodb.Table('golf-rounds')
+table = dynamodb.Table(TABLE_NAME)
+
+WORKERS = 4
+# Requests per second towards Tag Heuer, shared by all workers
+REQUESTS_PER_SECOND = 2
+# (connect, read) timeouts and retries for a scorecard fetch
+FETCH_TIMEOUT = (5, 15)
+FETCH_RETRIES = 2
+CHECKPOINT_FILE = 'backfill_hole_scores_checkpoint.json'
 
 NAME_MAP = {
     'Andy J.': 'Andy Jakes',
@@ -35,10 +54,9 @@ NAME_MAP = {
 }
 
 
-def scrape_hole_scores(url):
-    """Scrape Tag Heuer scorecard for all players' hole-by-hole scores."""
-    response = requests.get(url, timeout=15, verify=False)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_hole_scores(html):
+    """Parse a Tag Heuer scorecard page for all players' hole-by-hole scores."""
+    soup = BeautifulSoup(html, 'html.parser')
     
     players = {}
     player_sections = soup.find_all(string=re.compile(r'\(Index \d+\.\d+\)'))
@@ -83,6 +101,96 @@ def scrape_hole_scores(url):
     return players
 
 
+_session = requests.Session()
+_session.verify = False
+_bucket = TokenBucket(REQUESTS_PER_SECOND)
+
+
+def scrape_hole_scores(url):
+    """Fetch (rate limited, retrying timeouts and 5xx with backoff) and parse a scorecard"""
+    for attempt in range(FETCH_RETRIES + 1):
+        _bucket.acquire()
+        try:
+            response = _session.get(url, timeout=FETCH_TIMEOUT)
+            if response.status_code < 500:
+                response.raise_for_status()
+                return parse_hole_scores(response.text)
+            error = requests.HTTPError(f"HTTP {response.status_code}")
+        except (requests.Timeout, requests.ConnectionError) as e:
+            error = e
+        if attempt < FETCH_RETRIES:
+            time.sleep(2 ** attempt)
+    raise error
+
+
+def load_checkpoint():
+    if os.path.exists(CHECKPOINT_FILE):
+        with open(CHECKPOINT_FILE) as f:
+            return json.load(f)
+    return {'done': []}
+
+
+def save_checkpoint(checkpoint):
+    tmp = CHECKPOINT_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, CHECKPOINT_FILE)
+
+
+def write_hole_scores(round_data, updates):
+    """
+    Partial update: SET players[i].hole_scores for the matched players only.
+    The condition checks each index still holds the same player.
+    """
+    sets, conditions = [], []
+    values = {}
+    for i, scores in updates.items():
+        sets.append(f"players[{i}].hole_scores = :h{i}")
+        conditions.append(f"players[{i}].#name = :n{i}")
+        values[f":h{i}"] = [Decimal(str(s)) for s in scores]
+        values[f":n{i}"] = round_data['players'][i]['name']
+    table.update_item(
+        Key={'group_id': DEFAULT_GROUP_ID, 'round_key': round_data['round_key']},
+        UpdateExpression='SET ' + ', '.join(sets),
+        ConditionExpression=' AND '.join(conditions),
+        ExpressionAttributeNames={'#name': 'name'},
+        ExpressionAttributeValues=values,
+    )
+
+
+def process_round(round_data, apply):
+    """Scrape, match and (with apply) write one round. Returns (status, message)"""
+    date = round_data['date']
+    try:
+        scraped = scrape_hole_scores(round_data['scorecard_url'])
+    except Exception as e:
+        return 'failed', f"❌ {date} - error: {e}"
+    if not scraped:
+        return 'failed', f"❌ {date} - scrape returned no data"
+    
+    # Determine which 9 this round is
+    is_back9 = round_data['course'] == 'back9' or '-back9' in date
+    nine = 'back9' if is_back9 else 'front9'
+    
+    # Match scraped scores to players in the round, by position in the players list
+    updates = {}
+    for i, player in enumerate(round_data.get('players', [])):
+        scores = scraped.get(player['name'], {}).get(nine)
+        if scores and len(scores) == 9 and any(s > 0 for s in scores):
+            updates[i] = scores
+    if not updates:
+        return 'failed', f"❌ {date} - no player scores matched"
+    
+    names = ', '.join(round_data['players'][i]['name'] for i in updates)
+    if not apply:
+        return 'updated', f"🔍 {date} - would save {len(updates)} players (dry run): {names}"
+    try:
+        write_hole_scores(round_data, updates)
+    except Exception as e:
+        return 'failed', f"❌ {date} - write failed: {e}"
+    return 'updated', f"💾 {date} - saved {len(updates)} players: {names}"
+
+
 def main():
     apply = '--apply' in sys.argv
     
@@ -91,82 +199,56 @@ def main():
     print(f"Mode: {'APPLY (writing to DynamoDB)' if apply else 'DRY RUN (preview only)'}")
     print("=" * 70)
     
-    # Get all rounds
-    response = table.scan()
-    all_rounds = sorted(response['Items'], key=lambda x: x['date'])
-    
-    total = 0
-    already_has = 0
-    no_url = 0
-    updated = 0
-    failed = 0
+    # Get all rounds for the group
+    all_rounds = query_rounds(table, DEFAULT_GROUP_ID)
+    checkpoint = load_checkpoint() if apply else {'done': []}
+    done = set(checkpoint['done'])
     
+    counts = {'already_has': 0, 'no_url': 0, 'resumed': 0, 'updated': 0, 'failed': 0}
+    todo = []
     for round_data in all_rounds:
-        total += 1
-        date = round_data['date']
-        url = round_data.get('scorecard_url')
-        
-        # Check if any player already has hole_scores
-        has_scores = any(p.get('hole_scores') for p in round_data.get('players', []))
-        if has_scores:
-            already_has += 1
-            print(f"  ✅ {date} - already has hole_scores")
-            continue
-        
-        if not url:
-            no_url += 1
-            print(f"  ⚠️  {date} - no scorecard URL")
-            continue
-        
-        # Scrape hole scores
-        try:
-            scraped = scrape_hole_scores(url)
-            if not scraped:
-                failed += 1
-                print(f"  ❌ {date} - scrape returned no data")
-                continue
-            
-            # Determine which 9 this round is
-            is_back9 = round_data['course'] == 'back9' or '-back9' in date
-            nine = 'back9' if is_back9 else 'front9'
-            
-            # Match scraped scores to players in the round
-            players = round_data.get('players', [])
-            matched = 0
-            for player in players:
-                name = player['name']
-                if name in scraped and nine in scraped[name]:
-                    scores = scraped[name][nine]
-                    if len(scores) == 9 and any(s > 0 for s in scores):
-                        player['hole_scores'] = [Decimal(str(s)) for s in scores]
-                        matched += 1
-                        print(f"  📝 {date} - {name}: {scores}")
+        if round_data['round_key'] in done:
+            counts['resumed'] += 1
+        elif any(p.get('hole_scores') for p in round_data.get('players', [])):
+            counts['already_has'] += 1
+        elif not round_data.get('scorecard_url'):
+            counts['no_url'] += 1
+            print(f"  ⚠️  {round_data['date']} - no scorecard URL")
+        else:
+            todo.append(round_data)
+    
+    print(f"Rounds: {len(all_rounds)} total, {counts['already_has']} already have hole_scores, "
+          f"{counts['resumed']} done in an earlier run, {len(todo)} to scrape")
+    
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        futures = {pool.submit(process_round, round_data, apply): round_data for round_data in todo}
+        for n, future in enumerate(as_completed(futures), 1):
+            status, message = future.result()
+            counts[status] += 1
+            if apply and status == 'updated':
+                checkpoint['done'].append(futures[future]['round_key'])
+                save_checkpoint(checkpoint)
             
-            if matched > 0:
-                if apply:
-                    table.put_item(Item=round_data)
-                    print(f"  💾 {date} - saved {matched} players")
-                else:
-                    print(f"  🔍 {date} - would save {matched} players (dry run)")
-                updated += 1
-            else:
-                failed += 1
-                print(f"  ❌ {date} - no player scores matched")
-        
-        except Exception as e:
-            failed += 1
-            print(f"  ❌ {date} - error: {e}")
+            elapsed = time.time() - started
+            rate = n / elapsed if elapsed else 0
+            eta = (len(todo) - n) / rate if rate else 0
+            print(f"  [{n}/{len(todo)}] {rate:.1f} rounds/s, ETA {int(eta // 60)}:{int(eta % 60):02d}  {message}")
+    
+    if apply and not counts['failed'] and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)  # finished cleanly - nothing to resume
     
     print(f"\n{'=' * 70}")
     print(f"SUMMARY")
     print(f"{'=' * 70}")
-    print(f"Total rounds:           {total}")
-    print(f"Already had hole_scores: {already_has}")
-    print(f"No scorecard URL:       {no_url}")
-    print(f"Updated:                {updated}")
-    print(f"Failed:                 {failed}")
+    print(f"Total rounds:           {len(all_rounds)}")
+    print(f"Already had hole_scores: {counts['already_has'] + counts['resumed']}")
+    print(f"No scorecard URL:       {counts['no_url']}")
+    print(f"Updated:                {counts['updated']}")
+    print(f"Failed:                 {counts['failed']}")
+    print(f"Elapsed:                {time.time() - started:.1f}s")
     
-    if not apply and updated > 0:
+    if not apply and counts['updated'] > 0:
         print(f"\n⚠️  Run with --apply to write changes to DynamoDB:")
         print(f"    python backfill_hole_scores.py --apply")
 
@@ -0,0 +1,102 @@
+"""
+Excel Import Benchmark
+Bulk-loads synthetic rounds into a fresh workbook three ways:
+- add_round per round (one save per round - only a sample, it is O(N²))
+- add_rounds (one save for the whole batch)
+- export_rounds (write-only streaming rebuild)
+
+Usage:
+    python benchmarks/bench_excel_import.py                 # 10,000 rows
+    python benchmarks/bench_excel_import.py --rows 2000 --sample-rounds 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from excel_handler import ExcelHandler
+
+PLAYERS = ['Andy Jakes', 'Fletcher Jakes', 'Bruce Kennaway', 'Steve', 'Hamish McNee', 'Pete Ackroyd']
+
+
+def synthetic_rounds(num_rows, players_per_round=4, seed=42):
+    """Rounds as (round_date, course_name, player_results, weather_data) until num_rows rows"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 4)
+    rounds = []
+    rows = 0
+    week = 0
+    while rows < num_rows:
+        field = rng.sample(PLAYERS, min(players_per_round, num_rows - rows))
+        results = []
+        for name in field:
+            gross = rng.randint(40, 60)
+            playing_hc = rng.randint(5, 25)
+            results.append({
+                'name': name,
+                'gross_score': gross,
+                'stableford_points': rng.randint(8, 24),
+                'par': 35,
+                'score_to_par': gross - 35,
+                'playing_handicap': playing_hc,
+                'net_score': gross - playing_hc,
+                'score_differential': round(rng.uniform(5, 30), 1),
+                'weather_factor': 1.0,
+                'current_handicap_index': round(rng.uniform(5, 30), 1),
+            })
+        weather = {'description': 'partly cloudy', 'temperature': rng.uniform(12, 30), 'wind_speed': rng.uniform(0, 30)}
+        rounds.append((start + timedelta(weeks=week), 'Warringah Golf Club', results, weather))
+        rows += len(results)
+        week += 1
+    return rounds
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<42} {elapsed:8.2f}s")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk Excel import')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--sample-rounds', type=int, default=100,
+                        help='Rounds to time with per-round add_round (extrapolated)')
+    args = parser.parse_args()
+
+    rounds = synthetic_rounds(args.rows)
+    total_rows = sum(len(r[2]) for r in rounds)
+    print(f"Synthetic history: {len(rounds)} rounds, {total_rows} rows\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Per-round saves on a sample; each save rewrites the whole file
+        handler = ExcelHandler(os.path.join(tmp, 'per_round.xlsx'))
+        sample = rounds[:args.sample_rounds]
+        elapsed, _ = timed(f"add_round x {len(sample)} (sample)", lambda: [handler.add_round(*r) for r in sample])
+        # Save cost grows with file size, so linear extrapolation understates the full run
+        print(f"  {'  -> extrapolated to all rounds (>=)':<42} {elapsed * len(rounds) / max(len(sample), 1):8.2f}s")
+
+        handler = ExcelHandler(os.path.join(tmp, 'batched.xlsx'))
+        timed(f"add_rounds ({total_rows} rows, one save)", lambda: handler.add_rounds(rounds))
+
+        handler = ExcelHandler(os.path.join(tmp, 'export.xlsx'))
+        _, written = timed(f"export_rounds write-only ({total_rows} rows)", lambda: handler.export_rounds(rounds))
+
+        # Query side on the rebuilt workbook
+        timed("get_latest_handicaps (read-only + index)", handler.get_latest_handicaps)
+        timed("get_player_history x players (cached index)",
+              lambda: [handler.get_player_history(p) for p in PLAYERS])
+        handler.close()
+
+        assert written == total_rows
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Handicap Index Benchmark
+Times golf_system.calculate_handicap_indices (vectorized timeline) against
+the per-player loop it replaced, at 100 / 1k / 10k players, and checks
+every player's index against HandicapCalculator.update_handicap_index.
+
+Usage:
+    python benchmarks/bench_handicap_indices.py
+    python benchmarks/bench_handicap_indices.py --players 100 1000 --rounds 30
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from golf_system import COURSE_CONFIGS, calculate_handicap_indices
+from handicap import HandicapCalculator
+
+
+def synthetic_frame(num_players, rounds_per_player, seed=7):
+    """process_rounds-shaped frame: weekly rounds, each player plays ~70% of them"""
+    rng = np.random.default_rng(seed)
+    num_weeks = int(rounds_per_player / 0.7) + 1
+    dates = pd.date_range('2022-01-01', periods=num_weeks, freq='7D').strftime('%Y-%m-%d')
+
+    players = np.repeat([f"Player {i:05d}" for i in range(num_players)], num_weeks)
+    week_dates = np.tile(dates, num_players)
+    played = rng.random(len(players)) < 0.7
+
+    n = int(played.sum())
+    config = COURSE_CONFIGS['front9']
+    return pd.DataFrame({
+        'Date': week_dates[played],
+        'Player': players[played],
+        'Gross': rng.integers(38, 62, n),
+        'Par': config['par'],
+        'Slope': config['slope'],
+        'Rating': config['rating'],
+    })
+
+
+def legacy_indices(df):
+    """The previous implementation: filter per player, iterrows per round"""
+    hc_calc = HandicapCalculator()
+    player_indices = {}
+    for player_name in df['Player'].unique():
+        player_df = df[df['Player'] == player_name].sort_values('Date')
+        differentials = []
+        for _, row in player_df.iterrows():
+            differential = (row['Gross'] * 2 - row['Rating'] * 2) * (113 / row['Slope'])
+            differentials.append(round(differential, 1))
+        player_indices[player_name] = hc_calc.update_handicap_index(0, differentials)
+    return player_indices
+
+
+def reference_indices(df):
+    """Same WHS maths as the legacy loop, grouped once (fast enough to check 10k players)"""
+    hc_calc = HandicapCalculator()
+    player_indices = {}
+    ordered = df.sort_values(['Player', 'Date'], kind='mergesort')
+    for player_name, player_df in ordered.groupby('Player', sort=False):
+        differentials = [
+            round((gross * 2 - rating * 2) * (113 / slope), 1)
+            for gross, rating, slope in zip(player_df['Gross'], player_df['Rating'], player_df['Slope'])
+        ]
+        player_indices[player_name] = hc_calc.update_handicap_index(0, differentials)
+    return player_indices
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark handicap index calculation')
+    parser.add_argument('--players', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--rounds', type=int, default=40, help='Average rounds per player')
+    parser.add_argument('--legacy-max', type=int, default=1000,
+                        help='Largest player count to time the legacy loop at (it is O(players x rows))')
+    args = parser.parse_args()
+
+    print(f"{'Players':>8} {'Rows':>9} {'Vectorized':>11} {'Legacy':>9} {'Speedup':>8}  Check")
+    for num_players in args.players:
+        df = synthetic_frame(num_players, args.rounds)
+        fast_time, fast = timed(calculate_handicap_indices, df)
+
+        if num_players <= args.legacy_max:
+            legacy_time, expected = timed(legacy_indices, df)
+            legacy_col = f"{legacy_time:8.2f}s"
+            speedup = f"{legacy_time / fast_time:7.0f}x"
+        else:
+            expected = reference_indices(df)
+            legacy_col, speedup = f"{'-':>9}", f"{'-':>8}"
+
+        mismatches = [p for p in expected if fast[p] != expected[p]]
+        check = 'ok' if not mismatches and fast.keys() == expected.keys() else f"{len(mismatches)} MISMATCHES"
+        print(f"{num_players:>8} {len(df):>9} {fast_time:10.3f}s {legacy_col} {speedup}  {check}")
+
+
+if __name__ == '__main__':
+    main()
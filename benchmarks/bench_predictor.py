@@ -0,0 +1,76 @@
+"""
+Next-Round Predictor Benchmark
+Times predictor.predict_next_round on a synthetic hole-by-hole history and
+checks it stays inside the Lambda budget (200 ms) for the summary.
+
+Usage:
+    python benchmarks/bench_predictor.py
+    python benchmarks/bench_predictor.py --players 12 --simulations 50000 --repeat 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from course_registry import get_nine
+from predictor import predict_next_round, prediction_text
+from rounds_table import make_round_key
+
+BUDGET_MS = 200
+
+
+def synthetic_rounds(num_players, weeks, field_size=5, seed=7):
+    """Weekly back 9 rounds with hole scores; each player has their own scoring level"""
+    rng = random.Random(seed)
+    nine = get_nine('back9')
+    players = {f"Player {i:02d}": rng.uniform(0.3, 1.8) for i in range(num_players)}
+    start = date(2025, 1, 4)
+    rounds = []
+    for week in range(weeks):
+        day = (start + timedelta(weeks=week)).isoformat()
+        field = rng.sample(sorted(players), min(field_size, num_players))
+        rows = []
+        for name in field:
+            level = players[name]
+            hole_scores = [max(1, par + round(rng.gauss(level, 1.0))) for par in nine['pars']]
+            rows.append({'name': name, 'index': 15.0, 'gross': sum(hole_scores),
+                         'stableford': 18, 'hole_scores': hole_scores})
+        rounds.append({'round_key': make_round_key(day, 'back9'), 'date': day,
+                       'course': 'back9', 'players': rows})
+    return rounds, {name: round(level * 9, 1) for name, level in players.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=6)
+    parser.add_argument('--weeks', type=int, default=104)
+    parser.add_argument('--simulations', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rounds, indices = synthetic_rounds(args.players, args.weeks)
+    predict_next_round(rounds, indices, simulations=args.simulations, seed=1)  # warm-up
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        predictions = predict_next_round(rounds, indices, simulations=args.simulations, seed=1)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    best = min(timings)
+    print(f"{args.players} players, {len(rounds)} rounds, {args.simulations:,} simulations")
+    print(f"predict_next_round: best {best:.1f} ms, mean {sum(timings) / len(timings):.1f} ms "
+          f"(budget {BUDGET_MS} ms)")
+    print(prediction_text(predictions, args.simulations))
+    total_win = sum(odds['win'] for odds in predictions.values())
+    print(f"win probabilities sum to {total_win:.4f}")
+    if best > BUDGET_MS:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
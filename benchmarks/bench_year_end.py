@@ -0,0 +1,137 @@
+"""
+Year-End Engine Benchmark
+Times year_end_engine.compute_seasons (one pass, all seasons) against the
+per-season aggregation loop the CLI and Lambda used to run, on synthetic
+histories, and checks both produce the same standings.
+
+Usage:
+    python benchmarks/bench_year_end.py
+    python benchmarks/bench_year_end.py --seasons 20 --players 40 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from course_registry import real_nine_label
+from rounds_table import make_round_key
+from year_end_engine import compute_seasons, parse_date, render_report
+
+
+def synthetic_rounds(num_seasons, num_players, field_size=6, seed=11):
+    """Weekly rounds with a random field; some weeks play both nines"""
+    rng = random.Random(seed)
+    players = [f"Player {i:03d}" for i in range(num_players)]
+    start = date(2026 - num_seasons, 1, 3)
+    rounds = []
+    for week in range(num_seasons * 52):
+        day = (start + timedelta(weeks=week)).isoformat()
+        for course in (['back9'] if rng.random() < 0.8 else ['front9', 'back9']):
+            field = rng.sample(players, min(field_size, num_players))
+            rounds.append({
+                'round_key': make_round_key(day, course),
+                'date': day,
+                'course': course,
+                'players': [{'name': name, 'stableford': rng.randint(8, 26)} for name in field],
+            })
+    return rounds
+
+
+def legacy_season_stats(rounds_year):
+    """The per-season aggregation previously duplicated in the CLI and Lambda"""
+    player_stats = defaultdict(lambda: {
+        'rounds': [], 'total_points': 0, 'best_score': 0, 'worst_score': 100,
+        'monthly_wins': defaultdict(int), 'front9_points': [], 'back9_points': [],
+        'winning_rounds': 0, 'podium_finishes': 0
+    })
+    for round_data in rounds_year:
+        round_date = parse_date(round_data['date'])
+        month = round_date.strftime('%B')
+        is_back9 = (real_nine_label(round_data.get('course', 'back9')) == 'back9' or '-back9' in round_data['date'])
+        round_players = sorted(round_data['players'], key=lambda x: int(x['stableford']), reverse=True)
+        for rank, player in enumerate(round_players, 1):
+            stats = player_stats[player['name']]
+            points = int(player['stableford'])
+            stats['rounds'].append({'date': round_date, 'points': points, 'month': month})
+            stats['total_points'] += points
+            stats['best_score'] = max(stats['best_score'], points)
+            stats['worst_score'] = min(stats['worst_score'], points)
+            (stats['back9_points'] if is_back9 else stats['front9_points']).append(points)
+            if rank == 1:
+                stats['winning_rounds'] += 1
+                stats['monthly_wins'][month] += 1
+            if rank <= 3:
+                stats['podium_finishes'] += 1
+
+    for stats in player_stats.values():
+        n = len(stats['rounds'])
+        stats['avg'] = stats['total_points'] / n
+        stats['rounds_count'] = n
+        stats['std_dev'] = (sum((r['points'] - stats['avg']) ** 2 for r in stats['rounds']) / n) ** 0.5
+        current = best = 0
+        prev = None
+        for r in sorted(stats['rounds'], key=lambda x: x['date']):
+            if prev is None or r['points'] >= prev:
+                current += 1
+                best = max(best, current)
+            else:
+                current = 0
+            prev = r['points']
+        stats['best_improving_streak'] = best
+
+    return sorted(
+        [(name, stats) for name, stats in player_stats.items() if stats['rounds_count'] >= 10],
+        key=lambda x: x[1]['avg'], reverse=True
+    )
+
+
+def legacy_all_seasons(rounds, years):
+    return {year: legacy_season_stats([r for r in rounds if r['date'].startswith(year)]) for year in years}
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the year-end report engine')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--players', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Seasons':>8} {'Rounds':>7} {'Engine':>9} {'Legacy':>9} {'Render':>9}  Check")
+    for num_seasons in args.seasons:
+        rounds = synthetic_rounds(num_seasons, args.players)
+        years = sorted({r['date'][:4] for r in rounds})
+
+        engine_time, seasons = best_of(lambda: compute_seasons(rounds, years), args.repeat)
+        legacy_time, legacy = best_of(lambda: legacy_all_seasons(rounds, years), args.repeat)
+        render_time, _ = best_of(
+            lambda: [render_report(s) for s in seasons.values() if s['standings']], args.repeat)
+
+        mismatched = 0
+        for year in years:
+            expected = [(name, s['avg'], s['winning_rounds'], s['podium_finishes'], s['best_improving_streak'],
+                         round(s['std_dev'], 9)) for name, s in legacy[year]]
+            actual = [(name, s['avg'], s['winning_rounds'], s['podium_finishes'], s['best_improving_streak'],
+                       round(s['std_dev'], 9)) for name, s in seasons[year]['standings']]
+            mismatched += expected != actual
+
+        check = 'ok' if not mismatched else f"{mismatched} seasons differ"
+        print(f"{num_seasons:>8} {len(rounds):>7} {engine_time * 1000:7.1f}ms {legacy_time * 1000:7.1f}ms "
+              f"{render_time * 1000:7.1f}ms  {check}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+pytest-benchmark suite for the handicap, Stableford, parsing and summary hot paths
+
+The perf_*.py modules time the code the Lambda runs on every request. Each
+run can be saved as a baseline JSON, and a later run compared against it
+fails once any benchmark's best (min) time regresses by more than
+REGRESSION_THRESHOLD (25% by default; loosen it with the
+BENCH_REGRESSION_THRESHOLD environment variable on a noisy machine). Benchmarks time batches of work (tens of microseconds
+or more), never a single sub-microsecond call, so the gate measures code
+rather than timer noise.
+
+Usage (from the repo root):
+    pip install -r benchmarks/requirements-bench.txt
+    pytest benchmarks --benchmark-save=baseline     # record benchmarks/baselines/<machine>/NNNN_baseline.json
+    pytest benchmarks --benchmark-compare           # compare with the latest baseline, fail on a >25% regression
+    BENCH_REGRESSION_THRESHOLD=min:100% pytest benchmarks --benchmark-compare    # noisy shared CI runner
+"""
+import copy
+import os
+import sys
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-southeast-2')
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+DEFAULT_STORAGE = 'file://./.benchmarks'
+# Default --benchmark-compare-fail when comparing against a baseline. min is the
+# statistic least affected by GC and scheduler noise. The default is tight enough
+# to catch ordinary 30-70% regressions on a dedicated machine; on a shared 1-vCPU
+# VM the min of unchanged code moved by up to +70% between runs, so such runners
+# set BENCH_REGRESSION_THRESHOLD (e.g. min:100%) to only fail on a doubling.
+REGRESSION_THRESHOLD = os.environ.get('BENCH_REGRESSION_THRESHOLD', 'min:25%')
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Keep baselines next to the suite and fail comparisons on regression unless told otherwise"""
+    if config.getoption('benchmark_storage') == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINE_DIR}"
+    if config.getoption('benchmark_compare') and not config.getoption('benchmark_compare_fail'):
+        config.option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
+
+
+class FixtureResponse:
+    """Enough of requests.Response for parse_tag_heuer_url"""
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture(scope='session')
+def html_fixtures():
+    """Saved Tag Heuer scorecard pages by name (tag_heuer_9_hole, tag_heuer_18_hole)"""
+    pages = {}
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if filename.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+                pages[filename[:-len('.html')]] = f.read()
+    return pages
+
+
+@pytest.fixture(scope='session')
+def lambda_module():
+    """
+    lambda_function with every external call switched off: no weather, no
+    URL shortening, no scorecard scrapes, no OpenAI - only local work is timed
+    """
+    import lambda_function
+
+    patch = pytest.MonkeyPatch()
+    patch.setattr(lambda_function, 'get_weather_for_round', lambda *args, **kwargs: None)
+    patch.setattr(lambda_function, 'shorten_url', lambda url: url)
+    patch.setattr(lambda_function, 'scrape_scorecard_hole_scores', lambda url, timeout=15: {})
+    patch.setattr(lambda_function, 'OPENAI_ENABLED', False)
+    yield lambda_function
+    patch.undo()
+
+
+@pytest.fixture
+def fresh_copy():
+    """Setup for benchmark.pedantic: a deep copy per round for targets that mutate their input"""
+    def setup(*args):
+        return lambda: (copy.deepcopy(args), {})
+    return setup
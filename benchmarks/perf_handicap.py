@@ -0,0 +1,76 @@
+"""
+WHS index and adjusted gross benchmarks (HandicapCalculator)
+
+Each benchmark times a batch (a field's worth of players or cards) rather
+than one sub-microsecond call, so the regression gate isn't timer noise.
+"""
+import random
+
+import pytest
+
+from course_registry import display_course_handicap, get_nine
+from handicap import HandicapCalculator
+
+calc = HandicapCalculator()
+
+# Players / cards per timed batch
+BATCH = 100
+
+
+def differentials(count, seed=3):
+    rng = random.Random(seed)
+    return [round(rng.uniform(5, 35), 1) for _ in range(count)]
+
+
+def player_differentials(count):
+    return [differentials(count, seed) for seed in range(BATCH)]
+
+
+@pytest.mark.parametrize('count', [3, 8, 20, 60])
+def bench_update_handicap_index(benchmark, count):
+    players = player_differentials(count)
+
+    def index_all():
+        return [calc.update_handicap_index(0, diffs) for diffs in players]
+
+    indices = benchmark(index_all)
+    assert all(0 < index < 40 for index in indices)
+
+
+def bench_update_handicap_index_capped(benchmark):
+    players = player_differentials(20)
+    low_indices = [calc.update_handicap_index(0, diffs) - 6 for diffs in players]
+
+    def index_all():
+        return [calc.update_handicap_index(0, diffs, low_handicap_index=low)
+                for diffs, low in zip(players, low_indices)]
+
+    indices = benchmark(index_all)
+    assert all(index <= round(low + 5, 1) for index, low in zip(indices, low_indices))  # hard cap
+
+
+def bench_index_timeline(benchmark):
+    """Index after every round of a 100-round history, as the summary's LHI loop does"""
+    diffs = differentials(100)
+
+    def timeline():
+        return [calc.update_handicap_index(0, diffs[:i + 1]) for i in range(len(diffs))]
+
+    assert len(benchmark(timeline)) == 100
+
+
+@pytest.mark.parametrize('label', ['front9', 'back9'])
+def bench_calculate_adjusted_gross_score(benchmark, label):
+    nine = get_nine(label)
+    rng = random.Random(5)
+    cards = []
+    for _ in range(BATCH):
+        holes = [par + rng.randint(-1, 4) for par in nine['pars']]
+        holes[rng.randrange(9)] = None  # blob
+        cards.append((holes, display_course_handicap(nine, rng.uniform(5, 30))))
+
+    def adjust_all():
+        return [calc.calculate_adjusted_gross_score(holes, nine['pars'], ch, nine['si']) for holes, ch in cards]
+
+    adjusted = benchmark(adjust_all)
+    assert len(adjusted) == BATCH and all(a > 0 for a in adjusted)
@@ -0,0 +1,38 @@
+"""
+parse_tag_heuer_url benchmarks on saved scorecard pages (no network)
+"""
+import contextlib
+import io
+
+import pytest
+
+from conftest import FixtureResponse
+
+URL = 'https://www.tagheuergolf.com/rounds/benchmark'
+
+
+@pytest.fixture
+def parse(lambda_module, html_fixtures, monkeypatch):
+    """parse_tag_heuer_url with the fetch served from a fixture page and its debug output discarded"""
+    def run(page):
+        monkeypatch.setattr(lambda_module.resilience, 'get', lambda url, **kwargs: FixtureResponse(html_fixtures[page]))
+
+        def parse_page():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return lambda_module.parse_tag_heuer_url(URL)
+        return parse_page
+    return run
+
+
+def bench_parse_9_hole_card(benchmark, parse):
+    result = benchmark(parse('tag_heuer_9_hole'))
+    assert result['course'] == 'back9'
+    assert len(result['players']) == 5  # Eddie is excluded
+    assert all(len(p['hole_scores']) == 9 for p in result['players'])
+
+
+def bench_parse_18_hole_card(benchmark, parse):
+    result = benchmark(parse('tag_heuer_18_hole'))
+    front9, back9 = result
+    assert (front9['course'], back9['course']) == ('front9', 'back9')
+    assert len(front9['players']) == 2 and len(back9['players']) == 4
@@ -0,0 +1,47 @@
+"""
+Stroke allocation and per-hole Stableford benchmarks
+
+Batched over the whole course handicap range / a season of cards, so each
+timed call is well above timer resolution.
+"""
+from course_registry import (MAX_COURSE_HANDICAP, allocate_strokes, display_course_handicap, get_nine,
+                             stableford_points, strokes_for)
+
+BACK_9 = get_nine('back9')
+SCORES = [5, 4, 4, 6, 0, 3, 5, 5, 4]
+COURSE_HANDICAPS = range(MAX_COURSE_HANDICAP + 1)
+
+
+def bench_allocate_strokes(benchmark):
+    strokes = benchmark(lambda: [allocate_strokes(ch, BACK_9['si']) for ch in COURSE_HANDICAPS])
+    assert all(sum(s) <= ch for s, ch in zip(strokes, COURSE_HANDICAPS))
+
+
+def bench_strokes_for_lookup(benchmark):
+    """Precomputed stroke table lookup the Lambda uses instead of allocate_strokes"""
+    strokes = benchmark(lambda: [strokes_for(BACK_9, ch) for ch in COURSE_HANDICAPS])
+    assert strokes[18] == tuple(allocate_strokes(18, BACK_9['si']))
+
+
+def bench_calculate_stableford_per_hole(benchmark):
+    strokes = [allocate_strokes(ch, BACK_9['si']) for ch in COURSE_HANDICAPS]
+
+    def score_all():
+        return [stableford_points(SCORES, BACK_9['pars'], s) for s in strokes]
+
+    points = benchmark(score_all)
+    assert all(p[4] == 0 and len(p) == 9 for p in points)
+
+
+def bench_stableford_field(benchmark):
+    """A 5-player field over 20 rounds: CH -> strokes -> points, as the summary scores hole stats"""
+    cards = [(SCORES, 10.0 + player * 3.5) for player in range(5)] * 20
+
+    def score_all():
+        return [
+            sum(stableford_points(
+                scores, BACK_9['pars'], strokes_for(BACK_9, display_course_handicap(BACK_9, index))))
+            for scores, index in cards
+        ]
+
+    assert len(benchmark(score_all)) == 100
@@ -0,0 +1,47 @@
+"""
+generate_whatsapp_summary benchmarks at several history sizes (synthetic_history)
+"""
+import contextlib
+import io
+
+import pytest
+
+from synthetic_history import LocalTable, generate_history
+
+# (players, seasons): today's group, a long-running group, and 10x / 100x the players
+HISTORY_SIZES = [(5, 1), (5, 3), (5, 10), (50, 3), (500, 1)]
+# Timed rounds per size: about a second or two each, so the min isn't one unlucky window
+SUMMARY_ROUNDS = {(5, 1): 40, (5, 3): 30, (5, 10): 20, (50, 3): 8, (500, 1): 3}
+
+
+@pytest.fixture(scope='module')
+def histories(lambda_module):
+    """Rounds as get_all_rounds returns them (Decimals converted), per history size"""
+    rounds_by_size = {}
+    original_table = lambda_module.table
+    try:
+        for players, seasons in HISTORY_SIZES:
+            lambda_module.table = LocalTable(generate_history(players=players, seasons=seasons))
+            rounds_by_size[(players, seasons)] = lambda_module.get_all_rounds()
+    finally:
+        lambda_module.table = original_table
+    return rounds_by_size
+
+
+@pytest.mark.parametrize('players,seasons', HISTORY_SIZES, ids=[f"{p}p-{s}y" for p, s in HISTORY_SIZES])
+def bench_generate_whatsapp_summary(benchmark, lambda_module, histories, fresh_copy, players, seasons):
+    rounds = histories[(players, seasons)]
+
+    def summary(rounds):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return lambda_module.generate_whatsapp_summary(rounds)
+
+    text = benchmark.pedantic(summary, setup=fresh_copy(rounds), rounds=SUMMARY_ROUNDS[(players, seasons)])
+    assert 'TODAY' in text
+
+
+@pytest.mark.parametrize('players,seasons,rounds', [(5, 3, 50), (500, 1, 8)], ids=['5p-3y', '500p-1y'])
+def bench_get_all_rounds(benchmark, lambda_module, monkeypatch, players, seasons, rounds):
+    """Query paging plus Decimal conversion, against the in-memory table"""
+    monkeypatch.setattr(lambda_module, 'table', LocalTable(generate_history(players=players, seasons=seasons)))
+    assert benchmark.pedantic(lambda_module.get_all_rounds, rounds=rounds)
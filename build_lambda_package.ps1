@@ -20,7 +20,7 @@ Write-Host "      Done" -ForegroundColor Green
 Write-Host ""
 Write-Host "[2/4] Installing dependencies with Linux binaries..." -ForegroundColor Yellow
 Write-Host "      Platform: manylinux2014_x86_64, Python: 3.13" -ForegroundColor Gray
-pip install requests beautifulsoup4 openai --platform manylinux2014_x86_64 --target $packageDir --only-binary=:all: --python-version 3.13 --quiet
+pip install requests beautifulsoup4 openai numpy --platform manylinux2014_x86_64 --target $packageDir --only-binary=:all: --python-version 3.13 --quiet
 Write-Host "      Done" -ForegroundColor Green
 
 # Copy Lambda function files
@@ -30,6 +30,31 @@ Write-Host "      lambda_function.py" -ForegroundColor Gray
 Copy-Item src\lambda_function.py $packageDir\
 Write-Host "      handicap.py" -ForegroundColor Gray
 Copy-Item src\handicap.py $packageDir\
+Write-Host "      course_registry.py, courses.json" -ForegroundColor Gray
+Copy-Item src\course_registry.py $packageDir\
+Copy-Item src\courses.json $packageDir\
+Write-Host "      rounds_table.py" -ForegroundColor Gray
+Copy-Item src\rounds_table.py $packageDir\
+Write-Host "      season_index.py" -ForegroundColor Gray
+Copy-Item src\season_index.py $packageDir\
+Write-Host "      form_guide.py" -ForegroundColor Gray
+Copy-Item src\form_guide.py $packageDir\
+Write-Host "      predictor.py" -ForegroundColor Gray
+Copy-Item src\predictor.py $packageDir\
+Write-Host "      request_context.py" -ForegroundColor Gray
+Copy-Item src\request_context.py $packageDir\
+Write-Host "      ratings.py" -ForegroundColor Gray
+Copy-Item src\ratings.py $packageDir\
+Write-Host "      head_to_head.py" -ForegroundColor Gray
+Copy-Item src\head_to_head.py $packageDir\
+Write-Host "      handicap_window.py" -ForegroundColor Gray
+Copy-Item src\handicap_window.py $packageDir\
+Write-Host "      pcc.py" -ForegroundColor Gray
+Copy-Item src\pcc.py $packageDir\
+Write-Host "      rate_limit.py" -ForegroundColor Gray
+Copy-Item src\rate_limit.py $packageDir\
+Write-Host "      resilience.py" -ForegroundColor Gray
+Copy-Item src\resilience.py $packageDir\
 Write-Host "      Done" -ForegroundColor Green
 
 # Create zip file
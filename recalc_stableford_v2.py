@@ -5,13 +5,36 @@ Uses the correct 18-hole stroke index allocation method:
 - CH = round(WHS × slope_display/113 + (rating_display - par))
 - Each hole with SI ≤ CH gets 1 stroke
 - If CH > 18, holes with SI ≤ (CH-18) get an additional stroke
+
+Differentials and the index follow the Lambda (handicap.py's WHS table, the
+back 9 slope / rating from courses.json, the stored field PCC subtracted,
+handicap-eligible rounds only). Each player's index timeline is built once,
+over a rolling 20-differential window, and looked up by date with bisect.
+Scorecards are fetched concurrently and cached on disk. Changed scores are
+written as partial updates (SET players[i].stableford), so anything written
+to the items during the run (pcc, hole_scores) is kept, and a checkpoint
+lets an interrupted run resume.
+
+Usage:
+    python recalc_stableford_v2.py             # recalculate, confirm, write
+    python recalc_stableford_v2.py --verbose   # plus per-player hole-by-hole diagnostics
 """
 import boto3
+import json
+import os
 import requests
+import sys
+import time
 from bs4 import BeautifulSoup
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from datetime import datetime, timedelta
 from load_credentials import load_credentials
+from course_registry import get_nine, allocate_strokes, calculate_course_handicap, stableford_points
+from handicap import HandicapCalculator, WHS_WINDOW
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, query_rounds
 import re
 import urllib3
 
@@ -19,36 +42,29 @@ urllib3.disable_warnings()
 load_credentials()
 
 dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
-table = dynamodb.Table('golf-rounds')
-
-# ─── Course configurations ──────────────────────────────────────────────────
-BACK_9_CONFIG = {
-    'name': 'Back 9 (Holes 10-18)',
-    'par': 35,
-    'slope': 101,        # For index/differential calculation
-    'rating': 33.5,      # For index/differential calculation
-    'slope_display': 111, # For course handicap (Warringah Whites official)
-    'rating_display': 33.0,
-}
+table = dynamodb.Table(TABLE_NAME)
+
+# ─── Course configurations (from courses.json) ─────────────────────────────
+BACK_9_CONFIG = get_nine('back9')
 
 # Back 9 stroke indexes (18-hole SI values)
-BACK_9_SI = [8, 9, 18, 6, 17, 3, 14, 12, 2]
-BACK_9_PARS = [5, 4, 3, 4, 3, 4, 4, 3, 4]  # par = 34 actual card, 35 for CH calc
+BACK_9_SI = BACK_9_CONFIG['si']
+BACK_9_PARS = BACK_9_CONFIG['pars']  # par = 34 actual card, 35 for CH calc
 
 # Front 9 stroke indexes (for reference, not used in current recalc)
-FRONT_9_SI = [15, 1, 5, 10, 16, 7, 13, 4, 11]
-
-# ─── WHS lookup table ───────────────────────────────────────────────────────
-WHS_TABLE = {
-    3: 1, 4: 1, 5: 1,
-    6: 2, 7: 2, 8: 2,
-    9: 3, 10: 3, 11: 3,
-    12: 4, 13: 4, 14: 4,
-    15: 5, 16: 5,
-    17: 6, 18: 6,
-    19: 7,
-    20: 8
-}
+FRONT_9_SI = get_nine('front9')['si']
+
+# ─── Fetching / writing ────────────────────────────────────────────────────
+FETCH_WORKERS = 8
+# Scraped scorecards by URL (scorecards don't change once a round is posted)
+SCORECARD_CACHE_FILE = 'recalc_scorecard_cache.json'
+# Round keys already written by an interrupted run
+CHECKPOINT_FILE = 'recalc_stableford_checkpoint.json'
+# Rounds written between checkpoint saves
+WRITE_CHUNK = 25
+
+# WHS table, window and caps shared with the Lambda (handicap.py)
+hc_calc = HandicapCalculator()
 
 NAME_MAP = {
     'Andy J.': 'Andy Jakes',
@@ -61,126 +77,67 @@ NAME_MAP = {
 }
 
 
-def calculate_course_handicap(whs_index, slope_display, rating_display, par):
-    """WHS Course Handicap: CH = round(WHS × S/113 + (CR - Par))"""
-    ch = round(float(whs_index) * slope_display / 113 + (rating_display - par))
-    return max(0, ch)
-
-
 def allocate_strokes_18hole_si(course_handicap, hole_si_values):
     """
-    Allocate strokes using 18-hole stroke index method.
+    Allocate strokes using 18-hole stroke index method (see course_registry).
     
     Each hole with SI ≤ CH gets 1 stroke.
     If CH > 18, holes with SI ≤ (CH - 18) get an additional stroke.
     If CH > 36, holes with SI ≤ (CH - 36) get yet another stroke.
     """
-    strokes = [0] * len(hole_si_values)
-    
-    for i, si in enumerate(hole_si_values):
-        if si <= course_handicap:
-            strokes[i] += 1
-        if course_handicap > 18 and si <= (course_handicap - 18):
-            strokes[i] += 1
-        if course_handicap > 36 and si <= (course_handicap - 36):
-            strokes[i] += 1
-    
-    return strokes
+    return allocate_strokes(course_handicap, hole_si_values)
 
 
-def calculate_stableford_per_hole(scores, pars, strokes):
-    """Calculate Stableford points for each hole"""
-    points = []
-    for score, par, s in zip(scores, pars, strokes):
-        if score == 0 or score is None:
-            points.append(0)
-            continue
-        net_score = score - s
-        diff = net_score - par
-        if diff <= -2:
-            points.append(4)
-        elif diff == -1:
-            points.append(3)
-        elif diff == 0:
-            points.append(2)
-        elif diff == 1:
-            points.append(1)
-        else:
-            points.append(0)
-    return points
-
-
-def calculate_whs_index(differentials):
-    """Calculate WHS index using correct last-20 window"""
-    if len(differentials) < 3:
-        return None
-    last_20 = differentials[-20:] if len(differentials) > 20 else differentials
-    num_scores = len(last_20)
-    num_to_use = WHS_TABLE.get(num_scores, 8)
-    sorted_diffs = sorted(last_20)
-    best_diffs = sorted_diffs[:num_to_use]
-    new_index = sum(best_diffs) / len(best_diffs) * 0.96
-    return round(new_index, 1)
-
-
-def apply_handicap_caps(new_index, low_handicap_index):
-    """Apply WHS hard cap and soft cap"""
-    if low_handicap_index is None:
-        return new_index
-    increase = new_index - low_handicap_index
-    if increase <= 3.0:
-        return new_index
-    if increase <= 5.0:
-        excess = increase - 3.0
-        return round(low_handicap_index + 3.0 + (excess * 0.5), 1)
-    return round(low_handicap_index + 5.0, 1)
-
-
-def get_low_handicap_index(differentials, dates, as_of_date):
-    """Get lowest WHS index achieved in last 365 days"""
-    cutoff = (datetime.strptime(as_of_date, '%Y-%m-%d') - timedelta(days=365)).strftime('%Y-%m-%d')
-    indices = []
-    for i, date in enumerate(dates):
-        if date >= cutoff:
-            idx = calculate_whs_index(differentials[:i+1])
-            if idx is not None:
-                indices.append(idx)
-    return min(indices) if indices else None
-
-
-def calculate_differential(gross, slope, rating):
-    """Calculate 18-hole equivalent score differential from 9-hole gross"""
+def calculate_differential(gross, slope, rating, pcc=0):
+    """Calculate 18-hole equivalent score differential from 9-hole gross, less the day's PCC"""
     gross_18 = gross * 2
     rating_18 = rating * 2
-    diff = (gross_18 - rating_18) * (113 / slope)
+    diff = (gross_18 - rating_18 - pcc) * (113 / slope)
     return round(diff, 1)
 
 
-def get_corrected_whs_at_date(player_name, as_of_date, diff_history):
+def build_index_timeline(diff_history):
+    """
+    Per player, once: round dates and the uncapped index after each prefix of their rounds
+    {name: (dates, indices)} where indices[k] is the index from the first k differentials
+    (None until there are 3). Only the last WHS_WINDOW differentials are kept as it goes.
+    """
+    timeline = {}
+    for name, history in diff_history.items():
+        history = sorted(history, key=lambda entry: entry[0])
+        dates = [date for date, _ in history]
+        window = deque(maxlen=WHS_WINDOW)
+        indices = [None]
+        for _, diff in history:
+            window.append(diff)
+            indices.append(hc_calc.update_handicap_index(None, list(window)))
+        timeline[name] = (dates, indices)
+    return timeline
+
+
+def get_corrected_whs_at_date(player_name, as_of_date, timeline):
     """Calculate corrected WHS for a player as of a date (before that round)"""
-    if player_name not in diff_history:
-        return None
-    diffs_before = [d for date, d in diff_history[player_name] if date < as_of_date]
-    if len(diffs_before) < 3:
+    if player_name not in timeline:
         return None
-    raw_index = calculate_whs_index(diffs_before)
+    dates, indices = timeline[player_name]
+    count = bisect_left(dates, as_of_date)  # rounds strictly before as_of_date
+    raw_index = indices[count]
     if raw_index is None:
         return None
-    dates_before = [date for date, d in diff_history[player_name] if date < as_of_date]
-    lhi = get_low_handicap_index(diffs_before, dates_before, as_of_date)
-    if lhi is not None:
-        raw_index = apply_handicap_caps(raw_index, lhi)
+    # Low Handicap Index: lowest index after any of those rounds in the last 365 days
+    cutoff = (datetime.strptime(as_of_date, '%Y-%m-%d') - timedelta(days=365)).strftime('%Y-%m-%d')
+    recent = [idx for idx in indices[bisect_left(dates, cutoff) + 1:count + 1] if idx is not None]
+    if recent:
+        raw_index = hc_calc.apply_handicap_caps(raw_index, min(recent))
     return round(raw_index, 1)
 
 
-def scrape_hole_scores(url):
+def parse_hole_scores(html):
     """
-    Scrape Tag Heuer scorecard for hole-by-hole scores.
+    Parse a Tag Heuer scorecard page for hole-by-hole scores.
     Returns dict of {player_name: [score1, ..., score9]} for back 9.
     """
-    print(f"  Scraping: {url}")
-    response = requests.get(url, timeout=15, verify=False)
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(html, 'html.parser')
     
     score_tables = soup.find_all('div', class_='score-table')
     if not score_tables:
@@ -279,9 +236,12 @@ def scrape_hole_scores(url):
 
 
 def build_differential_history(all_rounds, slope, rating):
-    """Build chronological differential history per player"""
+    """Build chronological differential history per player (handicap-eligible rounds, less stored PCC)"""
     history = {}
     for r in all_rounds:
+        if not r.get('handicap_eligible', True):
+            continue
+        pcc = int(r.get('pcc', 0) or 0)
         date = r['date']
         date_clean = re.match(r'(\d{4}-\d{2}-\d{2})', date)
         if date_clean:
@@ -291,51 +251,141 @@ def build_differential_history(all_rounds, slope, rating):
             gross = int(p.get('gross', 0))
             if gross == 0:
                 continue
-            diff = calculate_differential(gross, slope, rating)
+            diff = calculate_differential(gross, slope, rating, pcc)
             if name not in history:
                 history[name] = []
             history[name].append((date, diff))
     return history
 
 
+def load_json(path, default):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return default
+
+
+def save_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)  # never leave a half-written file behind
+
+
+def fetch_scorecards(urls, cache):
+    """
+    Scrape every URL not already in the cache, FETCH_WORKERS at a time
+    Failed fetches are not cached, so the next run retries them
+    """
+    session = requests.Session()
+    session.verify = False
+
+    def fetch(url):
+        try:
+            response = session.get(url, timeout=15)
+            return url, parse_hole_scores(response.text)
+        except Exception as e:
+            print(f"  Could not scrape {url}: {e}")
+            return url, None
+
+    missing = sorted({url for url in urls if url not in cache})
+    if not missing:
+        return cache
+    print(f"Fetching {len(missing)} scorecards ({len(urls) - len(missing)} cached)...")
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for url, scraped in pool.map(fetch, missing):
+            if scraped:
+                cache[url] = scraped
+    save_json(SCORECARD_CACHE_FILE, cache)
+    return cache
+
+
+def write_stableford(round_key, updates):
+    """
+    Partial update: SET players[i].stableford for the changed players only.
+    The condition checks each index still holds the same player.
+    """
+    sets, conditions = [], []
+    values = {}
+    for u in updates:
+        i = u['player_pos']
+        sets.append(f"players[{i}].stableford = :s{i}")
+        conditions.append(f"players[{i}].#name = :n{i}")
+        values[f":s{i}"] = Decimal(u['new_stableford'])
+        values[f":n{i}"] = u['player_name']
+    table.update_item(
+        Key={'group_id': DEFAULT_GROUP_ID, 'round_key': round_key},
+        UpdateExpression='SET ' + ', '.join(sets),
+        ConditionExpression=' AND '.join(conditions),
+        ExpressionAttributeNames={'#name': 'name'},
+        ExpressionAttributeValues=values,
+    )
+
+
+def write_updates(updates_by_key, checkpoint):
+    """
+    Write each round's changed scores, saving the checkpoint every WRITE_CHUNK rounds
+    A round is skipped on resume only if the checkpoint recorded exactly these new scores
+    Returns the number of rounds that could not be written
+    """
+    planned = {
+        round_key: {u['player_name']: u['new_stableford'] for u in updates}
+        for round_key, updates in updates_by_key.items()
+    }
+    pending = [key for key, points in planned.items() if checkpoint['written'].get(key) != points]
+    if len(pending) < len(planned):
+        print(f"Resuming: {len(planned) - len(pending)} rounds already written")
+
+    failed = 0
+    for n, round_key in enumerate(pending, 1):
+        try:
+            write_stableford(round_key, updates_by_key[round_key])
+            checkpoint['written'][round_key] = planned[round_key]
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            failed += 1
+            print(f"  ❌ {round_key} - players changed since the run started, skipped (rerun to retry)")
+        if n % WRITE_CHUNK == 0 or n == len(pending):
+            save_json(CHECKPOINT_FILE, checkpoint)
+            print(f"  Written {n - failed}/{len(pending)} rounds")
+    return failed
+
+
 def main():
+    verbose = '--verbose' in sys.argv
+    started = time.time()
+
     print("=" * 80)
     print("STABLEFORD RECALCULATION - CORRECTED (18-HOLE SI ALLOCATION)")
     print("=" * 80)
     
-    # Get all rounds
-    response = table.scan()
-    all_rounds = sorted(response['Items'], key=lambda x: x['date'])
+    # Get all rounds for the group
+    all_rounds = query_rounds(table, DEFAULT_GROUP_ID)
     
-    # Build differential history
-    diff_history = build_differential_history(all_rounds, 101, 33.5)
+    # Build differential history and each player's index timeline once
+    diff_history = build_differential_history(all_rounds, BACK_9_CONFIG['slope'], BACK_9_CONFIG['rating'])
+    timeline = build_index_timeline(diff_history)
     
     # Rounds to recalculate (all with scorecard URLs)
     target_rounds = [r for r in all_rounds if r.get('scorecard_url') and r['date'] >= '2025-12-26']
     print(f"\nRounds to recalculate: {len(target_rounds)}")
     
+    cache = fetch_scorecards([r['scorecard_url'] for r in target_rounds], load_json(SCORECARD_CACHE_FILE, {}))
+    
     config = BACK_9_CONFIG
     all_changes = []
     db_updates = []
+    skipped = 0
     
     for round_data in target_rounds:
         date = round_data['date']
-        url = round_data.get('scorecard_url', '')
-        
-        print(f"\n{'='*80}")
-        print(f"ROUND: {date} - {config['name']}")
-        print(f"{'='*80}")
-        
-        # Scrape hole-by-hole scores
-        scraped = scrape_hole_scores(url)
+        scraped = cache.get(round_data['scorecard_url'])
         if not scraped:
-            print("  SKIPPING - could not scrape")
+            skipped += 1
             continue
         
-        for player in round_data.get('players', []):
+        for pos, player in enumerate(round_data.get('players', [])):
             name = player['name']
             old_stableford = int(player.get('stableford', 0))
-            old_whs = float(player.get('index', 0))
             gross = int(player.get('gross', 0))
             
             if gross == 0 or name not in scraped:
@@ -343,45 +393,40 @@ def main():
             
             scores = scraped[name]['scores']
             th_index = scraped[name]['th_index']
-            th_hcp_strokes = scraped[name].get('th_hcp_strokes', [])
-            th_stableford = scraped[name].get('th_stableford', [])
             
             # Calculate OLD CH (using Tag Heuer index)
             old_ch = calculate_course_handicap(th_index, config['slope_display'], config['rating_display'], config['par'])
             old_strokes = allocate_strokes_18hole_si(old_ch, BACK_9_SI)
-            old_stableford_calc = calculate_stableford_per_hole(scores, BACK_9_PARS, old_strokes)
-            old_stableford_total = sum(old_stableford_calc)
+            old_stableford_calc = stableford_points(scores, BACK_9_PARS, old_strokes)
             
             # Get CORRECTED WHS at this date
-            corrected_whs = get_corrected_whs_at_date(name, date, diff_history)
+            corrected_whs = get_corrected_whs_at_date(name, date, timeline)
             if corrected_whs is None:
-                print(f"  {name}: Insufficient history for corrected WHS")
+                if verbose:
+                    print(f"  {date} {name}: Insufficient history for corrected WHS")
                 continue
             
             # Calculate NEW CH (using corrected WHS)
             new_ch = calculate_course_handicap(corrected_whs, config['slope_display'], config['rating_display'], config['par'])
             new_strokes = allocate_strokes_18hole_si(new_ch, BACK_9_SI)
-            new_stableford_calc = calculate_stableford_per_hole(scores, BACK_9_PARS, new_strokes)
+            new_stableford_calc = stableford_points(scores, BACK_9_PARS, new_strokes)
             new_stableford_total = sum(new_stableford_calc)
             
-            change = new_stableford_total - old_stableford
-            
-            print(f"\n  {name}:")
-            print(f"    Tag Heuer WHS: {th_index:>5.1f}  |  Old DB WHS: {old_whs:>5.1f}  |  Corrected WHS: {corrected_whs:>5.1f}")
-            print(f"    Old CH: {old_ch:>2d} ({sum(old_strokes)} strokes)  |  New CH: {new_ch:>2d} ({sum(new_strokes)} strokes)  |  CH diff: {new_ch - old_ch:+d}")
-            print(f"    Scores: {scores}  (Gross: {sum(s for s in scores if s)})")
-            print(f"    SI:     {BACK_9_SI}")
-            
-            if th_hcp_strokes:
-                print(f"    TH HCP strokes: {th_hcp_strokes} = {sum(th_hcp_strokes)}")
-            print(f"    Old strokes:    {old_strokes} = {sum(old_strokes)}")
-            print(f"    New strokes:    {new_strokes} = {sum(new_strokes)}")
-            
-            if th_stableford:
-                print(f"    TH stableford:  {th_stableford} = {sum(th_stableford)}")
-            print(f"    Old stableford: {old_stableford_calc} = {old_stableford_total}")
-            print(f"    NEW stableford: {new_stableford_calc} = {new_stableford_total}")
-            print(f"    DB value: {old_stableford}  ->  New: {new_stableford_total}  ({new_stableford_total - old_stableford:+d})")
+            if verbose:
+                th_hcp_strokes = scraped[name].get('th_hcp_strokes', [])
+                th_stableford = scraped[name].get('th_stableford', [])
+                print(f"\n  {date} {name}:")
+                print(f"    Tag Heuer WHS: {th_index:>5.1f}  |  Old DB WHS: {float(player.get('index', 0)):>5.1f}  |  Corrected WHS: {corrected_whs:>5.1f}")
+                print(f"    Old CH: {old_ch:>2d} ({sum(old_strokes)} strokes)  |  New CH: {new_ch:>2d} ({sum(new_strokes)} strokes)  |  CH diff: {new_ch - old_ch:+d}")
+                print(f"    Scores: {scores}  (Gross: {sum(s for s in scores if s)})")
+                if th_hcp_strokes:
+                    print(f"    TH HCP strokes: {th_hcp_strokes} = {sum(th_hcp_strokes)}")
+                print(f"    Old strokes:    {old_strokes} = {sum(old_strokes)}")
+                print(f"    New strokes:    {new_strokes} = {sum(new_strokes)}")
+                if th_stableford:
+                    print(f"    TH stableford:  {th_stableford} = {sum(th_stableford)}")
+                print(f"    Old stableford: {old_stableford_calc} = {sum(old_stableford_calc)}")
+                print(f"    NEW stableford: {new_stableford_calc} = {new_stableford_total}")
             
             all_changes.append({
                 'date': date,
@@ -398,11 +443,16 @@ def main():
             if new_stableford_total != old_stableford:
                 db_updates.append({
                     'date': date,
+                    'round_key': round_data['round_key'],
                     'player_name': name,
+                    'player_pos': pos,
                     'old_stableford': old_stableford,
                     'new_stableford': new_stableford_total
                 })
     
+    if skipped:
+        print(f"Skipped {skipped} rounds whose scorecards could not be scraped")
+    
     # Summary
     print(f"\n\n{'='*80}")
     print("SUMMARY OF STABLEFORD CHANGES")
@@ -412,38 +462,28 @@ def main():
     print("-" * 100)
     
     for c in all_changes:
+        if c['change'] == 0 and not verbose:
+            continue
         marker = " <<<" if c['change'] != 0 else ""
         print(f"{c['date']:<13} {c['name']:<20} {c['th_whs']:>7.1f} {c['corrected_whs']:>8.1f} {c['old_ch']:>7d} {c['new_ch']:>7d} {c['old_stableford']:>9d} {c['new_stableford']:>9d} {c['change']:>+5d}{marker}")
     
-    print(f"\n\nDB updates needed: {len(db_updates)}")
-    for u in db_updates:
-        print(f"  {u['date']} - {u['player_name']}: {u['old_stableford']} -> {u['new_stableford']} ({u['new_stableford'] - u['old_stableford']:+d})")
+    print(f"\nChecked {len(all_changes)} scores in {time.time() - started:.1f}s")
+    print(f"DB updates needed: {len(db_updates)}")
     
     if db_updates:
         print(f"\n⚠️  Ready to update {len(db_updates)} Stableford scores in DynamoDB.")
         answer = input("Proceed with updates? (yes/no): ").strip().lower()
         if answer == 'yes':
-            updates_by_date = {}
+            updates_by_key = {}
             for u in db_updates:
-                if u['date'] not in updates_by_date:
-                    updates_by_date[u['date']] = []
-                updates_by_date[u['date']].append(u)
-            
-            for date, updates in updates_by_date.items():
-                response = table.get_item(Key={'date': date})
-                round_data = response.get('Item')
-                if not round_data:
-                    continue
-                players = round_data.get('players', [])
-                for update in updates:
-                    for i, p in enumerate(players):
-                        if p['name'] == update['player_name']:
-                            players[i]['stableford'] = update['new_stableford']
-                            print(f"  Updated {date} - {update['player_name']}: {update['old_stableford']} -> {update['new_stableford']}")
-                            break
-                table.put_item(Item={**round_data, 'players': players})
+                updates_by_key.setdefault(u['round_key'], []).append(u)
             
-            print("\n✅ All Stableford scores updated!")
+            checkpoint = load_json(CHECKPOINT_FILE, {'written': {}})
+            if write_updates(updates_by_key, checkpoint):
+                print("\n⚠️  Some rounds were not updated - rerun to retry them")
+            else:
+                os.remove(CHECKPOINT_FILE)
+                print("\n✅ All Stableford scores updated!")
         else:
             print("\n❌ No changes made.")
     else:
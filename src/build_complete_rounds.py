@@ -4,12 +4,16 @@ Build complete rounds data with proper blob/X handling
 Manually extracted from Tag Heuer data
 """
 
-# Course data
-BACK_9_PARS = [5, 4, 3, 4, 3, 4, 4, 3, 4]  # Par 34, holes 10-18
-BACK_9_HCP = [8, 9, 18, 6, 17, 3, 14, 12, 2]
+from course_registry import get_nine
 
-FRONT_9_PARS = [4, 4, 5, 4, 3, 4, 4, 3, 4]  # Par 35, holes 1-9  
-FRONT_9_HCP = [15, 3, 7, 10, 16, 1, 13, 5, 11]
+# Course data (from courses.json)
+BACK_9_PARS = get_nine('back9')['pars']  # Par 34, holes 10-18
+BACK_9_HCP = get_nine('back9')['si']
+
+# Front 9 SI is the Lambda's (Tag Heuer card) vector, [15, 1, 5, 10, 16, 7, 13, 4, 11].
+# Every round below is a back 9, so neither front 9 table is used by blob() here.
+FRONT_9_PARS = get_nine('front9')['pars']  # Par 35, holes 1-9
+FRONT_9_HCP = get_nine('front9')['si']
 
 def blob(par, hcp_index, strokes):
     """Calculate blob score: Par + 2 + (1 if gets stroke else 0)"""
@@ -0,0 +1,225 @@
+"""
+Columnar Export
+Writes rounds and hole scores to Parquet for analytics, next to the Excel export.
+
+Two tables, both hive-partitioned by season (output_dir/<table>/season=YYYY/):
+- rounds: one row per player per round (date, course, index, gross, stableford, ...)
+- holes:  long format, one row per player per hole (hole number, par, SI, strokes)
+
+Exports are incremental: a manifest records which round keys are already on
+disk and each run only appends a new part file for the rounds it hasn't seen.
+Use full=True (--full) to rebuild from scratch after rounds are edited.
+
+Needs pyarrow (and pandas for load_table), listed in requirements-analytics.txt.
+They are optional because only this local export uses them. Without pyarrow,
+the export is skipped with a warning and load_table raises ImportError.
+
+Usage:
+    python columnar_export.py                     # append new rounds to ./analytics
+    python columnar_export.py exports/ --full     # rebuild everything
+"""
+
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+from course_registry import nine_for_round
+from rounds_table import DEFAULT_GROUP_ID, base_date
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    ARROW_ENABLED = True
+except ImportError:
+    ARROW_ENABLED = False
+
+ARROW_MISSING = ("pyarrow is required for the columnar export - "
+                 "install it with: pip install -r requirements-analytics.txt")
+
+DEFAULT_OUTPUT_DIR = 'analytics'
+MANIFEST_FILE = '_manifest.json'
+
+if ARROW_ENABLED:
+    ROUND_SCHEMA = pa.schema([
+        ('group_id', pa.string()),
+        ('round_key', pa.string()),
+        ('date', pa.date32()),
+        ('season', pa.int16()),
+        ('course', pa.string()),
+        ('course_id', pa.string()),
+        ('tee', pa.string()),
+        ('handicap_eligible', pa.bool_()),
+        ('player', pa.string()),
+        ('index', pa.float64()),
+        ('gross', pa.int16()),
+        ('stableford', pa.int16()),
+        ('has_hole_scores', pa.bool_()),
+    ])
+
+    HOLE_SCHEMA = pa.schema([
+        ('group_id', pa.string()),
+        ('round_key', pa.string()),
+        ('date', pa.date32()),
+        ('season', pa.int16()),
+        ('course', pa.string()),
+        ('player', pa.string()),
+        ('hole', pa.int8()),
+        ('par', pa.int8()),
+        ('si', pa.int8()),
+        ('strokes', pa.int16()),
+    ])
+
+
+def _round_key(round_data):
+    return round_data.get('round_key') or f"{base_date(round_data['date'])}#{round_data.get('course', '')}"
+
+
+def flatten_rounds(rounds_data):
+    """DynamoDB round items -> (round rows, hole rows) as column dicts"""
+    round_cols = {name: [] for name in ROUND_SCHEMA.names}
+    hole_cols = {name: [] for name in HOLE_SCHEMA.names}
+
+    for round_data in rounds_data:
+        nine = nine_for_round(round_data)
+        round_date = datetime.strptime(base_date(round_data['date']), '%Y-%m-%d').date()
+        round_key = _round_key(round_data)
+        group_id = round_data.get('group_id', DEFAULT_GROUP_ID)
+        course = nine['label']
+
+        for player in round_data.get('players', []):
+            if player.get('gross') is None:
+                continue
+            hole_scores = player.get('hole_scores') or []
+
+            round_cols['group_id'].append(group_id)
+            round_cols['round_key'].append(round_key)
+            round_cols['date'].append(round_date)
+            round_cols['season'].append(round_date.year)
+            round_cols['course'].append(course)
+            round_cols['course_id'].append(nine['course_id'])
+            round_cols['tee'].append(nine['tee'])
+            round_cols['handicap_eligible'].append(bool(round_data.get('handicap_eligible', True)))
+            round_cols['player'].append(player['name'])
+            round_cols['index'].append(float(player['index']) if player.get('index') is not None else None)
+            round_cols['gross'].append(int(player['gross']))
+            round_cols['stableford'].append(int(player['stableford']) if player.get('stableford') is not None else None)
+            round_cols['has_hole_scores'].append(bool(hole_scores))
+
+            for hole, par, si, strokes in zip(nine['holes'], nine['pars'], nine['si'], hole_scores):
+                hole_cols['group_id'].append(group_id)
+                hole_cols['round_key'].append(round_key)
+                hole_cols['date'].append(round_date)
+                hole_cols['season'].append(round_date.year)
+                hole_cols['course'].append(course)
+                hole_cols['player'].append(player['name'])
+                hole_cols['hole'].append(hole)
+                hole_cols['par'].append(par)
+                hole_cols['si'].append(si)
+                hole_cols['strokes'].append(int(strokes))
+
+    return round_cols, hole_cols
+
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'exported': {}}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _write_partitioned(table, base_dir, part_name):
+    """Append one part file per season under base_dir/season=YYYY/"""
+    if table.num_rows == 0:
+        return
+    ds.write_dataset(
+        table,
+        base_dir,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('season', pa.int16())]), flavor='hive'),
+        basename_template=f"{part_name}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def export_rounds_columnar(rounds_data, output_dir=DEFAULT_OUTPUT_DIR, full=False):
+    """
+    Export rounds and hole scores to partitioned Parquet
+    Only rounds not already in the manifest are written unless full=True
+    Returns the number of rounds written
+    """
+    if not ARROW_ENABLED:
+        print(f"⚠️  {ARROW_MISSING}")
+        return 0
+
+    if full and os.path.exists(output_dir):
+        for name in ('rounds', 'holes', MANIFEST_FILE):
+            path = os.path.join(output_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = _load_manifest(output_dir)
+    exported = manifest['exported']
+
+    seen = {group_id: set(keys) for group_id, keys in exported.items()}
+    new_rounds = [
+        r for r in rounds_data
+        if _round_key(r) not in seen.get(r.get('group_id', DEFAULT_GROUP_ID), ())
+    ]
+    if not new_rounds:
+        print("[+] Columnar export up to date")
+        return 0
+
+    round_cols, hole_cols = flatten_rounds(new_rounds)
+    part_name = datetime.now().strftime('part-%Y%m%d%H%M%S%f')
+    _write_partitioned(pa.table(round_cols, schema=ROUND_SCHEMA), os.path.join(output_dir, 'rounds'), part_name)
+    _write_partitioned(pa.table(hole_cols, schema=HOLE_SCHEMA), os.path.join(output_dir, 'holes'), part_name)
+
+    for r in new_rounds:
+        exported.setdefault(r.get('group_id', DEFAULT_GROUP_ID), []).append(_round_key(r))
+    for keys in exported.values():
+        keys.sort()
+    _save_manifest(output_dir, manifest)
+
+    print(f"[+] Columnar export: {len(new_rounds)} rounds, {len(hole_cols['hole'])} hole scores -> {output_dir}")
+    return len(new_rounds)
+
+
+def load_table(output_dir=DEFAULT_OUTPUT_DIR, name='rounds', season=None):
+    """
+    Read an exported table into pandas
+    season restricts the read to one partition; self_destruct frees Arrow
+    buffers as columns are handed to pandas instead of holding two copies
+    """
+    if not ARROW_ENABLED:
+        raise ImportError(ARROW_MISSING)
+    dataset = ds.dataset(os.path.join(output_dir, name), format='parquet', partitioning='hive')
+    flt = ds.field('season') == season if season is not None else None
+    return dataset.to_table(filter=flt).to_pandas(split_blocks=True, self_destruct=True)
+
+
+if __name__ == '__main__':
+    if not ARROW_ENABLED:
+        print(ARROW_MISSING)
+        sys.exit(1)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    output_dir = args[0] if args else DEFAULT_OUTPUT_DIR
+
+    from golf_system import fetch_rounds_from_db
+    rounds_data = fetch_rounds_from_db()
+    print(f"[+] Fetched {len(rounds_data)} rounds")
+    export_rounds_columnar(rounds_data, output_dir, full='--full' in sys.argv)
@@ -0,0 +1,169 @@
+"""
+Course Registry
+Loads course, tee and nine definitions from courses.json and precomputes
+the derived tables (stroke vectors, course handicap lookups) once at import
+"""
+
+import json
+import os
+
+COURSES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'courses.json')
+
+# Highest course handicap we precompute stroke vectors for.
+# WHS index caps at 54.0, which is CH 63 on the hardest Warringah nine.
+MAX_COURSE_HANDICAP = 63
+MAX_INDEX_TENTHS = 540  # 54.0
+
+
+def allocate_strokes(course_handicap, hole_si_values):
+    """
+    Allocate handicap strokes using 18-hole stroke index method.
+    Each hole with SI <= CH gets 1 stroke.
+    If CH > 18, holes with SI <= (CH-18) get an additional stroke.
+    """
+    strokes = [0] * len(hole_si_values)
+    for i, si in enumerate(hole_si_values):
+        if si <= course_handicap:
+            strokes[i] += 1
+        if course_handicap > 18 and si <= (course_handicap - 18):
+            strokes[i] += 1
+        if course_handicap > 36 and si <= (course_handicap - 36):
+            strokes[i] += 1
+    return strokes
+
+
+def net_stableford(net_to_par):
+    """
+    Stableford points for a net score relative to par: 2 for net par, capped at 4
+    (eagle or better) and 0 from net double bogey. Works element-wise on numpy arrays.
+    """
+    if hasattr(net_to_par, 'clip'):
+        return (2 - net_to_par).clip(0, 4)
+    return max(0, min(4, 2 - net_to_par))
+
+
+def stableford_points(scores, pars, strokes):
+    """Stableford points per hole for gross scores with these strokes (0 / None = blob, 0 points)"""
+    return [
+        net_stableford(int(score) - s - par) if score and int(score) > 0 else 0
+        for score, par, s in zip(scores, pars, strokes)
+    ]
+
+
+def calculate_course_handicap(index, slope, rating, par):
+    """
+    WHS Course Handicap Formula: CH = round(Index × Slope/113 + (Rating - Par))
+    """
+    ch = round(float(index) * slope / 113 + (rating - par))
+    return max(0, ch)
+
+
+def load_courses(path=COURSES_FILE):
+    """Load raw course definitions from the JSON data file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _build_nine(course_id, course, tee, label, nine):
+    """Build a nine config with its derived tables precomputed"""
+    config = {
+        'course_id': course_id,
+        'course_name': course['name'],
+        'tee': tee,
+        'label': label,
+        'name': nine['name'],
+        'par': nine['par'],
+        'slope': nine['slope'],
+        'rating': nine['rating'],
+        'slope_display': nine['slope_display'],
+        'rating_display': nine['rating_display'],
+        'holes': tuple(nine['holes']),
+        'pars': tuple(nine['pars']),
+        'si': tuple(nine['si']),
+    }
+
+    # Stroke vector for every course handicap we expect to see
+    config['stroke_table'] = tuple(
+        tuple(allocate_strokes(ch, config['si'])) for ch in range(MAX_COURSE_HANDICAP + 1)
+    )
+
+    # Display course handicap for every index in tenths (0.0 - 54.0)
+    config['ch_table'] = tuple(
+        calculate_course_handicap(tenths / 10, config['slope_display'], config['rating_display'], config['par'])
+        for tenths in range(MAX_INDEX_TENTHS + 1)
+    )
+    return config
+
+
+def build_registry(data):
+    """Flatten course data into {(course_id, tee, label): nine_config}"""
+    registry = {}
+    for course_id, course in data['courses'].items():
+        for tee, tee_data in course['tees'].items():
+            for label, nine in tee_data['nines'].items():
+                registry[(course_id, tee, label)] = _build_nine(course_id, course, tee, label, nine)
+    return registry
+
+
+_DATA = load_courses()
+DEFAULT_COURSE = _DATA['default_course']
+DEFAULT_TEE = _DATA['default_tee']
+# NOTE: Some historical tooling treats DB labels as BACKWARDS ("front9" = Back 9)
+LEGACY_SWAPPED_LABELS = dict(_DATA.get('legacy_swapped_labels', {}))
+NINES = build_registry(_DATA)
+
+
+def get_nine(label, course_id=None, tee=None):
+    """Look up a nine config by DB course label ('front9' / 'back9')"""
+    return NINES[(course_id or DEFAULT_COURSE, tee or DEFAULT_TEE, label)]
+
+
+def nine_label_for_round(round_data):
+    """Which nine a stored round was played on (handles the -back9 date suffix)"""
+    if round_data.get('course') == 'back9' or '-back9' in round_data.get('date', ''):
+        return 'back9'
+    return 'front9'
+
+
+def nine_for_round(round_data):
+    """O(1) nine config lookup for a stored round"""
+    key = (
+        round_data.get('course_id') or DEFAULT_COURSE,
+        round_data.get('tee') or DEFAULT_TEE,
+        nine_label_for_round(round_data),
+    )
+    return NINES[key]
+
+
+def real_nine_label(label):
+    """Map a DB label to the nine it really is, for tooling that relies on the legacy swap"""
+    return LEGACY_SWAPPED_LABELS.get(label, label)
+
+
+def real_nine_for_round(round_data):
+    """
+    The nine a stored round really was, for tooling that relies on the legacy swap
+    Back 9 halves of 18-hole cards are labelled correctly: legacy ones by their
+    -back9 date, newer ones (stored without the suffix) by split_18.
+    """
+    if '-back9' in round_data.get('date', ''):
+        return 'back9'
+    course = round_data.get('course', 'back9')
+    if round_data.get('split_18'):
+        return course
+    return real_nine_label(course)
+
+
+def strokes_for(nine, course_handicap):
+    """Precomputed stroke allocation for a course handicap on this nine"""
+    if 0 <= course_handicap <= MAX_COURSE_HANDICAP:
+        return nine['stroke_table'][course_handicap]
+    return tuple(allocate_strokes(course_handicap, nine['si']))
+
+
+def display_course_handicap(nine, index):
+    """Course handicap from the official (display) slope/rating, via lookup table"""
+    tenths = round(float(index) * 10)
+    if 0 <= tenths <= MAX_INDEX_TENTHS and abs(float(index) * 10 - tenths) < 1e-6:
+        return nine['ch_table'][tenths]
+    return calculate_course_handicap(index, nine['slope_display'], nine['rating_display'], nine['par'])
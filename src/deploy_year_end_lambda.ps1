@@ -10,6 +10,10 @@ pip install --target ./package --platform manylinux2014_x86_64 --only-binary=:al
 
 # Copy Lambda function
 Copy-Item lambda_year_end_report.py package/
+Copy-Item course_registry.py package/
+Copy-Item courses.json package/
+Copy-Item rounds_table.py package/
+Copy-Item year_end_engine.py package/
 
 # Create zip
 Write-Host "Creating deployment package..."
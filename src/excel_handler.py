@@ -1,19 +1,89 @@
 """
 Excel Handler for Handicap Tracking
 Reads and writes player handicap data to Excel spreadsheet
+
+Queries open the workbook read-only and build a per-player row index in a
+single pass; the index is cached until the next write. Writes reopen the
+workbook in edit mode and are batched (add_rounds saves once per batch).
+Full rebuilds go through export_rounds, which streams rows in write-only mode.
+Season stats for every year come from one pass and are memoized until the next write.
 """
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from datetime import datetime
 import os
 
+HEADERS = ['Date', 'Player', 'Course', 'Gross Score', 'Stableford', 'Par', 
+           'Score to Par', 'Playing HC', 'Net Score', 'Differential', 
+           'Weather Factor', 'Weather Conditions', 'Current Index', 'Notes']
+
+COLUMN_WIDTHS = {
+    'A': 12,  # Date
+    'B': 18,  # Player
+    'C': 25,  # Course
+    'D': 12,  # Gross Score
+    'E': 12,  # Stableford
+    'F': 8,   # Par
+    'G': 12,  # Score to Par
+    'H': 12,  # Playing HC
+    'I': 12,  # Net Score
+    'J': 12,  # Differential
+    'K': 14,  # Weather Factor
+    'L': 25,  # Weather Conditions
+    'M': 14,  # Current Index
+    'N': 30,  # Notes
+}
+
+# Shared style objects (one instance for every data cell)
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+ROW_ALIGNMENT = Alignment(horizontal='left', vertical='center')
+
+
+def format_weather(weather_data):
+    """One-line weather description for the Weather Conditions column"""
+    return f"{weather_data['description']}, {weather_data['temperature']:.1f}°C, Wind {weather_data['wind_speed']:.0f}km/h"
+
+
+def build_rows(round_date, course_name, player_results, weather_data):
+    """Sheet rows for one round (one row per player)"""
+    weather_desc = format_weather(weather_data)
+    date_str = round_date.strftime('%Y-%m-%d')
+    return [
+        [
+            date_str,
+            result['name'],
+            course_name,
+            result['gross_score'],
+            result['stableford_points'],
+            result['par'],
+            result['score_to_par'],
+            result['playing_handicap'],
+            result['net_score'],
+            result['score_differential'],
+            result['weather_factor'],
+            weather_desc,
+            result['current_handicap_index'],
+            f"9-hole round"
+        ]
+        for result in player_results
+    ]
+
 
 class ExcelHandler:
     def __init__(self, file_path='handicaps.xlsx'):
         self.file_path = file_path
         self.workbook = None
         self.sheet = None
+        self.read_only = False
+        # Cached data rows and {player: [rows]} index, built lazily for queries
+        self._rows = None
+        self._player_rows = None
+        # {year: player stats}, computed in one pass on first get_year_stats
+        self._year_stats = None
         
     def initialize_workbook(self):
         """Create a new workbook with proper headers"""
@@ -21,116 +91,168 @@ class ExcelHandler:
         ws = wb.active
         ws.title = "Handicaps"
         
-        # Headers
-        headers = ['Date', 'Player', 'Course', 'Gross Score', 'Stableford', 'Par', 
-                   'Score to Par', 'Playing HC', 'Net Score', 'Differential', 
-                   'Weather Factor', 'Weather Conditions', 'Current Index', 'Notes']
-        
-        # Style headers
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        for col, header in enumerate(headers, start=1):
+        # Styled headers
+        for col, header in enumerate(HEADERS, start=1):
             cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
         
         # Set column widths
-        ws.column_dimensions['A'].width = 12  # Date
-        ws.column_dimensions['B'].width = 18  # Player
-        ws.column_dimensions['C'].width = 25  # Course
-        ws.column_dimensions['D'].width = 12  # Gross Score
-        ws.column_dimensions['E'].width = 12  # Stableford
-        ws.column_dimensions['F'].width = 8   # Par
-        ws.column_dimensions['G'].width = 12  # Score to Par
-        ws.column_dimensions['H'].width = 12  # Playing HC
-        ws.column_dimensions['I'].width = 12  # Net Score
-        ws.column_dimensions['J'].width = 12  # Differential
-        ws.column_dimensions['K'].width = 14  # Weather Factor
-        ws.column_dimensions['L'].width = 25  # Weather Conditions
-        ws.column_dimensions['M'].width = 14  # Current Index
-        ws.column_dimensions['N'].width = 30  # Notes
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
         
         wb.save(self.file_path)
         return wb
     
-    def load_or_create_workbook(self):
-        """Load existing workbook or create new one"""
+    def load_or_create_workbook(self, read_only=False):
+        """
+        Load existing workbook or create new one
+        read_only=True streams rows without building the full cell model (queries only)
+        """
+        self.close()
         if os.path.exists(self.file_path):
-            self.workbook = load_workbook(self.file_path)
-            self.sheet = self.workbook.active
+            self.workbook = load_workbook(self.file_path, read_only=read_only)
+            self.read_only = read_only
         else:
             self.workbook = self.initialize_workbook()
-            self.sheet = self.workbook.active
+            self.read_only = False
+        self.sheet = self.workbook.active
         
         return self.workbook
     
+    def close(self):
+        """Release the workbook (read-only workbooks hold the file open)"""
+        if self.workbook is not None and self.read_only:
+            self.workbook.close()
+        self.workbook = None
+        self.sheet = None
+        self.read_only = False
+    
+    def _ensure_writable(self):
+        """Make sure the workbook is loaded in edit mode"""
+        if not self.workbook or self.read_only:
+            self.load_or_create_workbook()
+    
+    def _invalidate_index(self):
+        self._rows = None
+        self._player_rows = None
+        self._year_stats = None
+    
+    def _build_index(self):
+        """Read every data row once and index them by player"""
+        if not self.workbook:
+            self.load_or_create_workbook(read_only=True)
+        
+        rows = []
+        player_rows = {}
+        for row in self.sheet.iter_rows(min_row=2, values_only=True):
+            rows.append(row)
+            player_name = row[1] if len(row) > 1 else None
+            if player_name:
+                player_rows.setdefault(player_name, []).append(row)
+        
+        self._rows = rows
+        self._player_rows = player_rows
+    
+    def get_rows(self):
+        """All data rows (header excluded), from the cached index"""
+        if self._rows is None:
+            self._build_index()
+        return self._rows
+    
+    def get_player_rows(self, player_name):
+        """A player's rows in sheet order, from the cached index"""
+        if self._player_rows is None:
+            self._build_index()
+        return self._player_rows.get(player_name, [])
+    
     def add_round(self, round_date, course_name, player_results, weather_data):
         """
         Add a round's results to the spreadsheet
         player_results: list of dicts from RoundAnalyzer
         weather_data: dict with weather conditions
         """
-        if not self.workbook:
-            self.load_or_create_workbook()
+        return self.add_rounds([(round_date, course_name, player_results, weather_data)])
+    
+    def add_rounds(self, rounds):
+        """
+        Append many rounds and save the workbook once
+        rounds: iterable of (round_date, course_name, player_results, weather_data)
+        Returns the number of rows added
+        """
+        self._ensure_writable()
         
         # Find the next empty row
         next_row = self.sheet.max_row + 1
+        first_row = next_row
         
-        # Format weather description
-        weather_desc = f"{weather_data['description']}, {weather_data['temperature']:.1f}°C, Wind {weather_data['wind_speed']:.0f}km/h"
-        
-        # Add each player's results
-        for result in player_results:
-            row_data = [
-                round_date.strftime('%Y-%m-%d'),
-                result['name'],
-                course_name,
-                result['gross_score'],
-                result['stableford_points'],
-                result['par'],
-                result['score_to_par'],
-                result['playing_handicap'],
-                result['net_score'],
-                result['score_differential'],
-                result['weather_factor'],
-                weather_desc,
-                result['current_handicap_index'],
-                f"9-hole round"
-            ]
-            
-            for col, value in enumerate(row_data, start=1):
-                cell = self.sheet.cell(row=next_row, column=col, value=value)
-                cell.alignment = Alignment(horizontal='left', vertical='center')
-            
-            next_row += 1
+        for round_date, course_name, player_results, weather_data in rounds:
+            for row_data in build_rows(round_date, course_name, player_results, weather_data):
+                for col, value in enumerate(row_data, start=1):
+                    cell = self.sheet.cell(row=next_row, column=col, value=value)
+                    cell.alignment = ROW_ALIGNMENT
+                next_row += 1
         
         # Save the workbook
         self.workbook.save(self.file_path)
+        self._invalidate_index()
         
-        return next_row - self.sheet.max_row - 1  # Number of rows added
+        return next_row - first_row  # Number of rows added
+    
+    def export_rounds(self, rounds, file_path=None):
+        """
+        Regenerate the whole workbook from round data (e.g. from the database)
+        Uses openpyxl write-only mode, so rows stream to disk instead of being held in memory.
+        rounds: iterable of (round_date, course_name, player_results, weather_data)
+        Returns the number of rows written
+        """
+        file_path = file_path or self.file_path
+        if file_path == self.file_path:
+            self.close()
+        
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Handicaps")
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
+        
+        header_cells = []
+        for header in HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        count = 0
+        for round_date, course_name, player_results, weather_data in rounds:
+            # Plain values: per-cell styling would cost more than the write itself
+            for row_data in build_rows(round_date, course_name, player_results, weather_data):
+                ws.append(row_data)
+                count += 1
+        
+        wb.save(file_path)
+        if file_path == self.file_path:
+            self._invalidate_index()
+        return count
     
     def get_player_history(self, player_name, num_rounds=20):
         """
         Get recent score history for a player
         Returns list of differentials for handicap calculation
         """
-        if not self.workbook:
-            self.load_or_create_workbook()
-        
         differentials = []
         weather_factors = []
         
-        # Iterate through rows (skip header)
-        for row in self.sheet.iter_rows(min_row=2, values_only=True):
-            if row[1] == player_name:  # Player name column
-                if row[8] is not None:  # Differential column
-                    differentials.append(float(row[8]))
-                    if row[9] is not None:  # Weather factor column
-                        weather_factors.append(float(row[9]))
-                    else:
-                        weather_factors.append(1.0)
+        # Only this player's rows, via the index
+        for row in self.get_player_rows(player_name):
+            if row[9] is not None:  # Differential column
+                differentials.append(float(row[9]))
+                if row[10] is not None:  # Weather factor column
+                    weather_factors.append(float(row[10]))
+                else:
+                    weather_factors.append(1.0)
         
         # Return most recent rounds
         return differentials[-num_rounds:], weather_factors[-num_rounds:]
@@ -140,52 +262,58 @@ class ExcelHandler:
         Get the most recent handicap index for each player
         Returns dict: {player_name: handicap_index}
         """
-        if not self.workbook:
-            self.load_or_create_workbook()
+        if self._player_rows is None:
+            self._build_index()
         
         latest_handicaps = {}
         
-        # Iterate through rows in reverse to get latest first
-        for row in reversed(list(self.sheet.iter_rows(min_row=2, values_only=True))):
-            player_name = row[1]
-            handicap_index = row[11]  # Current Index column
-            
-            if player_name and handicap_index is not None:
-                if player_name not in latest_handicaps:
+        # Walk each player's rows from the end; usually the last row has an index
+        for player_name, rows in self._player_rows.items():
+            for row in reversed(rows):
+                handicap_index = row[12]  # Current Index column
+                if handicap_index is not None:
                     latest_handicaps[player_name] = float(handicap_index)
+                    break
         
         return latest_handicaps
     
     def get_year_stats(self, year=None):
         """
         Get comprehensive statistics for all players for the specified year
-        Returns dict with player stats
+        Returns dict with player stats (shared memo - treat as read-only)
         """
-        if not self.workbook:
-            self.load_or_create_workbook()
-        
         if year is None:
             year = datetime.now().year
         
-        player_stats = {}
+        if self._year_stats is None:
+            self._year_stats = self._compute_year_stats()
         
-        # Iterate through all rows
-        for row in self.sheet.iter_rows(min_row=2, values_only=True):
-            date_str = row[0]
-            if not date_str:
-                continue
-            
-            # Parse date
-            if isinstance(date_str, str):
-                try:
-                    round_date = datetime.strptime(date_str, '%Y-%m-%d')
-                except:
-                    continue
-            else:
-                round_date = date_str
-            
-            # Filter by year
-            if round_date.year != year:
+        return self._year_stats.get(year, {})
+    
+    @staticmethod
+    def _parse_row_date(date_str):
+        """Date cell -> datetime, or None if blank/unparseable"""
+        if not date_str:
+            return None
+        if isinstance(date_str, str):
+            try:
+                return datetime.strptime(date_str, '%Y-%m-%d')
+            except ValueError:
+                return None
+        return date_str
+    
+    def _compute_year_stats(self):
+        """
+        One pass over the sheet building every season's player stats,
+        grouping rows by date on the way for winner detection
+        Returns {year: {player_name: stats}}
+        """
+        year_stats = {}   # year -> player -> stats
+        year_rounds = {}  # year -> date -> [(player, stableford)]
+        
+        for row in self.get_rows():
+            round_date = self._parse_row_date(row[0])
+            if round_date is None:
                 continue
             
             player_name = row[1]
@@ -194,9 +322,21 @@ class ExcelHandler:
             net_score = row[8]
             current_index = row[12]  # Current Index column
             
-            if not player_name or gross_score is None:
+            if not player_name:
                 continue
             
+            year = round_date.year
+            
+            # Group by date for winner detection (highest Stableford)
+            if stableford is not None:
+                date_key = round_date.strftime('%Y-%m-%d')
+                year_rounds.setdefault(year, {}).setdefault(date_key, []).append((player_name, stableford))
+            
+            if gross_score is None:
+                continue
+            
+            player_stats = year_stats.setdefault(year, {})
+            
             # Initialize player stats
             if player_name not in player_stats:
                 player_stats[player_name] = {
@@ -226,71 +366,38 @@ class ExcelHandler:
             if stableford and stableford > stats['best_stableford']:
                 stats['best_stableford'] = stableford
         
-        # Determine winners for each round (lowest net score)
-        round_winners = self._get_round_winners(year)
-        for winner in round_winners:
-            if winner in player_stats:
-                player_stats[winner]['games_won'] += 1
-        
-        # Calculate averages and win percentages
-        for player_name, stats in player_stats.items():
-            if stats['gross_scores']:
-                stats['avg_gross'] = round(sum(stats['gross_scores']) / len(stats['gross_scores']), 1)
-            else:
-                stats['avg_gross'] = 0
-            
-            if stats['stableford_scores']:
-                stats['avg_stableford'] = round(sum(stats['stableford_scores']) / len(stats['stableford_scores']), 1)
-            else:
-                stats['avg_stableford'] = 0
+        for year, player_stats in year_stats.items():
+            # Winner of each round
+            for winner in self._round_winners(year_rounds.get(year, {})):
+                if winner in player_stats:
+                    player_stats[winner]['games_won'] += 1
             
-            if stats['games_played'] > 0:
-                stats['win_percentage'] = round((stats['games_won'] / stats['games_played']) * 100, 1)
-            else:
-                stats['win_percentage'] = 0
+            # Calculate averages and win percentages
+            for player_name, stats in player_stats.items():
+                if stats['gross_scores']:
+                    stats['avg_gross'] = round(sum(stats['gross_scores']) / len(stats['gross_scores']), 1)
+                else:
+                    stats['avg_gross'] = 0
+                
+                if stats['stableford_scores']:
+                    stats['avg_stableford'] = round(sum(stats['stableford_scores']) / len(stats['stableford_scores']), 1)
+                else:
+                    stats['avg_stableford'] = 0
+                
+                if stats['games_played'] > 0:
+                    stats['win_percentage'] = round((stats['games_won'] / stats['games_played']) * 100, 1)
+                else:
+                    stats['win_percentage'] = 0
         
-        return player_stats
+        return year_stats
     
-    def _get_round_winners(self, year):
+    @staticmethod
+    def _round_winners(rounds):
         """
         Determine the winner of each round (highest Stableford score)
+        rounds: {date: [(player, stableford)]}
         Returns list of winner names
         """
-        if not self.workbook:
-            self.load_or_create_workbook()
-        
-        rounds = {}  # date -> [(player, net_score)]
-        
-        for row in self.sheet.iter_rows(min_row=2, values_only=True):
-            date_str = row[0]
-            if not date_str:
-                continue
-            
-            # Parse date
-            if isinstance(date_str, str):
-                try:
-                    round_date = datetime.strptime(date_str, '%Y-%m-%d')
-                except:
-                    continue
-            else:
-                round_date = date_str
-            
-            if round_date.year != year:
-                continue
-            
-            player_name = row[1]
-            stableford = row[4]  # Stableford column
-            
-            if not player_name or stableford is None:
-                continue
-            
-            date_key = round_date.strftime('%Y-%m-%d')
-            if date_key not in rounds:
-                rounds[date_key] = []
-            
-            rounds[date_key].append((player_name, stableford))
-        
-        # Find winner of each round (highest Stableford)
         winners = []
         for date_key, players in rounds.items():
             if players:
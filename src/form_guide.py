@@ -0,0 +1,277 @@
+"""
+Form Guide
+Multi-window Stableford form for every player, computed in one pass.
+
+For each player's rounds (in date order) the guide keeps running prefix sums
+of points and position-weighted points, so the average and least-squares
+trend slope of any trailing window (last 5, 10, 20 by default) is O(1) at
+every round. An exponentially weighted average is carried alongside.
+
+With numpy, every player is computed at once: scores go into one
+players x rounds matrix, the prefix sums are cumulative sums along the
+rounds axis, and each window's mean and slope at every round is a handful of
+array operations. Without numpy, RollingForm does the same per player.
+
+- summarize_forms(): latest form for every player (used by the WhatsApp summary)
+- summarize_form():  latest form for one player
+- form_series():     the same stats at every round, for charting (Lambda "form" action)
+"""
+
+from rounds_table import base_date, round_sort_key
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+    print("numpy not available - form guide computed per player")
+
+# Trailing windows (in rounds) reported for every player
+FORM_WINDOWS = (5, 10, 20)
+# Window the summary's trend arrow and "last 5" average come from
+PRIMARY_WINDOW = 5
+# EWMA smoothing: weight of the newest round
+EWMA_ALPHA = 0.3
+# Slope (points per round) needed before the trend arrow moves off ➡️
+TREND_THRESHOLD = 0.25
+
+
+def trend_emoji(slope, threshold=TREND_THRESHOLD):
+    """📈 / 📉 / ➡️ from a least-squares slope in points per round"""
+    if slope is None:
+        return "➡️"
+    if slope > threshold:
+        return "📈"
+    if slope < -threshold:
+        return "📉"
+    return "➡️"
+
+
+class RollingForm:
+    """
+    Running form for one player, fed one Stableford score at a time.
+    Prefix sums make every window's mean and slope O(1) per round.
+    """
+
+    def __init__(self, windows=FORM_WINDOWS, alpha=EWMA_ALPHA):
+        self.windows = tuple(windows)
+        self.alpha = alpha
+        self.n = 0
+        self.ewma = None
+        self.scores = []
+        # _sum_y[i] = sum of the first i scores, _sum_iy[i] = sum of position * score
+        self._sum_y = [0]
+        self._sum_iy = [0]
+
+    def add(self, points):
+        points = float(points)
+        self.scores.append(points)
+        self._sum_y.append(self._sum_y[-1] + points)
+        self._sum_iy.append(self._sum_iy[-1] + self.n * points)
+        self.n += 1
+        self.ewma = points if self.ewma is None else self.alpha * points + (1 - self.alpha) * self.ewma
+
+    def window(self, size):
+        """Mean and least-squares slope of the last `size` rounds (fewer if not played yet)"""
+        k = min(size, self.n)
+        if k == 0:
+            return {'rounds': 0, 'avg': None, 'slope': None}
+        start = self.n - k
+        sum_y = self._sum_y[self.n] - self._sum_y[start]
+        # Positions re-based to 0..k-1 inside the window
+        sum_xy = (self._sum_iy[self.n] - self._sum_iy[start]) - start * sum_y
+        slope = None
+        if k >= 3:
+            sum_x = k * (k - 1) / 2
+            sum_xx = (k - 1) * k * (2 * k - 1) / 6
+            slope = (k * sum_xy - sum_x * sum_y) / (k * sum_xx - sum_x * sum_x)
+        return {'rounds': k, 'avg': sum_y / k, 'slope': slope}
+
+    def snapshot(self):
+        """All windows plus EWMA at the current round"""
+        return {
+            'windows': {size: self.window(size) for size in self.windows},
+            'ewma': self.ewma,
+        }
+
+
+def _form_matrix(score_lists, windows, alpha):
+    """
+    Every player's form at every round in one vectorized pass
+    Returns (avg, slope, ewma): avg[size] / slope[size] are players x rounds
+    arrays (slope NaN under 3 rounds); entries past a player's last round are padding
+    """
+    lengths = np.array([len(scores) for scores in score_lists])
+    width = int(lengths.max())
+    y = np.zeros((len(score_lists), width))
+    for row, scores in enumerate(score_lists):
+        y[row, :len(scores)] = scores
+
+    # Prefix sums with a leading 0 column: sum over rounds [start, end) = cs[:, end] - cs[:, start]
+    zero = np.zeros((len(score_lists), 1))
+    cs_y = np.hstack([zero, np.cumsum(y, axis=1)])
+    cs_iy = np.hstack([zero, np.cumsum(y * np.arange(width), axis=1)])
+
+    end = np.arange(1, width + 1)
+    avg, slope = {}, {}
+    for size in windows:
+        k = np.minimum(size, end)
+        start = end - k
+        sum_y = cs_y[:, end] - cs_y[:, start]
+        # Positions re-based to 0..k-1 inside the window
+        sum_xy = (cs_iy[:, end] - cs_iy[:, start]) - start * sum_y
+        sum_x = k * (k - 1) / 2
+        sum_xx = (k - 1) * k * (2 * k - 1) / 6
+        denominator = k * sum_xx - sum_x * sum_x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            window_slope = (k * sum_xy - sum_x * sum_y) / denominator
+        window_slope[:, k < 3] = np.nan
+        avg[size] = sum_y / k
+        slope[size] = window_slope
+
+    # EWMA is a recurrence: one step per round, all players at once
+    ewma = np.empty_like(y)
+    ewma[:, 0] = y[:, 0]
+    for t in range(1, width):
+        ewma[:, t] = alpha * y[:, t] + (1 - alpha) * ewma[:, t - 1]
+    return avg, slope, ewma
+
+
+def _slope_or_none(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _latest_form(scores, windows_stats, ewma, primary):
+    """Latest form dict: every window, EWMA and the summary's keys (scores / avg / trend) for the primary window"""
+    primary_stats = windows_stats.get(primary) or _window_stats(scores, primary)
+    return {
+        'windows': windows_stats,
+        'ewma': ewma,
+        'scores': [int(s) for s in scores[-primary:]],
+        'avg': primary_stats['avg'],
+        'slope': primary_stats['slope'],
+        'trend': trend_emoji(primary_stats['slope']),
+        'rounds': len(scores),
+    }
+
+
+def _window_stats(scores, size):
+    tracker = RollingForm((size,))
+    for s in scores:
+        tracker.add(s)
+    return tracker.window(size)
+
+
+def _latest(tracker, primary=PRIMARY_WINDOW):
+    """Latest form from a RollingForm"""
+    snapshot = tracker.snapshot()
+    return _latest_form(tracker.scores, snapshot['windows'], snapshot['ewma'], primary)
+
+
+def summarize_forms(points_by_player, windows=FORM_WINDOWS, alpha=EWMA_ALPHA, primary=PRIMARY_WINDOW):
+    """{name: latest form} for every player with at least one round (scores in date order)"""
+    points_by_player = {name: [float(p) for p in points] for name, points in points_by_player.items() if points}
+    if not points_by_player:
+        return {}
+    if not NUMPY_ENABLED:
+        return {name: summarize_form(points, windows, alpha, primary) for name, points in points_by_player.items()}
+
+    windows = tuple(windows)
+    names = list(points_by_player)
+    avg, slope, ewma = _form_matrix([points_by_player[name] for name in names], windows, alpha)
+    forms = {}
+    for row, name in enumerate(names):
+        scores = points_by_player[name]
+        last = len(scores) - 1
+        windows_stats = {
+            size: {'rounds': min(size, len(scores)), 'avg': float(avg[size][row, last]),
+                   'slope': _slope_or_none(slope[size][row, last])}
+            for size in windows
+        }
+        forms[name] = _latest_form(scores, windows_stats, float(ewma[row, last]), primary)
+    return forms
+
+
+def summarize_form(points, windows=FORM_WINDOWS, alpha=EWMA_ALPHA, primary=PRIMARY_WINDOW):
+    """Latest form for one player's scores (date order), None if no rounds"""
+    tracker = RollingForm(windows, alpha)
+    for p in points:
+        tracker.add(p)
+    if tracker.n == 0:
+        return None
+    return _latest(tracker, primary)
+
+
+def player_scores(rounds, season=None):
+    """{name: [(date, stableford), ...]} in play order, optionally one season only"""
+    scores = {}
+    for round_data in sorted(rounds, key=round_sort_key):
+        date_str = base_date(round_data['date'])
+        if season is not None and date_str[:4] != str(season):
+            continue
+        for player in round_data.get('players', []):
+            scores.setdefault(player['name'], []).append((date_str, int(player['stableford'])))
+    return scores
+
+
+def _series_rolling(entries, windows, alpha):
+    """form_series entry for one player via RollingForm (no numpy)"""
+    tracker = RollingForm(windows, alpha)
+    out = {
+        'dates': [],
+        'points': [],
+        'ewma': [],
+        'windows': {size: {'avg': [], 'slope': []} for size in tracker.windows},
+    }
+    for date_str, points in entries:
+        tracker.add(points)
+        out['dates'].append(date_str)
+        out['points'].append(points)
+        out['ewma'].append(round(tracker.ewma, 2))
+        for size in tracker.windows:
+            stats = tracker.window(size)
+            out['windows'][size]['avg'].append(round(stats['avg'], 2))
+            out['windows'][size]['slope'].append(
+                round(stats['slope'], 3) if stats['slope'] is not None else None
+            )
+    out['latest'] = _latest(tracker)
+    return out
+
+
+def form_series(rounds, season=None, windows=FORM_WINDOWS, alpha=EWMA_ALPHA):
+    """
+    Per-round form series for charting
+    {name: {'dates': [...], 'points': [...], 'ewma': [...],
+            'windows': {size: {'avg': [...], 'slope': [...]}}, 'latest': {...}}}
+    """
+    windows = tuple(windows)
+    scores = player_scores(rounds, season)
+    if not scores:
+        return {}
+    if not NUMPY_ENABLED:
+        return {name: _series_rolling(entries, windows, alpha) for name, entries in scores.items()}
+
+    names = list(scores)
+    avg, slope, ewma = _form_matrix([[float(p) for _, p in scores[name]] for name in names], windows, alpha)
+    avg = {size: np.round(values, 2) for size, values in avg.items()}
+    slope = {size: np.round(values, 3) for size, values in slope.items()}
+    ewma = np.round(ewma, 2)
+    latest = summarize_forms({name: [p for _, p in entries] for name, entries in scores.items()}, windows, alpha)
+
+    series = {}
+    for row, name in enumerate(names):
+        n = len(scores[name])
+        series[name] = {
+            'dates': [d for d, _ in scores[name]],
+            'points': [p for _, p in scores[name]],
+            'ewma': ewma[row, :n].tolist(),
+            'windows': {
+                size: {
+                    'avg': avg[size][row, :n].tolist(),
+                    'slope': [None if np.isnan(v) else v for v in slope[size][row, :n].tolist()],
+                }
+                for size in windows
+            },
+            'latest': latest[name],
+        }
+    return series
@@ -1,14 +1,29 @@
 """
 Generate comprehensive end-of-season report for any year
-Usage: python generate_year_end_report.py [year]
+Usage: python generate_year_end_report.py [--group GROUP_ID] [year ...]
+       python generate_year_end_report.py [--group GROUP_ID] --all [--force]
 Example: python generate_year_end_report.py 2025
+         python generate_year_end_report.py 2023 2024 2025
+         python generate_year_end_report.py --group my-group --all
+
+Reports are written to <group_id>_<year>_season_report.txt.
+
+--all regenerates every season from a single query, one season per worker
+process, and skips seasons whose rounds haven't changed since the last run
+(tracked by input hash in year_end_cache.json). --force ignores the cache.
 """
 import boto3
+import hashlib
+import json
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from collections import defaultdict
-from decimal import Decimal
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, query_rounds
+from year_end_engine import (compute_season, compute_seasons, fetch_season_rounds, render_report, render_footer,
+                             get_display_name)
+
+CACHE_FILE = 'year_end_cache.json'
 
 try:
     from openai import OpenAI
@@ -17,288 +32,45 @@ except ImportError:
     OPENAI_ENABLED = False
     print("OpenAI library not available - AI commentary will be skipped")
 
-# Get year from command line or use current year
-if len(sys.argv) > 1:
-    year = sys.argv[1]
-else:
-    year = str(datetime.now().year - 1)  # Default to previous year
-
-# Initialize DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
-table = dynamodb.Table('golf-rounds')
-
-def parse_date(date_str):
-    """Parse date from string, handling -back9 suffix"""
-    clean_date = date_str.split('-back9')[0]
-    return datetime.strptime(clean_date, '%Y-%m-%d')
-
-def get_display_name(name):
-    """Convert database names to display names"""
-    if name == "Steve":
-        return "Steve Lewthwaite"
-    return name
-
-# Get all rounds
-response = table.scan()
-rounds = response.get('Items', [])
-
-# Filter for specified year
-rounds_year = [r for r in rounds if r['date'].startswith(str(year))]
-print(f"Analyzing {len(rounds_year)} rounds from {year}...\n")
-
-# Calculate comprehensive stats
-player_stats = defaultdict(lambda: {
-    'rounds': [],
-    'total_points': 0,
-    'best_score': 0,
-    'worst_score': 100,
-    'monthly_wins': defaultdict(int),
-    'front9_points': [],
-    'back9_points': [],
-    'winning_rounds': 0,
-    'podium_finishes': 0
-})
-
-# Process each round
-for round_data in rounds_year:
-    round_date = parse_date(round_data['date'])
-    month = round_date.strftime('%B')
-    
-    # NOTE: Database labels are BACKWARDS - "front9" in DB = Back 9 in reality, "back9" in DB = Front 9 in reality
-    course_field = round_data.get('course', 'back9')
-    is_back9_in_reality = (course_field == 'front9' or '-back9' in round_data['date'])
-    
-    # Get winner of this round
-    round_players = sorted(round_data['players'], key=lambda x: int(x['stableford']), reverse=True)
-    winner_points = int(round_players[0]['stableford']) if round_players else 0
-    
-    for rank, player in enumerate(round_players, 1):
-        name = player['name']
-        points = int(player['stableford'])
-        
-        player_stats[name]['rounds'].append({
-            'date': round_date,
-            'points': points,
-            'month': month,
-            'nine': 'back9' if is_back9_in_reality else 'front9'
-        })
-        player_stats[name]['total_points'] += points
-        player_stats[name]['best_score'] = max(player_stats[name]['best_score'], points)
-        player_stats[name]['worst_score'] = min(player_stats[name]['worst_score'], points)
-        
-        if is_back9_in_reality:
-            player_stats[name]['back9_points'].append(points)
-        else:
-            player_stats[name]['front9_points'].append(points)
-        
-        # Track wins and podiums
-        if rank == 1:
-            player_stats[name]['winning_rounds'] += 1
-            player_stats[name]['monthly_wins'][month] += 1
-        if rank <= 3:
-            player_stats[name]['podium_finishes'] += 1
-
-# Calculate averages and additional metrics
-for name, stats in player_stats.items():
-    rounds_count = len(stats['rounds'])
-    if rounds_count > 0:
-        stats['avg'] = stats['total_points'] / rounds_count
-        stats['rounds_count'] = rounds_count
-        
-        # Calculate consistency (standard deviation)
-        avg = stats['avg']
-        variance = sum((r['points'] - avg) ** 2 for r in stats['rounds']) / rounds_count
-        stats['std_dev'] = variance ** 0.5
-        
-        # Front 9 vs Back 9 performance
-        if stats['front9_points']:
-            stats['front9_avg'] = sum(stats['front9_points']) / len(stats['front9_points'])
-        if stats['back9_points']:
-            stats['back9_avg'] = sum(stats['back9_points']) / len(stats['back9_points'])
-        
-        # Calculate streaks
-        sorted_rounds = sorted(stats['rounds'], key=lambda x: x['date'])
-        current_streak = 0
-        best_streak = 0
-        prev_points = None
-        
-        for r in sorted_rounds:
-            if prev_points is None or r['points'] >= prev_points:
-                current_streak += 1
-                best_streak = max(best_streak, current_streak)
-            else:
-                current_streak = 0
-            prev_points = r['points']
-        
-        stats['best_improving_streak'] = best_streak
-        
-        # Win rate
-        stats['win_rate'] = (stats['winning_rounds'] / rounds_count * 100) if rounds_count > 0 else 0
-
-# Sort players by average
-sorted_players = sorted(
-    [(name, stats) for name, stats in player_stats.items() if stats['rounds_count'] >= 10],
-    key=lambda x: x[1]['avg'],
-    reverse=True
-)
-
-# Generate Report
-# Most consistent player (lowest std dev)
-most_consistent = min(sorted_players, key=lambda x: x[1]['std_dev'])
-
-# Best improving streak
-best_streaker = max(sorted_players, key=lambda x: x[1]['best_improving_streak'])
-
-# Most wins
-most_wins = max(sorted_players, key=lambda x: x[1]['winning_rounds'])
-
-report = f"""⛳ *{year} SEASON REVIEW*
-━ *WARRINGAH GC* ━
-
-*📊 SEASON OVERVIEW*
-```
-Total Rounds: {len(rounds_year)}
-Qualified Players: {len(sorted_players)}
-Season: Jan - Dec {year}
-```
-
-*🏅 FINAL STANDINGS*
-```
-🥇 {get_display_name(sorted_players[0][0])}
-   Average:  {sorted_players[0][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[0][1]['rounds_count']}
-   Total:    {sorted_players[0][1]['total_points']} pts
-   Best:     {sorted_players[0][1]['best_score']} pts
-   Wins:     {sorted_players[0][1]['winning_rounds']} ({sorted_players[0][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[0][1]['podium_finishes']}
-
-🥈 {get_display_name(sorted_players[1][0])}
-   Average:  {sorted_players[1][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[1][1]['rounds_count']}
-   Total:    {sorted_players[1][1]['total_points']} pts
-   Best:     {sorted_players[1][1]['best_score']} pts
-   Wins:     {sorted_players[1][1]['winning_rounds']} ({sorted_players[1][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[1][1]['podium_finishes']}
-
-🥉 {get_display_name(sorted_players[2][0])}
-   Average:  {sorted_players[2][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[2][1]['rounds_count']}
-   Total:    {sorted_players[2][1]['total_points']} pts
-   Best:     {sorted_players[2][1]['best_score']} pts
-   Wins:     {sorted_players[2][1]['winning_rounds']} ({sorted_players[2][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[2][1]['podium_finishes']}
-```
-
-*🎯 CONSISTENCY AWARD*
-```
-{get_display_name(most_consistent[0])}
-Std Dev: {most_consistent[1]['std_dev']:.2f}
-```
-
-*🔥 HOT STREAK AWARD*
-```
-{get_display_name(best_streaker[0])}
-{best_streaker[1]['best_improving_streak']} consecutive improving rounds
-```
-
-*🏆 MOST ROUND WINS*
-```
-{get_display_name(most_wins[0])}
-{most_wins[1]['winning_rounds']} victories ({most_wins[1]['win_rate']:.1f}% win rate)
-```
-
-*📅 MONTHLY DOMINANCE*
-```
-"""
 
-months = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-monthly_rounds = defaultdict(int)
-for round_data in rounds_year:
-    month = parse_date(round_data['date']).strftime('%B')
-    monthly_rounds[month] += 1
-
-for month in months:
-    if monthly_rounds[month] > 0:
-        # Find who won most in this month
-        month_leaders = [(name, stats['monthly_wins'][month]) for name, stats in player_stats.items() if stats['monthly_wins'][month] > 0]
-        if month_leaders:
-            month_leaders.sort(key=lambda x: x[1], reverse=True)
-            top_winner = month_leaders[0]
-            if top_winner[1] > 0:
-                winner_first_name = get_display_name(top_winner[0]).split()[0]
-                report += f"{month[:3]}: {winner_first_name} ({top_winner[1]} wins)\n"
-
-report += "```\n\n"
-
-# Fun facts
-report += f"*🎲 SEASON HIGHLIGHTS*\n```\n"
-
-# Highest single round
-highest_round = max(
-    [(name, max(stats['rounds'], key=lambda x: x['points'])) for name, stats in player_stats.items() if stats['rounds']],
-    key=lambda x: x[1]['points']
-)
-report += f"🌟 Best Round:\n"
-report += f"   {get_display_name(highest_round[0])}\n"
-report += f"   {highest_round[1]['points']} pts on {highest_round[1]['date'].strftime('%b %d')}\n\n"
-
-# Most rounds played
-most_active = max(sorted_players, key=lambda x: x[1]['rounds_count'])
-report += f"💪 Most Active:\n"
-report += f"   {get_display_name(most_active[0])}\n"
-report += f"   {most_active[1]['rounds_count']} rounds played\n\n"
-
-# Biggest improvement
-for name, stats in sorted_players:
-    recent_5 = stats['rounds'][-5:] if len(stats['rounds']) >= 5 else []
-    early_5 = stats['rounds'][:5] if len(stats['rounds']) >= 5 else []
-    if recent_5 and early_5:
-        recent_avg = sum(r['points'] for r in recent_5) / len(recent_5)
-        early_avg = sum(r['points'] for r in early_5) / len(early_5)
-        stats['improvement'] = recent_avg - early_avg
-
-if any('improvement' in stats for name, stats in sorted_players):
-    most_improved = max([(name, stats) for name, stats in sorted_players if 'improvement' in stats], key=lambda x: x[1]['improvement'])
-    if most_improved[1]['improvement'] > 0:
-        report += f"📈 Most Improved:\n"
-        report += f"   {get_display_name(most_improved[0])}\n"
-        report += f"   +{most_improved[1]['improvement']:.1f} pts improvement\n"
-
-report += "```\n\n"
-report += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-report += f"*THANK YOU FOR AN AMAZING*\n"
-report += f"*{year} SEASON! 🏆*\n"
-report += f"*SEE YOU IN {int(year)+1}! ⛳*\n"
-report += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-
-# Generate AI commentary
-if OPENAI_ENABLED:
+def generate_ai_commentary(summary):
+    """Short roast & toast for the season (None if unavailable)"""
+    if not OPENAI_ENABLED:
+        print("⚠️  OpenAI library not available - skipping AI commentary")
+        return None
+
     api_key = os.environ.get('OPENAI_API_KEY')
-    if api_key:
-        try:
-            print("\nGenerating AI commentary...")
-            
-            # Build context for AI
-            champion = sorted_players[0]
-            runner_up = sorted_players[1]
-            third_place = sorted_players[2]
-            
-            # Build player summary
-            player_summary = f"""
-SEASON CHAMPION: {get_display_name(champion[0])} - {champion[1]['avg']:.2f} avg, {champion[1]['winning_rounds']} wins
-RUNNER-UP: {get_display_name(runner_up[0])} - {runner_up[1]['avg']:.2f} avg, {runner_up[1]['winning_rounds']} wins
-THIRD PLACE: {get_display_name(third_place[0])} - {third_place[1]['avg']:.2f} avg, {third_place[1]['winning_rounds']} wins
-
-TOTAL ROUNDS: {len(rounds_year)}
+    if not api_key:
+        print("⚠️  OpenAI API key not configured - skipping AI commentary")
+        return None
+
+    year = summary['year']
+    sorted_players = summary['standings']
+    most_active = summary['most_active']
+    most_consistent = summary['most_consistent']
+    best_streaker = summary['best_streaker']
+    most_improved = summary['most_improved']
+
+    try:
+        print("\nGenerating AI commentary...")
+
+        # Build player summary
+        places = ['SEASON CHAMPION', 'RUNNER-UP', 'THIRD PLACE']
+        player_summary = "\n"
+        for place, (name, stats) in zip(places, sorted_players):
+            player_summary += f"{place}: {get_display_name(name)} - {stats['avg']:.2f} avg, {stats['winning_rounds']} wins\n"
+
+        player_summary += f"""
+TOTAL ROUNDS: {summary['total_rounds']}
 MOST ACTIVE: {get_display_name(most_active[0])} ({most_active[1]['rounds_count']} rounds)
 MOST CONSISTENT: {get_display_name(most_consistent[0])} (Std Dev: {most_consistent[1]['std_dev']:.2f})
 HOT STREAK: {get_display_name(best_streaker[0])} ({best_streaker[1]['best_improving_streak']} consecutive improving rounds)
 """
-            
-            if 'improvement' in most_improved[1]:
-                player_summary += f"MOST IMPROVED: {get_display_name(most_improved[0])} (+{most_improved[1]['improvement']:.1f} pts)\n"
-            
-            prompt = f"""You are reviewing the {year} golf season at Warringah Golf Club. Write a humorous, insightful year-end commentary about the season.
+
+        if most_improved:
+            player_summary += f"MOST IMPROVED: {get_display_name(most_improved[0])} (+{most_improved[1]['improvement']:.1f} pts)\n"
+
+        prompt = f"""You are reviewing the {year} golf season at Warringah Golf Club. Write a humorous, insightful year-end commentary about the season.
 
 {player_summary}
 
@@ -316,36 +88,163 @@ Write 3-4 sentences that:
 
 Be witty, respectful, and fun. This is for a friendly group chat."""
 
-            client = OpenAI(api_key=api_key)
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a witty golf commentator writing a year-end review. Be humorous but respectful. CRITICAL: Only Andy Jakes and Fletcher Jakes are related (father-son). Everyone else are just friends."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.8,
-                timeout=15
-            )
-            
-            commentary = response.choices[0].message.content.strip()
-            
-            # Add AI commentary to report
-            report += f"\n*🎭 AI ROAST & TOAST:*\n```\n{commentary}\n```\n"
-            print("✅ AI commentary generated")
-            
-        except Exception as e:
-            print(f"⚠️  Could not generate AI commentary: {e}")
-    else:
-        print("⚠️  OpenAI API key not configured - skipping AI commentary")
-else:
-    print("⚠️  OpenAI library not available - skipping AI commentary")
-
-print(report)
-
-# Save to file
-with open(f'{year}_season_report.txt', 'w', encoding='utf-8') as f:
-    f.write(report)
-
-print(f"\n✅ Report saved to: {year}_season_report.txt")
+        client = OpenAI(api_key=api_key)
+
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a witty golf commentator writing a year-end review. Be humorous but respectful. CRITICAL: Only Andy Jakes and Fletcher Jakes are related (father-son). Everyone else are just friends."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=0.8,
+            timeout=15
+        )
+
+        commentary = response.choices[0].message.content.strip()
+        print("✅ AI commentary generated")
+        return commentary
+
+    except Exception as e:
+        print(f"⚠️  Could not generate AI commentary: {e}")
+        return None
+
+
+def build_report(summary):
+    """Full text report for one season"""
+    report = render_report(summary)
+    report += render_footer(summary['year'])
+
+    commentary = generate_ai_commentary(summary)
+    if commentary:
+        report += f"\n*🎭 AI ROAST & TOAST:*\n```\n{commentary}\n```\n"
+    return report
+
+
+def report_filename(year, group_id=DEFAULT_GROUP_ID):
+    return f'{group_id}_{year}_season_report.txt'
+
+
+def season_input_hash(rounds):
+    """Stable hash of a season's rounds - changes whenever any round is edited"""
+    canonical = json.dumps(rounds, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def load_cache(path=CACHE_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def build_season_report(year, rounds):
+    """Worker job: full report for one season (None if nobody qualified)"""
+    summary = compute_season(rounds, year)
+    if not summary or not summary['standings']:
+        return None
+    return build_report(summary)
+
+
+def run_all_seasons(table, group_id=DEFAULT_GROUP_ID, force=False, max_workers=None):
+    """
+    Regenerate every season's report: one Query for the whole group,
+    rounds partitioned by season, changed seasons built in a process pool
+    """
+    rounds = query_rounds(table, group_id)
+    by_season = {}
+    for round_data in rounds:
+        by_season.setdefault(round_data['date'][:4], []).append(round_data)
+    print(f"Fetched {len(rounds)} rounds across {len(by_season)} seasons")
+
+    cache = load_cache()
+    group_cache = cache.setdefault(group_id, {})
+
+    jobs = {}
+    for year, season_rounds in sorted(by_season.items()):
+        input_hash = season_input_hash(season_rounds)
+        if not force and group_cache.get(year) == input_hash and os.path.exists(report_filename(year, group_id)):
+            print(f"⏭️  {year}: unchanged, skipping")
+            continue
+        jobs[year] = (season_rounds, input_hash)
+
+    if not jobs:
+        print("✅ All season reports are up to date")
+        return []
+
+    written = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {year: pool.submit(build_season_report, year, season_rounds)
+                   for year, (season_rounds, _) in jobs.items()}
+        for year, future in futures.items():
+            report = future.result()
+            if report is None:
+                print(f"⚠️  {year}: no qualified players (10+ rounds)")
+            else:
+                with open(report_filename(year, group_id), 'w', encoding='utf-8') as f:
+                    f.write(report)
+                written.append(year)
+                print(f"✅ {year}: report saved to {report_filename(year, group_id)}")
+            group_cache[year] = jobs[year][1]
+
+    save_cache(cache)
+    return written
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    group_id = DEFAULT_GROUP_ID
+    if '--group' in argv:
+        at = argv.index('--group')
+        if at + 1 >= len(argv):
+            print("--group needs a group_id")
+            sys.exit(1)
+        group_id = argv[at + 1]
+        del argv[at:at + 2]
+    flags = {a for a in argv if a.startswith('--')}
+    years = [a for a in argv if not a.startswith('--')]
+
+    if '--all' in flags:
+        dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
+        run_all_seasons(dynamodb.Table(TABLE_NAME), group_id, force='--force' in flags)
+        return
+
+    # Years from command line, default to previous year
+    years = years or [str(datetime.now().year - 1)]
+
+    # Initialize DynamoDB
+    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
+    table = dynamodb.Table(TABLE_NAME)
+
+    # One Query per season prefix, then a single aggregation pass over all of them
+    rounds = fetch_season_rounds(table, group_id, years)
+    seasons = compute_seasons(rounds, years)
+
+    for year in years:
+        summary = seasons.get(str(year))
+        if not summary:
+            print(f"No rounds found for {year}")
+            continue
+
+        print(f"Analyzing {summary['total_rounds']} rounds from {year}...\n")
+        if not summary['standings']:
+            print(f"No qualified players (10+ rounds) for {year}")
+            continue
+
+        report = build_report(summary)
+        print(report)
+
+        # Save to file
+        with open(report_filename(year, group_id), 'w', encoding='utf-8') as f:
+            f.write(report)
+
+        print(f"\n✅ Report saved to: {report_filename(year, group_id)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,46 +2,42 @@
 Golf Handicap and Stableford Scoring System
 Processes golf rounds and generates statistics, Excel export, and WhatsApp summary
 """
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import boto3
 import urllib3
 from decimal import Decimal
 import json
-from handicap import HandicapCalculator
+import sys
+import xlsxwriter
+from handicap import WHS_TABLE, WHS_WINDOW, WHS_ADJUSTMENT
+from course_registry import get_nine, real_nine_label
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, query_rounds, iter_rounds
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# AWS setup
+# AWS setup (lazy, so the analysis functions can be imported without credentials)
 import os
-from load_credentials import load_credentials
 
-load_credentials()
+_table = None
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
-table = dynamodb.Table('golf-rounds')
 
-# Course configurations
-# NOTE: Labels in database are BACKWARDS - "front9" in DB = Back 9 in reality
-BACK_9_CONFIG = {
-    'name': 'Back 9 (Holes 10-18)',
-    'par': 70,
-    'slope': 101,
-    'rating': 33.5,  # This is what's stored as "front9" in DB
-    'hcp_allocations': [8, 9, 18, 6, 17, 3, 14, 12, 2],
-}
-
-FRONT_9_CONFIG = {
-    'name': 'Front 9 (Holes 1-9)',
-    'par': 69,
-    'slope': 101,
-    'rating': 17.5,  # 35.0 / 2 (18-hole rating / 2)
-    'hcp_allocations': [15, 3, 7, 10, 16, 1, 13, 5, 11],
-}
+def get_table():
+    """DynamoDB rounds table, connecting on first use"""
+    global _table
+    if _table is None:
+        from load_credentials import load_credentials
+        load_credentials()
+        dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2', verify=False)
+        _table = dynamodb.Table(TABLE_NAME)
+    return _table
 
+# Course configurations (loaded from courses.json via the course registry)
+# NOTE: Labels in database are BACKWARDS - "front9" in DB = Back 9 in reality
 COURSE_CONFIGS = {
-    'back9': FRONT_9_CONFIG,  # Swapped! DB says "front9" but it's really back 9
-    'front9': BACK_9_CONFIG,  # Swapped! DB says "back9" but it's really front 9
+    label: get_nine(real_nine_label(label))
+    for label in ('front9', 'back9')
 }
 
 # Players to track (exclude Eddie, Jo W., Mark, Julian)
@@ -74,49 +70,75 @@ def calculate_course_handicap(index, slope, rating, par):
     ch = round(float(index) * slope / 113)
     return max(0, ch)
 
+# Number of differentials used for 0..20 rounds in the window (0 = no index yet)
+WHS_N = np.array([WHS_TABLE.get(n, 0) for n in range(WHS_WINDOW + 1)])
+
+
+def calculate_handicap_timeline(df):
+    """
+    Handicap index after every round for every player, computed for the whole frame at once
+    Treats 9-hole rounds as 18-hole equivalents (doubles gross and rating)
+    Returns a DataFrame (one row per round, ordered by Player then Date) with
+    Date, Player, Differential, Rounds (scores in the 20-round window) and Index
+    (NaN until a player has 3 scores)
+    """
+    timeline = df[['Date', 'Player', 'Gross', 'Rating', 'Slope']].sort_values(
+        ['Player', 'Date'], kind='mergesort'
+    ).reset_index(drop=True)
+    
+    # Differential = (Adjusted Gross Score - Course Rating) × (113 / Slope), 18-hole equivalent
+    diffs = ((timeline['Gross'] * 2 - timeline['Rating'] * 2) * (113 / timeline['Slope'])).round(1).to_numpy(dtype=float)
+    position = timeline.groupby('Player', sort=False).cumcount().to_numpy()
+    
+    # Row i, column k = the player's differential k rounds ago (NaN before their first round)
+    window = np.full((len(timeline), WHS_WINDOW), np.nan)
+    for k in range(WHS_WINDOW):
+        window[k:, k] = diffs[:len(diffs) - k]
+        window[position < k, k] = np.nan
+    
+    # Best-N of the window: sort each row (NaN last), cumulative sums give every best-N total
+    window.sort(axis=1)
+    best_totals = np.cumsum(np.nan_to_num(window), axis=1)
+    
+    rounds_in_window = np.minimum(position + 1, WHS_WINDOW)
+    num_to_use = WHS_N[rounds_in_window]
+    has_index = num_to_use > 0
+    
+    index = np.full(len(timeline), np.nan)
+    rows = np.nonzero(has_index)[0]
+    index[rows] = best_totals[rows, num_to_use[rows] - 1] / num_to_use[rows] * WHS_ADJUSTMENT
+    
+    timeline['Differential'] = diffs
+    timeline['Rounds'] = rounds_in_window
+    timeline['Index'] = np.round(index, 1)
+    return timeline[['Date', 'Player', 'Differential', 'Rounds', 'Index']]
+
+
 def calculate_handicap_indices(df):
     """
     Calculate handicap indices for all players using WHS method
     Treats 9-hole rounds as 18-hole equivalents (doubles gross and rating)
     Returns a dict with player names as keys and their calculated index as values
     """
-    hc_calc = HandicapCalculator()
-    player_indices = {}
-    
-    for player_name in df['Player'].unique():
-        player_df = df[df['Player'] == player_name].sort_values('Date')
-        
-        # Calculate differentials treating 9-hole as 18-hole equivalent
-        differentials = []
-        for _, row in player_df.iterrows():
-            # Double the 9-hole values to get 18-hole equivalents
-            gross_18 = row['Gross'] * 2
-            rating_18 = row['Rating'] * 2
-            
-            # Differential = (Adjusted Gross Score - Course Rating) × (113 / Slope)
-            differential = (gross_18 - rating_18) * (113 / row['Slope'])
-            differentials.append(round(differential, 1))
-        
-        # Calculate index using best differentials (WHS method)
-        calculated_index = hc_calc.update_handicap_index(0, differentials)
-        player_indices[player_name] = calculated_index
-    
-    return player_indices
+    timeline = calculate_handicap_timeline(df)
+    latest = timeline.groupby('Player', sort=False)['Index'].last()
+    latest = latest.reindex(df['Player'].unique()).fillna(0)
+    return {player: float(index) for player, index in latest.items()}
 
-def fetch_rounds_from_db():
-    """Fetch all rounds from DynamoDB"""
+def fetch_rounds_from_db(group_id=DEFAULT_GROUP_ID):
+    """Fetch all rounds for one group from DynamoDB"""
     try:
-        response = table.scan()
-        items = response.get('Items', [])
-        return items
+        return query_rounds(get_table(), group_id)
     except Exception as e:
         print(f"Error fetching from DB: {e}")
         return []
 
 def process_rounds(rounds_data):
     """Process rounds into a format for analysis"""
-    all_records = []
-    
+    return list(iter_records(rounds_data))
+
+def iter_records(rounds_data):
+    """Yield one analysis record per tracked player per round (works on any round iterator)"""
     for round_data in rounds_data:
         date = round_data['date']
         course = round_data['course']
@@ -135,7 +157,8 @@ def process_rounds(rounds_data):
             
             ch = calculate_course_handicap(index, config['slope'], config['rating'], config['par'])
             
-            all_records.append({
+            yield {
+                'Group': round_data.get('group_id', DEFAULT_GROUP_ID),
                 'Date': date,
                 'Player': name,
                 'Index': index,
@@ -146,9 +169,7 @@ def process_rounds(rounds_data):
                 'Slope': config['slope'],
                 'Rating': config['rating'],
                 'Course': course,
-            })
-    
-    return all_records
+            }
 
 def generate_console_stats(df):
     """Generate console statistics"""
@@ -222,6 +243,144 @@ def generate_excel_export(df):
     print(f"[+] Excel file generated: {filename}")
     return filename
 
+def season_player_table(df):
+    """
+    Per-player season aggregates in one groupby pass
+    Columns: rounds, total_points, avg_stab, latest_index, latest_course, best_stab, best_gross
+    Rows follow first appearance of each player in df
+    """
+    ordered = df.sort_values(['Player', 'Date'], kind='mergesort').reset_index(drop=True)
+    grouped = ordered.groupby('Player', sort=False)
+    
+    table = grouped.agg(
+        rounds=('Stableford', 'size'),
+        total_points=('Stableford', 'sum'),
+        avg_stab=('Stableford', 'mean'),
+        latest_index=('Index', 'last'),
+        latest_course=('Course', 'last'),
+    )
+    
+    # Best stableford (earliest if tied) and the gross from that same round
+    best_rows = ordered.loc[grouped['Stableford'].idxmax(), ['Player', 'Stableford', 'Gross']].set_index('Player')
+    table['best_stab'] = best_rows['Stableford']
+    table['best_gross'] = best_rows['Gross']
+    
+    # If best gross is 0 (data issue), fall back to the best actual gross score
+    valid_gross = ordered[ordered['Gross'] > 0].groupby('Player', sort=False)['Gross'].min()
+    missing = table['best_gross'] == 0
+    table.loc[missing, 'best_gross'] = valid_gross.reindex(table.index[missing]).fillna(0)
+    
+    return table.reindex(df['Player'].unique())
+
+# Streaming export layout (shared by every season and player sheet)
+STREAM_EXPORT_COLUMNS = ['Date', 'Player', 'Index', 'CH', 'Gross', 'Stableford', 'Par', 'Slope', 'Rating', 'Course', 'Group']
+STREAM_EXPORT_WIDTHS = [12, 20, 10, 8, 8, 10, 6, 8, 8, 10, 20]
+
+def iter_group_rounds(group_ids):
+    """Yield rounds for each group straight from paginated Query results"""
+    for group_id in group_ids:
+        yield from iter_rounds(get_table(), group_id)
+
+# Player sheets per workbook: constant_memory keeps one temp file open per sheet
+# until the workbook closes, so this bounds open files (macOS defaults to 256)
+PLAYER_SHEETS_PER_WORKBOOK = 100
+
+def _sheet_name(name, used):
+    """
+    Excel sheet name for name: max 31 chars, no []:*?/\\, unique within used
+    (Excel compares case-insensitively); the chosen name is added to used
+    """
+    for ch in '[]:*?/\\':
+        name = name.replace(ch, '-')
+    candidate = name[:31]
+    n = 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f"~{n}"
+        candidate = name[:31 - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+def _stream_workbook(filename):
+    """constant_memory workbook plus the header format every export sheet uses"""
+    workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4472C4',
+        'font_color': 'white',
+        'border': 1
+    })
+    return workbook, header_format
+
+def _add_stream_sheet(workbook, name, header_format):
+    worksheet = workbook.add_worksheet(name)
+    for col, width in enumerate(STREAM_EXPORT_WIDTHS):
+        worksheet.set_column(col, col, width)
+    worksheet.write_row(0, 0, STREAM_EXPORT_COLUMNS, header_format)
+    return [worksheet, 1]
+
+def generate_streaming_excel_export(records, filename='golf_all_seasons.xlsx'):
+    """
+    Stream records into a workbook with one sheet per season, plus player
+    workbooks (<filename>_players_NN.xlsx) with one sheet per player
+    
+    Uses xlsxwriter constant_memory mode: each row is flushed to disk as soon as
+    the next one starts, so memory stays flat whatever the history size. Rows
+    for the player sheets are spooled to a temp file on the way through, then
+    written PLAYER_SHEETS_PER_WORKBOOK players at a time so the number of open
+    files stays bounded however many players there are.
+    records must arrive in date order (as iter_rounds returns them)
+    Returns the list of files written (season workbook first)
+    """
+    import tempfile
+    
+    workbook, header_format = _stream_workbook(filename)
+    season_sheets = {}  # sheet name -> [worksheet, next row]
+    player_sheet_names = {}  # player -> sheet name, in first-appearance order
+    used_names = set()
+    
+    count = 0
+    with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as spool:
+        for record in records:
+            row = [record[col] for col in STREAM_EXPORT_COLUMNS]
+            name = f"Season {record['Date'][:4]}"
+            entry = season_sheets.get(name)
+            if entry is None:
+                entry = season_sheets[name] = _add_stream_sheet(workbook, name, header_format)
+            entry[0].write_row(entry[1], 0, row)
+            entry[1] += 1
+            
+            player = record['Player']
+            if player not in player_sheet_names:
+                player_sheet_names[player] = _sheet_name(player, used_names)
+            spool.write(json.dumps([player, row], default=float) + '\n')
+            count += 1
+        workbook.close()
+        files = [filename]
+        
+        # One re-read of the spool per player workbook
+        players = list(player_sheet_names)
+        stem = filename[:-len('.xlsx')] if filename.endswith('.xlsx') else filename
+        for chunk_start in range(0, len(players), PLAYER_SHEETS_PER_WORKBOOK):
+            chunk = players[chunk_start:chunk_start + PLAYER_SHEETS_PER_WORKBOOK]
+            chunk_file = f"{stem}_players_{chunk_start // PLAYER_SHEETS_PER_WORKBOOK + 1:02d}.xlsx"
+            workbook, header_format = _stream_workbook(chunk_file)
+            sheets = {player: _add_stream_sheet(workbook, player_sheet_names[player], header_format)
+                      for player in chunk}
+            spool.seek(0)
+            for line in spool:
+                player, row = json.loads(line)
+                entry = sheets.get(player)
+                if entry is not None:
+                    entry[0].write_row(entry[1], 0, row)
+                    entry[1] += 1
+            workbook.close()
+            files.append(chunk_file)
+    
+    print(f"[+] Streaming Excel export: {count} rows, {len(season_sheets)} season sheets -> {filename}, "
+          f"{len(players)} player sheets in {len(files) - 1} workbook(s)")
+    return files
+
 def generate_whatsapp_summary(df, calculated_indices):
     """Generate WhatsApp formatted summary"""
     # Get latest round
@@ -246,43 +405,27 @@ def generate_whatsapp_summary(df, calculated_indices):
     # Season leaderboard with CALCULATED stats
     summary += "\n2025 SEASON LEADERBOARD:\n\n"
     
-    # Group by player and calculate stats properly
+    # One grouped pass for every player's season stats
+    player_table = season_player_table(df)
+    
     player_stats = []
-    for player_name in df['Player'].unique():
-        player_df = df[df['Player'] == player_name].sort_values('Date')
-        
+    for player_name, row in player_table.iterrows():
         # Use CALCULATED index from WHS algorithm
-        index = calculated_indices.get(player_name, player_df['Index'].iloc[-1])
+        index = calculated_indices.get(player_name, row['latest_index'])
         
         # Recalculate CH with calculated index
-        latest_course = player_df['Course'].iloc[-1]
-        config = COURSE_CONFIGS[latest_course]
+        config = COURSE_CONFIGS[row['latest_course']]
         ch = calculate_course_handicap(index, config['slope'], config['rating'], config['par'])
         
-        rounds = len(player_df)
-        total_points = int(player_df['Stableford'].sum())
-        avg_stab = player_df['Stableford'].mean()
-        
-        # Best stableford and associated gross
-        best_idx = player_df['Stableford'].idxmax()
-        best_stab = int(player_df.loc[best_idx, 'Stableford'])
-        best_gross = int(player_df.loc[best_idx, 'Gross'])
-        
-        # If best gross is 0 (data issue), find the best actual gross score
-        if best_gross == 0:
-            valid_gross = player_df[player_df['Gross'] > 0]['Gross']
-            if len(valid_gross) > 0:
-                best_gross = int(valid_gross.min())
-        
         player_stats.append({
             'name': player_name,
             'index': index,
             'ch': ch,
-            'rounds': rounds,
-            'total_points': total_points,
-            'avg_stab': avg_stab,
-            'best_stab': best_stab,
-            'best_gross': best_gross
+            'rounds': int(row['rounds']),
+            'total_points': int(row['total_points']),
+            'avg_stab': row['avg_stab'],
+            'best_stab': int(row['best_stab']),
+            'best_gross': int(row['best_gross'])
         })
     
     # Sort by average stableford
@@ -296,6 +439,13 @@ def generate_whatsapp_summary(df, calculated_indices):
 
 # Main execution
 if __name__ == '__main__':
+    # Streaming mode: python golf_system.py --stream [group_id ...]
+    if '--stream' in sys.argv:
+        group_ids = [a for a in sys.argv[1:] if not a.startswith('--')] or [DEFAULT_GROUP_ID]
+        print(f"[*] Streaming Excel export for {', '.join(group_ids)}...")
+        generate_streaming_excel_export(iter_records(iter_group_rounds(group_ids)))
+        sys.exit(0)
+    
     print("[*] Fetching golf rounds from DynamoDB...")
     rounds_data = fetch_rounds_from_db()
     print(f"[+] Fetched {len(rounds_data)} rounds")
@@ -320,6 +470,10 @@ if __name__ == '__main__':
     print("[*] Generating Excel export...")
     generate_excel_export(df)
     
+    print("[*] Generating columnar export...")
+    from columnar_export import export_rounds_columnar
+    export_rounds_columnar(rounds_data)
+    
     print("[*] Generating WhatsApp summary...")
     summary = generate_whatsapp_summary(df, calculated_indices)
     
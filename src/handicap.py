@@ -5,6 +5,21 @@ Implements 9-hole handicap calculation with weather adjustments
 
 from datetime import datetime
 
+# WHS lookup table: number of differentials to use based on rounds available
+# Reference: World Handicap System Rules of Handicapping
+WHS_TABLE = {
+    3: 1, 4: 1, 5: 1,
+    6: 2, 7: 2, 8: 2,
+    9: 3, 10: 3, 11: 3,
+    12: 4, 13: 4, 14: 4,
+    15: 5, 16: 5,
+    17: 6, 18: 6,
+    19: 7,
+    20: 8
+}
+WHS_WINDOW = 20
+WHS_ADJUSTMENT = 0.96
+
 
 class HandicapCalculator:
     def __init__(self):
@@ -136,26 +151,14 @@ class HandicapCalculator:
             adjusted_differentials = score_differentials
         
         # WHS: Use only the LAST 20 differentials (rolling window)
-        last_20 = adjusted_differentials[-20:] if len(adjusted_differentials) > 20 else adjusted_differentials
+        last_20 = adjusted_differentials[-WHS_WINDOW:]
         num_scores = len(last_20)
         
         if num_scores < 3:
             # Not enough scores, return current index
             return current_index
         
-        # WHS lookup table: number of differentials to use based on rounds available
-        # Reference: World Handicap System Rules of Handicapping
-        whs_table = {
-            3: 1, 4: 1, 5: 1,
-            6: 2, 7: 2, 8: 2,
-            9: 3, 10: 3, 11: 3,
-            12: 4, 13: 4, 14: 4,
-            15: 5, 16: 5,
-            17: 6, 18: 6,
-            19: 7,
-            20: 8
-        }
-        num_to_use = whs_table.get(num_scores, 8)
+        num_to_use = WHS_TABLE.get(num_scores, 8)
         
         # Sort last 20 and take best (lowest) differentials
         sorted_diffs = sorted(last_20)
@@ -165,7 +168,7 @@ class HandicapCalculator:
         new_index = sum(best_diffs) / len(best_diffs)
         
         # Apply adjustment (96% of average per WHS)
-        new_index = new_index * 0.96
+        new_index = new_index * WHS_ADJUSTMENT
         
         # Apply WHS Hard Cap and Soft Cap
         if low_handicap_index is not None:
@@ -0,0 +1,361 @@
+"""
+Handicap Window
+Per-player WHS differential windows, cached for the what-if simulator.
+
+For every player the window keeps what the index depends on: the last 20
+handicap-eligible differentials and the (date, index) history of the last
+365 days for the Low Handicap Index. It is stored as one aggregate item per
+group (round_key "META#windows"), kept warm in the Lambda container, and
+extended by add_round, so a simulation never reads the rounds themselves.
+The item carries a version and every write is conditional on it, as the
+head-to-head seasons are, so concurrent add_rounds re-read and retry
+instead of overwriting each other.
+
+Differentials use the same 9-hole -> 18-hole formula and single slope /
+rating as generate_whatsapp_summary (the nine of the group's latest round).
+
+Usage:
+    python handicap_window.py [group_id]     # rebuild windows from history
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr
+
+from course_registry import display_course_handicap, get_nine, nine_for_round
+from handicap import HandicapCalculator, WHS_WINDOW
+from rounds_table import DEFAULT_GROUP_ID, META_PREFIX, TABLE_NAME, base_date, query_rounds, round_sort_key
+
+WINDOWS_KEY = f"{META_PREFIX}windows"
+
+# Days of index history behind the Low Handicap Index
+LHI_DAYS = 365
+# Seconds a warm container trusts its copy before re-reading the item
+WINDOW_CACHE_TTL = 60
+# Read-apply-write attempts before add_round gives up (run a rebuild to fix)
+SAVE_ATTEMPTS = 5
+# Gross range searched for "what do I need to shoot" (9 holes)
+GROSS_MIN = 20
+GROSS_MAX = 90
+# Highest believable score on one hole of a card (0 / None is a blob)
+HOLE_SCORE_MAX = 15
+# Differentials needed before a player has an index
+MIN_DIFFERENTIALS = 3
+# Per-hole cap before a player has an index (WHS: par + 5)
+NO_INDEX_HOLE_CAP = 5
+
+_hc_calc = HandicapCalculator()
+
+# Warm-container cache: group_id -> (loaded_at, windows)
+_warm_windows = {}
+
+
+def differential(gross, nine, pcc=0):
+    """9-hole gross -> 18-hole-equivalent differential less the day's PCC, as in calculate_player_handicap_index"""
+    return round((gross * 2 - nine['rating'] * 2 - pcc) * (113 / nine['slope']), 1)
+
+
+def _index(differentials, low_index=None):
+    return _hc_calc.update_handicap_index(0, differentials, low_handicap_index=low_index)
+
+
+def _low_index(history, as_of):
+    """Lowest index recorded in the LHI_DAYS before as_of (None if none)"""
+    cutoff = (as_of - timedelta(days=LHI_DAYS)).strftime('%Y-%m-%d')
+    recent = [index for date_str, index in history if date_str >= cutoff]
+    return min(recent) if recent else None
+
+
+def _record(history, date_str, differentials):
+    """Add the index after a round to the LHI history (no index until MIN_DIFFERENTIALS)"""
+    if len(differentials) >= MIN_DIFFERENTIALS:
+        history.append([date_str, _index(differentials)])
+
+
+def _new_player():
+    return {'differentials': [], 'history': [], 'last_date': ''}
+
+
+def _apply_round(windows, round_data):
+    if not round_data.get('handicap_eligible', True):
+        return
+    nine = get_nine(windows['nine'])
+    date_str = base_date(round_data['date'])
+    pcc = int(round_data.get('pcc', 0) or 0)
+    for player in round_data.get('players', []):
+        gross = int(player.get('gross', 0) or 0)
+        if gross <= 0:
+            continue
+        window = windows['players'].setdefault(player['name'], _new_player())
+        window['differentials'] = (window['differentials'] + [differential(gross, nine, pcc)])[-WHS_WINDOW:]
+        _record(window['history'], date_str, window['differentials'])
+        window['last_date'] = date_str
+    windows['last_date'] = max(windows['last_date'], date_str)
+
+
+def _prune(windows):
+    """Drop index history the LHI can no longer use"""
+    if not windows['last_date']:
+        return
+    cutoff = (datetime.strptime(windows['last_date'], '%Y-%m-%d') - timedelta(days=LHI_DAYS)).strftime('%Y-%m-%d')
+    for window in windows['players'].values():
+        window['history'] = [entry for entry in window['history'] if entry[0] >= cutoff]
+
+
+def build_windows(rounds):
+    """One pass over a group's rounds -> windows for every player"""
+    rounds = sorted(rounds, key=round_sort_key)
+    nine_label = nine_for_round(rounds[-1])['label'] if rounds else 'back9'
+    windows = {'nine': nine_label, 'players': {}, 'last_date': '', 'version': 0}
+    for round_data in rounds:
+        _apply_round(windows, round_data)
+    _prune(windows)
+    return windows
+
+
+def _to_item(windows, group_id):
+    return {
+        'group_id': group_id,
+        'round_key': WINDOWS_KEY,
+        'nine': windows['nine'],
+        'last_date': windows['last_date'],
+        'players': {
+            name: {
+                'differentials': [Decimal(str(d)) for d in w['differentials']],
+                'history': [[date_str, Decimal(str(index))] for date_str, index in w['history']],
+                'last_date': w['last_date'],
+            }
+            for name, w in windows['players'].items()
+        },
+    }
+
+
+def _from_item(item):
+    return {
+        'nine': item['nine'],
+        'last_date': item.get('last_date', ''),
+        'version': int(item.get('version', 0)),
+        'players': {
+            name: {
+                'differentials': [float(d) for d in w['differentials']],
+                'history': [[date_str, float(index)] for date_str, index in w['history']],
+                'last_date': w.get('last_date', ''),
+            }
+            for name, w in item.get('players', {}).items()
+        },
+    }
+
+
+def save_windows(table, windows, group_id=DEFAULT_GROUP_ID):
+    """
+    Store windows as the next version of the item. The write only succeeds if the
+    stored version is still the one the windows were read at (raises
+    ConditionalCheckFailed otherwise); on success windows['version'] moves on.
+    """
+    item = _to_item(windows, group_id)
+    item['version'] = windows['version'] + 1
+    condition = Attr('version').eq(windows['version']) if windows['version'] else Attr('version').not_exists()
+    table.put_item(Item=item, ConditionExpression=condition)
+    windows['version'] += 1
+    _warm_windows[group_id] = (time.time(), windows)
+
+
+def _stored_version(table, group_id):
+    item = table.get_item(
+        Key={'group_id': group_id, 'round_key': WINDOWS_KEY},
+        ProjectionExpression='#v',
+        ExpressionAttributeNames={'#v': 'version'},
+    ).get('Item')
+    return int(item.get('version', 0)) if item else 0
+
+
+def rebuild_windows(table, group_id=DEFAULT_GROUP_ID):
+    """Rebuild every player's window from the group's rounds (one Query) and store it"""
+    for attempt in range(SAVE_ATTEMPTS):
+        version = _stored_version(table, group_id)
+        windows = build_windows(query_rounds(table, group_id))
+        windows['version'] = version
+        try:
+            save_windows(table, windows, group_id)
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            print("Handicap windows changed during rebuild - retrying")
+            continue
+        print(f"Handicap windows rebuilt for {len(windows['players'])} players")
+        return windows
+    raise RuntimeError(f"Handicap windows: gave up after {SAVE_ATTEMPTS} conflicting writes")
+
+
+def get_windows(table, group_id=DEFAULT_GROUP_ID):
+    """Windows from the warm cache, else the stored item, else a one-off rebuild"""
+    cached = _warm_windows.get(group_id)
+    if cached and time.time() - cached[0] < WINDOW_CACHE_TTL:
+        return cached[1]
+    item = table.get_item(Key={'group_id': group_id, 'round_key': WINDOWS_KEY}).get('Item')
+    if not item:
+        return rebuild_windows(table, group_id)
+    windows = _from_item(item)
+    _warm_windows[group_id] = (time.time(), windows)
+    return windows
+
+
+def update_windows(table, new_rounds, group_id=DEFAULT_GROUP_ID):
+    """
+    Extend the stored windows with newly saved rounds (add_round path)
+    Windows written by another request in the meantime are re-read and the rounds re-applied
+    """
+    new_rounds = sorted(new_rounds, key=round_sort_key)
+    for attempt in range(SAVE_ATTEMPTS):
+        item = table.get_item(Key={'group_id': group_id, 'round_key': WINDOWS_KEY}).get('Item')
+        if not item:
+            return rebuild_windows(table, group_id)
+        windows = _from_item(item)
+        if any(base_date(r['date']) < windows['last_date'] for r in new_rounds):
+            # Back-dated round: the windows after it are wrong, start again
+            return rebuild_windows(table, group_id)
+        for round_data in new_rounds:
+            _apply_round(windows, round_data)
+        _prune(windows)
+        try:
+            save_windows(table, windows, group_id)
+            return windows
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            print("Handicap windows changed during update - retrying")
+    raise RuntimeError(f"Handicap windows: gave up after {SAVE_ATTEMPTS} conflicting writes")
+
+
+def validate_card(card, nine):
+    """Raise ValueError unless card has one score per hole, each a blob (0 / None) or 1..HOLE_SCORE_MAX"""
+    if len(card) != len(nine['pars']):
+        raise ValueError(f"card needs {len(nine['pars'])} hole scores, got {len(card)}")
+    for hole, score in enumerate(card, 1):
+        if score and not 1 <= int(score) <= HOLE_SCORE_MAX:
+            raise ValueError(f"hole {hole} score {score} is outside 1-{HOLE_SCORE_MAX}")
+
+
+def adjusted_gross(card, nine, index):
+    """
+    Hole-by-hole card -> adjusted gross (net double bogey; 0 / None holes are blobs).
+    With no index (None) every hole is capped at par + NO_INDEX_HOLE_CAP, as WHS does.
+    """
+    validate_card(card, nine)
+    holes = [int(s) if s else None for s in card]
+    if index is None:
+        return sum(min(s, par + NO_INDEX_HOLE_CAP) if s else par + NO_INDEX_HOLE_CAP
+                   for s, par in zip(holes, nine['pars']))
+    ch = display_course_handicap(nine, index)
+    return _hc_calc.calculate_adjusted_gross_score(holes, nine['pars'], ch, nine['si'])
+
+
+def _state(differentials, history, as_of):
+    """
+    Index, LHI-capped index and War CH (from the capped index, as the official CH would be);
+    all None until the window holds MIN_DIFFERENTIALS.
+    """
+    if len(differentials) < MIN_DIFFERENTIALS:
+        return {'index': None, 'capped_index': None, 'ch': None}
+    index = _index(differentials)
+    capped = _index(differentials, low_index=_low_index(history, as_of))
+    return {
+        'index': index,
+        'capped_index': capped,
+        'ch': display_course_handicap(get_nine('back9'), capped),
+    }
+
+
+def gross_needed(window, nine, as_of, target_index=None, target_ch=None):
+    """
+    Highest 9-hole gross whose capped index is <= target_index (or War CH <= target_ch),
+    by binary search - the index never falls as the gross rises. None if out of reach
+    (including when one more round still leaves no index).
+    """
+    def reaches(gross):
+        diffs = (window['differentials'] + [differential(gross, nine)])[-WHS_WINDOW:]
+        history = list(window['history'])
+        _record(history, as_of.strftime('%Y-%m-%d'), diffs)
+        state = _state(diffs, history, as_of)
+        if state['capped_index'] is None:
+            return False
+        if target_ch is not None:
+            return state['ch'] <= target_ch
+        return state['capped_index'] <= target_index
+
+    if not reaches(GROSS_MIN):
+        return None
+    low, high = GROSS_MIN, GROSS_MAX
+    while low < high:
+        mid = (low + high + 1) // 2
+        if reaches(mid):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def simulate(windows, player, scores=(), cards=(), nine_label=None, target_index=None, as_of=None):
+    """
+    What-if: apply hypothetical rounds (gross scores and/or hole-by-hole cards) to a
+    player's window. Returns current and resulting index / capped index / War CH,
+    per-round steps, and the gross needed next round to reach target_index
+    (default: drop one War HCP shot). None if the player has no window. Index values
+    are None while the window is short of MIN_DIFFERENTIALS. Raises ValueError for
+    a gross or card that is not a playable 9-hole score.
+    """
+    window = windows['players'].get(player)
+    if window is None:
+        return None
+    as_of = as_of or datetime.now()
+    today = as_of.strftime('%Y-%m-%d')
+    nine = get_nine(nine_label or windows['nine'])
+
+    differentials = list(window['differentials'])
+    history = list(window['history'])
+    current = _state(differentials, history, as_of)
+
+    for gross in scores:
+        if not GROSS_MIN <= int(gross) <= GROSS_MAX:
+            raise ValueError(f"gross {gross} is outside {GROSS_MIN}-{GROSS_MAX}")
+    for card in cards:
+        validate_card(card, nine)
+
+    steps = []
+    hypotheticals = [('gross', int(g)) for g in scores] + [('card', card) for card in cards]
+    state = current
+    for kind, value in hypotheticals:
+        gross = value if kind == 'gross' else adjusted_gross(value, nine, state['index'])
+        diff = differential(gross, nine)
+        differentials = (differentials + [diff])[-WHS_WINDOW:]
+        _record(history, today, differentials)
+        state = _state(differentials, history, as_of)
+        steps.append({'gross': gross, 'differential': diff, **state})
+
+    after = _state(differentials, history, as_of)
+    search_window = {'differentials': differentials, 'history': history}
+    if target_index is not None:
+        target = {'target_index': target_index,
+                  'gross_needed': gross_needed(search_window, nine, as_of, target_index=target_index)}
+    elif after['ch'] is not None:
+        target = {'target_ch': after['ch'] - 1,
+                  'gross_needed': gross_needed(search_window, nine, as_of, target_ch=after['ch'] - 1)}
+    else:
+        target = {'target_ch': None, 'gross_needed': None}
+
+    return {
+        'player': player,
+        'nine': nine['label'],
+        'rounds_in_window': len(window['differentials']),
+        'current': current,
+        'steps': steps,
+        'after': after,
+        'target': target,
+    }
+
+
+if __name__ == '__main__':
+    import boto3
+
+    group_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_GROUP_ID
+    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+    rebuild_windows(dynamodb.Table(TABLE_NAME), group_id)
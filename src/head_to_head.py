@@ -0,0 +1,240 @@
+"""
+Head-to-Head Matrix
+Pairwise records for every pair of players, per season, from one pass over
+the rounds they played together.
+
+For each pair (names in sorted order, "A|B") a season record holds:
+- shared rounds, wins / losses / ties on Stableford and the summed point margin
+- match play from hole_scores: holes won / lost / halved on net Stableford
+  points per hole, and matches won / lost / halved over the nine
+
+Seasons are stored as aggregate items (round_key "META#h2h#YYYY") so any
+head-to-head query is a single GetItem plus a dict lookup. add_round folds
+new rounds into their season's item; each item carries a version and is only
+written if nobody else wrote it since it was read (retried otherwise), so
+concurrent add_rounds can't lose each other's rounds.
+
+Item size is bounded by the season, not by history: applied_rounds holds at
+most two round keys a day (~17 bytes each, ~13 KB for a full year) and a pair
+record is ~230 bytes, so a season item reaches DynamoDB's 400 KB limit at
+around 1,600 pairs - a field of ~55 players in one season. A weekly group of
+12 is 66 pairs and ~17 KB. Rebuild from history with:
+
+    python head_to_head.py [group_id] [season ...]
+"""
+
+import sys
+from itertools import combinations
+
+from boto3.dynamodb.conditions import Attr
+
+from course_registry import display_course_handicap, nine_for_round, stableford_points, strokes_for
+from rounds_table import DEFAULT_GROUP_ID, META_PREFIX, TABLE_NAME, base_date, make_round_key, query_rounds
+
+H2H_PREFIX = f"{META_PREFIX}h2h#"
+
+# Read-apply-write attempts before add_round gives up on a season (rebuild fixes it)
+SAVE_ATTEMPTS = 5
+
+RECORD_FIELDS = ('rounds', 'wins', 'losses', 'ties', 'margin',
+                 'match_rounds', 'holes_won', 'holes_lost', 'holes_halved',
+                 'matches_won', 'matches_lost', 'matches_halved')
+
+
+def season_key(season):
+    return f"{H2H_PREFIX}{season}"
+
+
+def pair_key(player1, player2):
+    """Matrix key for a pair (order-independent)"""
+    a, b = sorted((player1, player2))
+    return f"{a}|{b}"
+
+
+def new_season():
+    return {'pairs': {}, 'applied_rounds': set(), 'version': 0}
+
+
+def _round_key(round_data):
+    return round_data.get('round_key') or make_round_key(round_data['date'], round_data['course'])
+
+
+def _hole_points(round_data, player):
+    """Net Stableford points per hole at the player's CH for the round, or None without hole_scores"""
+    if not round_data.get('handicap_eligible', True):
+        return None  # other courses: no stroke index / pars to score holes against
+    nine = nine_for_round(round_data)
+    hole_scores = player.get('hole_scores') or []
+    if len(hole_scores) != len(nine['pars']):
+        return None
+    strokes = strokes_for(nine, display_course_handicap(nine, player.get('index', 0)))
+    return stableford_points(hole_scores, nine['pars'], strokes)
+
+
+def apply_round(season, round_data):
+    """Fold one round into a season matrix (O(pairs in round)); returns False if already applied"""
+    key = _round_key(round_data)
+    if key in season['applied_rounds']:
+        return False
+    season['applied_rounds'].add(key)
+
+    field = sorted(round_data.get('players', []), key=lambda p: p['name'])
+    holes = {p['name']: _hole_points(round_data, p) for p in field}
+
+    for p1, p2 in combinations(field, 2):
+        record = season['pairs'].setdefault(pair_key(p1['name'], p2['name']), dict.fromkeys(RECORD_FIELDS, 0))
+        margin = int(p1['stableford']) - int(p2['stableford'])
+        record['rounds'] += 1
+        record['margin'] += margin
+        if margin > 0:
+            record['wins'] += 1
+        elif margin < 0:
+            record['losses'] += 1
+        else:
+            record['ties'] += 1
+
+        h1, h2 = holes[p1['name']], holes[p2['name']]
+        if h1 is None or h2 is None:
+            continue
+        won = sum(1 for a, b in zip(h1, h2) if a > b)
+        lost = sum(1 for a, b in zip(h1, h2) if a < b)
+        record['match_rounds'] += 1
+        record['holes_won'] += won
+        record['holes_lost'] += lost
+        record['holes_halved'] += len(h1) - won - lost
+        if won > lost:
+            record['matches_won'] += 1
+        elif won < lost:
+            record['matches_lost'] += 1
+        else:
+            record['matches_halved'] += 1
+    return True
+
+
+def build_matrix(rounds):
+    """One pass over rounds -> {season: season matrix}"""
+    seasons = {}
+    for round_data in rounds:
+        season = base_date(round_data['date'])[:4]
+        apply_round(seasons.setdefault(season, new_season()), round_data)
+    return seasons
+
+
+def lookup(season, player1, player2):
+    """
+    Head-to-head record from player1's side, with averages (None if they never played together)
+    """
+    record = season['pairs'].get(pair_key(player1, player2))
+    if not record:
+        return None
+    result = {field: int(value) for field, value in record.items()}
+    if player1 > player2:
+        # Stored from the alphabetically first player's side - flip it
+        for mine, theirs in (('wins', 'losses'), ('holes_won', 'holes_lost'), ('matches_won', 'matches_lost')):
+            result[mine], result[theirs] = result[theirs], result[mine]
+        result['margin'] = -result['margin']
+    result['player'] = player1
+    result['opponent'] = player2
+    result['avg_margin'] = result['margin'] / result['rounds']
+    return result
+
+
+def load_season(table, season, group_id=DEFAULT_GROUP_ID):
+    """Stored season matrix, or None if it hasn't been built"""
+    item = table.get_item(Key={'group_id': group_id, 'round_key': season_key(season)}).get('Item')
+    if not item:
+        return None
+    return {
+        'pairs': {key: {field: int(v) for field, v in record.items()} for key, record in item.get('pairs', {}).items()},
+        'applied_rounds': set(item.get('applied_rounds', ())),
+        'version': int(item.get('version', 0)),
+    }
+
+
+def save_season(table, season, matrix, group_id=DEFAULT_GROUP_ID):
+    """
+    Store a season matrix as the next version of its item. The write only succeeds
+    if the stored version is still the one the matrix was read at (raises
+    ConditionalCheckFailed otherwise); on success matrix['version'] moves on.
+    """
+    item = {
+        'group_id': group_id,
+        'round_key': season_key(season),
+        'pairs': matrix['pairs'],
+        'version': matrix['version'] + 1,
+    }
+    if matrix['applied_rounds']:
+        item['applied_rounds'] = matrix['applied_rounds']  # string set (DynamoDB has no empty sets)
+    condition = Attr('version').eq(matrix['version']) if matrix['version'] else Attr('version').not_exists()
+    table.put_item(Item=item, ConditionExpression=condition)
+    matrix['version'] += 1
+
+
+def _stored_version(table, season, group_id):
+    item = table.get_item(
+        Key={'group_id': group_id, 'round_key': season_key(season)},
+        ProjectionExpression='#v',
+        ExpressionAttributeNames={'#v': 'version'},
+    ).get('Item')
+    return int(item.get('version', 0)) if item else 0
+
+
+def rebuild_season(table, season, group_id=DEFAULT_GROUP_ID):
+    """Build one season's matrix from its rounds (one Query) and store it"""
+    season = str(season)
+    for attempt in range(SAVE_ATTEMPTS):
+        matrix = new_season()
+        matrix['version'] = _stored_version(table, season, group_id)
+        for round_data in query_rounds(table, group_id, prefix=season):
+            apply_round(matrix, round_data)
+        try:
+            save_season(table, season, matrix, group_id)
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            print(f"Head-to-head {season} changed during rebuild - retrying")
+            continue
+        print(f"Head-to-head {season}: {len(matrix['applied_rounds'])} rounds, {len(matrix['pairs'])} pairs")
+        return matrix
+    raise RuntimeError(f"Head-to-head {season}: gave up after {SAVE_ATTEMPTS} conflicting writes")
+
+
+def get_season(table, season, group_id=DEFAULT_GROUP_ID):
+    """Stored season matrix, building and storing it on first use"""
+    return load_season(table, season, group_id) or rebuild_season(table, season, group_id)
+
+
+def update_head_to_head(table, new_rounds, group_id=DEFAULT_GROUP_ID):
+    """
+    Fold newly saved rounds into their seasons' stored matrices (add_round path)
+    A season written by another request in the meantime is re-read and the rounds re-applied
+    """
+    by_season = {}
+    for round_data in new_rounds:
+        by_season.setdefault(base_date(round_data['date'])[:4], []).append(round_data)
+    for season, season_rounds in by_season.items():
+        for attempt in range(SAVE_ATTEMPTS):
+            matrix = load_season(table, season, group_id)
+            if matrix is None:
+                # First round of a new season, or never built - the rebuild already includes the new rounds
+                rebuild_season(table, season, group_id)
+                break
+            if not any([apply_round(matrix, r) for r in season_rounds]):
+                break
+            try:
+                save_season(table, season, matrix, group_id)
+                break
+            except table.meta.client.exceptions.ConditionalCheckFailedException:
+                print(f"Head-to-head {season} changed during update - retrying")
+        else:
+            raise RuntimeError(f"Head-to-head {season}: gave up after {SAVE_ATTEMPTS} conflicting writes")
+
+
+if __name__ == '__main__':
+    import boto3
+
+    args = sys.argv[1:]
+    group_id = args[0] if args else DEFAULT_GROUP_ID
+    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+    table = dynamodb.Table(TABLE_NAME)
+    seasons = args[1:] or sorted({base_date(r['date'])[:4] for r in query_rounds(table, group_id)})
+    for season in seasons:
+        rebuild_season(table, season, group_id)
@@ -8,7 +8,21 @@ import boto3
 import requests
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-from handicap import HandicapCalculator
+from handicap import HandicapCalculator, WHS_WINDOW
+from course_registry import (
+    get_nine, nine_for_round, nine_label_for_round, strokes_for, display_course_handicap,
+    allocate_strokes, calculate_course_handicap, stableford_points
+)
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, query_rounds, round_item_key, base_date
+from request_context import RequestContext
+import resilience
+from season_index import get_season_index
+from form_guide import summarize_forms, form_series, FORM_WINDOWS, EWMA_ALPHA
+from predictor import predict_next_round, prediction_text
+from ratings import load_ratings, update_ratings
+import head_to_head
+import handicap_window
+from pcc import update_pcc
 import re
 from decimal import Decimal
 import os
@@ -25,9 +39,12 @@ except Exception as e:
     OPENAI_ENABLED = False
     print(f"✗ OpenAI not available - Error: {type(e).__name__}: {e}")
 
-# DynamoDB setup
+# DynamoDB setup (partitioned by group_id, see rounds_table.py)
 dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('golf-rounds')
+table = dynamodb.Table(TABLE_NAME)
+
+# Year-over-year comparison in the WhatsApp summary (on unless YEAR_OVER_YEAR=false)
+YEAR_OVER_YEAR_ENABLED = os.environ.get('YEAR_OVER_YEAR', 'true').lower() != 'false'
 
 # URL shortening cache
 url_shortener_cache = {}
@@ -44,7 +61,7 @@ def shorten_url(long_url):
     try:
         # TinyURL API - simple and free, no authentication needed
         api_url = f"https://tinyurl.com/api-create.php?url={long_url}"
-        response = requests.get(api_url, timeout=3)
+        response = resilience.get(api_url, timeout=3)
         
         if response.status_code == 200:
             short_url = response.text.strip()
@@ -126,7 +143,7 @@ def get_weather_for_round(round_date, tee_time_utc=None):
             'timezone': 'Australia/Sydney'
         }
         
-        response = requests.get(url, params=params, timeout=5)
+        response = resilience.get(url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         
@@ -153,174 +170,121 @@ def get_weather_for_round(round_date, tee_time_utc=None):
         print(f"Weather fetch error: {e}")
         return None
 
-# Course configurations
-# NOTE: Labels in database are BACKWARDS - "front9" in DB = Back 9 in reality
-BACK_9_CONFIG = {
-    'name': 'Back 9 (Holes 10-18)',
-    'par': 35,
-    'slope': 101,  # For index calculation (keeps existing handicaps stable)
-    'rating': 33.5,  # For index calculation (keeps existing handicaps stable)
-    'slope_display': 111,  # Warringah Whites official - for course handicap display only
-    'rating_display': 33.0,  # Warringah Whites official - for course handicap display only
-}
-
-FRONT_9_CONFIG = {
-    'name': 'Front 9 (Holes 1-9)',
-    'par': 35,  # Front 9 par is 35
-    'slope': 101,  # For index calculation (keeps existing handicaps stable)
-    'rating': 33.5,  # For index calculation (keeps existing handicaps stable)
-    'slope_display': 127,  # Warringah Whites official - for course handicap display only
-    'rating_display': 35.0,  # Warringah Whites official - for course handicap display only
-}
+# Course configurations (loaded from courses.json via the course registry)
+BACK_9_CONFIG = get_nine('back9')
+FRONT_9_CONFIG = get_nine('front9')
 
 # Hole-by-hole par values for Warringah Golf Club
-BACK_9_PARS = [5, 4, 3, 4, 3, 4, 4, 3, 4]   # Holes 10-18, par 34
-FRONT_9_PARS = [4, 4, 5, 4, 3, 4, 4, 3, 4]   # Holes 1-9, par 35
+BACK_9_PARS = BACK_9_CONFIG['pars']   # Holes 10-18, par 34
+FRONT_9_PARS = FRONT_9_CONFIG['pars']   # Holes 1-9, par 35
 
 # Stroke index values (18-hole SI) for handicap stroke allocation
-BACK_9_SI = [8, 9, 18, 6, 17, 3, 14, 12, 2]   # Holes 10-18
-FRONT_9_SI = [15, 1, 5, 10, 16, 7, 13, 4, 11]  # Holes 1-9
+BACK_9_SI = BACK_9_CONFIG['si']   # Holes 10-18
+FRONT_9_SI = FRONT_9_CONFIG['si']  # Holes 1-9
 
 # Hole numbers for display
-BACK_9_HOLES = [10, 11, 12, 13, 14, 15, 16, 17, 18]
-FRONT_9_HOLES = [1, 2, 3, 4, 5, 6, 7, 8, 9]
+BACK_9_HOLES = BACK_9_CONFIG['holes']
+FRONT_9_HOLES = FRONT_9_CONFIG['holes']
 
-def allocate_strokes(course_handicap, hole_si_values):
-    """
-    Allocate handicap strokes using 18-hole stroke index method.
-    Each hole with SI <= CH gets 1 stroke.
-    If CH > 18, holes with SI <= (CH-18) get an additional stroke.
+def player_index_timeline(rounds_list, slope, rating):
     """
-    strokes = [0] * len(hole_si_values)
-    for i, si in enumerate(hole_si_values):
-        if si <= course_handicap:
-            strokes[i] += 1
-        if course_handicap > 18 and si <= (course_handicap - 18):
-            strokes[i] += 1
-        if course_handicap > 36 and si <= (course_handicap - 36):
-            strokes[i] += 1
-    return strokes
-
-def calculate_stableford_per_hole(scores, pars, strokes):
-    """
-    Calculate Stableford points for each hole.
-    Returns list of points per hole.
-    """
-    points = []
-    for score, par, s in zip(scores, pars, strokes):
-        if score <= 0:
-            points.append(0)
-            continue
-        net_score = score - s
-        diff = net_score - par
-        if diff <= -2:
-            points.append(4)  # Eagle or better
-        elif diff == -1:
-            points.append(3)  # Birdie
-        elif diff == 0:
-            points.append(2)  # Par
-        elif diff == 1:
-            points.append(1)  # Bogey
-        else:
-            points.append(0)  # Double bogey+
-    return points
-
-def calculate_course_handicap(index, slope, rating, par):
-    """
-    WHS Course Handicap Formula: CH = round(Index × Slope/113 + (Rating - Par))
-    Uses official Warringah Whites ratings from Tag Heuer
-    """
-    ch = round(float(index) * slope / 113 + (rating - par))
-    return max(0, ch)
-
-def estimate_pcc_from_weather(weather_string):
-    """
-    Estimate Playing Conditions Calculation (PCC) adjustment based on weather.
-    Returns -1, 0, or +1 adjustment to apply to score differential.
-    
-    WHS PCC is officially calculated by Golf Australia using all scores,
-    but we estimate based on weather:
-    - Heavy rain (>10mm) or strong winds (>30km/h) = +1 (harder conditions)
-    - Normal conditions = 0
-    - Perfect conditions = 0 (we don't go negative)
-    """
-    if not weather_string:
-        return 0
-    
-    try:
-        # Extract rain amount (format: "20°C, rain, 15km/h winds, 12.5mm rain")
-        import re
-        rain_match = re.search(r'(\d+\.?\d*)mm rain', weather_string)
-        wind_match = re.search(r'(\d+)km/h winds', weather_string)
-        
-        rain = float(rain_match.group(1)) if rain_match else 0
-        wind = int(wind_match.group(1)) if wind_match else 0
-        
-        # Check for adverse conditions
-        if rain > 10:  # Heavy rain
-            return 1
-        elif wind > 30:  # Strong winds
-            return 1
-        else:
-            return 0
-    except Exception as e:
-        print(f"DEBUG: PCC estimation error: {e}")
-        return 0
-
-def calculate_player_handicap_index(rounds_list, slope, rating):
-    """
-    Calculate WHS handicap index for a player using their rounds
-    Weather-based PCC only applied to rounds after 2025-12-14
+    Calculate WHS handicap index for a player after each of their rounds, in one pass
+    (entry k is the index from rounds_list[:k + 1])
+    Subtracts the field-based PCC stored on each round (see pcc.py)
     Applies hard/soft cap based on Low Handicap Index from last 365 days
     """
     hc_calc = HandicapCalculator()
     
-    # PCC cutoff date - only apply to rounds after this
-    PCC_START_DATE = "2025-12-14"
-    
     # Calculate differentials for all rounds
     differentials = []
-    round_indices = []  # Track index after each round for LHI calculation
     
     for round_data in rounds_list:
         # Calculate as 18-hole equivalent
         gross_18 = round_data['gross'] * 2
         rating_18 = rating * 2
         
-        differential = (gross_18 - rating_18) * (113 / slope)
-        
-        # Apply weather-based PCC ONLY for rounds after Dec 14, 2025
-        if 'date' in round_data and round_data['date'] > PCC_START_DATE:
-            if 'weather' in round_data and round_data['weather']:
-                pcc = estimate_pcc_from_weather(round_data['weather'])
-                if pcc != 0:
-                    differential += pcc
-                    print(f"DEBUG: Applied PCC {pcc:+d} for {round_data['date']}: {round_data['weather'][:50]}")
+        # WHS: 113 / Slope x (AGS - CR - PCC); a positive PCC (hard day) lowers the differential
+        # (PCC is 0 before PCC_START_DATE / not yet calculated)
+        pcc = int(round_data.get('pcc', 0) or 0)
+        differential = (gross_18 - rating_18 - pcc) * (113 / slope)
         
         differentials.append(round(differential, 1))
     
-    # Calculate Low Handicap Index from last 365 days
-    from datetime import datetime, timedelta
+    # Low Handicap Index: lowest uncapped index after a round in the last 365 days
     cutoff_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-    
-    # Get indices from rounds in last 365 days
-    # Note: update_handicap_index now correctly uses only last 20 diffs internally
     low_handicap_index = None
-    recent_indices = []
     
+    timeline = []
     for i, round_data in enumerate(rounds_list):
+        # update_handicap_index only looks at the last 20 differentials
+        window = differentials[max(0, i + 1 - WHS_WINDOW):i + 1]
         if round_data.get('date', '') >= cutoff_date:
-            # Calculate index up to this point (last-20 window applied inside update_handicap_index)
-            temp_index = hc_calc.update_handicap_index(0, differentials[:i+1])
-            recent_indices.append(temp_index)
-    
-    if recent_indices:
-        low_handicap_index = min(recent_indices)
-    
-    # Calculate final index using WHS method with hard/soft cap
-    # update_handicap_index will use only the last 20 differentials
-    calculated_index = hc_calc.update_handicap_index(0, differentials, low_handicap_index=low_handicap_index)
-    return calculated_index
+            temp_index = hc_calc.update_handicap_index(0, window)
+            low_handicap_index = temp_index if low_handicap_index is None else min(low_handicap_index, temp_index)
+        # Index after this round using WHS method with hard/soft cap
+        timeline.append(hc_calc.update_handicap_index(0, window, low_handicap_index=low_handicap_index))
+    return timeline
+
+def calculate_player_handicap_index(rounds_list, slope, rating):
+    """Current WHS handicap index for a player (0 with no rounds) - see player_index_timeline"""
+    timeline = player_index_timeline(rounds_list, slope, rating)
+    return timeline[-1] if timeline else 0
+
+# Scorecard player names -> names stored in the rounds table
+SCORECARD_NAME_MAP = {
+    'Andy J.': 'Andy Jakes',
+    'Fletcher J.': 'Fletcher Jakes',
+    'Hamish M.': 'Hamish McNee',
+    'Bruce Kennaway': 'Bruce Kennaway',
+    'Steve': 'Steve',
+    'Steve Lewthwaite': 'Steve',
+    'Steve L.': 'Steve',
+}
+
+def scrape_scorecard_hole_scores(url, timeout=15):
+    """
+    Scrape hole-by-hole scores from a Tag Heuer scorecard page
+    Returns {name: {'front9': [...], 'back9': [...]}} ('back9' only for 9-hole cards),
+    or {} if the page can't be fetched
+    """
+    scores = {}
+    try:
+        resp = resilience.get(url, timeout=timeout, verify=False)
+        sc_soup = BeautifulSoup(resp.text, 'html.parser')
+        sc_sections = sc_soup.find_all(string=re.compile(r'\(Index \d+\.\d+\)'))
+        for ps in sc_sections:
+            gp = ps.parent.parent if ps.parent else None
+            if not gp:
+                continue
+            pt = gp.get_text().strip()
+            sc_match = re.search(r'(.+?)\s*\(Index\s+(\d+\.\d+)\)', pt)
+            if not sc_match:
+                continue
+            sc_name = SCORECARD_NAME_MAP.get(sc_match.group(1).strip(), sc_match.group(1).strip())
+            if sc_name in scores:
+                continue
+            sc_table = gp.find_next('div', class_='score-table')
+            if not sc_table:
+                continue
+            for row in sc_table.find_all('div', recursive=False):
+                cells = row.find_all('div')
+                texts = [c.get_text().strip() for c in cells]
+                if not texts or texts[0] != 'Score':
+                    continue
+                all_vals = texts[1::2]
+                if len(all_vals) >= 19:  # 18-hole card
+                    scores[sc_name] = {
+                        'front9': [int(v) if v and v.isdigit() else 0 for v in all_vals[0:9]],
+                        'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[10:19]]
+                    }
+                elif len(all_vals) >= 9:  # 9-hole card
+                    scores[sc_name] = {
+                        'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[:9]]
+                    }
+                break
+    except Exception as e:
+        print(f"Scorecard scrape failed for {url}: {e}")
+    return scores
 
 def parse_tag_heuer_url(url):
     """
@@ -328,7 +292,7 @@ def parse_tag_heuer_url(url):
     Returns: dict with date, course, players, url
     """
     try:
-        response = requests.get(url, timeout=10)
+        response = resilience.get(url, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -585,7 +549,8 @@ def parse_tag_heuer_url(url):
                     'time_utc': tee_time_utc,
                     'course': 'front9',
                     'players': front9_players,
-                    'scorecard_url': url
+                    'scorecard_url': url,
+                    'split_18': True
                 })
             if back9_players:
                 rounds.append({
@@ -593,7 +558,9 @@ def parse_tag_heuer_url(url):
                     'time_utc': tee_time_utc,
                     'course': 'back9',
                     'players': back9_players,
-                    'scorecard_url': url
+                    'scorecard_url': url,
+                    # Real labels, unlike legacy 9-hole rounds (replaces the old -back9 date marker)
+                    'split_18': True
                 })
             
             return rounds  # Return list of rounds
@@ -614,11 +581,10 @@ def parse_tag_heuer_url(url):
             'details': str(e)
         }
 
-def get_all_rounds():
-    """Retrieve all rounds from DynamoDB"""
+def get_all_rounds(group_id=DEFAULT_GROUP_ID):
+    """Retrieve all rounds for one group from DynamoDB (Query on the group partition)"""
     try:
-        response = table.scan()
-        rounds = response.get('Items', [])
+        rounds = query_rounds(table, group_id)
         
         # Convert DynamoDB Decimal to float/int
         for round_data in rounds:
@@ -629,17 +595,15 @@ def get_all_rounds():
                 if 'hole_scores' in player:
                     player['hole_scores'] = [int(s) for s in player['hole_scores']]
         
-        # Sort by date
-        rounds.sort(key=lambda x: x['date'])
         return rounds
     except Exception as e:
         print(f"Error retrieving rounds: {e}")
         return []
 
-def check_duplicate_round(date_str):
-    """Check if a round for this date already exists"""
+def check_duplicate_round(date_str, course, group_id=DEFAULT_GROUP_ID):
+    """Check if a round for this date and nine already exists for the group"""
     try:
-        response = table.get_item(Key={'date': date_str})
+        response = table.get_item(Key=round_item_key(group_id, date_str, course))
         return 'Item' in response
     except Exception as e:
         print(f"Error checking for duplicate: {e}")
@@ -656,19 +620,21 @@ def is_recent_round(date_str):
         print(f"Error checking round date: {e}")
         return False
 
-def save_round(round_data):
-    """Save round to DynamoDB"""
+def save_round(round_data, group_id=DEFAULT_GROUP_ID):
+    """Save round to DynamoDB under the group's partition"""
     try:
-        table.put_item(Item=round_data)
+        item = {**round_data, **round_item_key(group_id, round_data['date'], round_data['course'])}
+        table.put_item(Item=item)
         return True
     except Exception as e:
         print(f"Error saving round: {e}")
         return False
 
-def generate_ai_commentary(todays_rounds, sorted_players, season_leaderboard=None, form_data=None, prediction_text=None, handicap_changes=None):
+def generate_ai_commentary(todays_rounds, sorted_players, season_leaderboard=None, form_data=None, prediction_text=None, handicap_changes=None, ctx=None):
     """
     Generate humorous AI commentary about the round(s)
     todays_rounds: list of rounds from today (could be 1 for 9 holes, or 2 for 18 holes)
+    ctx: RequestContext shared with the summary (weather is looked up once per request)
     Returns None if OpenAI unavailable or on error
     """
     print(f"DEBUG: generate_ai_commentary called, OPENAI_ENABLED={OPENAI_ENABLED}")
@@ -687,8 +653,8 @@ def generate_ai_commentary(todays_rounds, sorted_players, season_leaderboard=Non
     # Use latest round for cache key
     latest_round = todays_rounds[-1]
     
-    # Check cache (5 minute TTL)
-    cache_key = f"{latest_round['date']}"
+    # Check cache (5 minute TTL) - keyed per group so groups sharing a date don't collide
+    cache_key = f"{latest_round.get('group_id', '')}|{latest_round['date']}"
     if cache_key in commentary_cache:
         cached_time, cached_commentary = commentary_cache[cache_key]
         if (datetime.now() - cached_time).seconds < 300:  # 5 minutes
@@ -742,7 +708,10 @@ def generate_ai_commentary(todays_rounds, sorted_players, season_leaderboard=Non
         # Get weather for AI prompt
         latest_round = todays_rounds[-1]  # Get the latest round
         tee_time = latest_round.get('time_utc')
-        weather_info = get_weather_for_round(latest_round['date'], tee_time)
+        weather_date = base_date(latest_round['date'])
+        if ctx is None:
+            ctx = RequestContext()
+        weather_info = ctx.lookup('weather', (weather_date, tee_time), get_weather_for_round, weather_date, tee_time)
         weather_text = f"\nWeather: {weather_info}" if weather_info else ""
         
         # Build season leaderboard text if available - only include qualified players (10+ rounds)
@@ -780,7 +749,11 @@ def generate_ai_commentary(todays_rounds, sorted_players, season_leaderboard=Non
             form_text = "\n\nRecent Form (last 5 rounds) - for today's players only:\n"
             for name, data in form_data.items():
                 if name in todays_player_names:
-                    form_text += f"- {name}: {data['trend']} {data['avg']:.1f} avg\n"
+                    form_text += f"- {name}: {data['trend']} {data['avg']:.1f} avg"
+                    last_10 = data.get('windows', {}).get(10)
+                    if last_10 and last_10['rounds'] > 5:
+                        form_text += f" (last {last_10['rounds']}: {last_10['avg']:.1f}, weighted {data['ewma']:.1f})"
+                    form_text += "\n"
         
         prediction_context = f"\n\nPrediction: {prediction_text}\n" if prediction_text else ""
         
@@ -849,7 +822,9 @@ Andy maintains his stranglehold on the season with a commanding average, while t
 
         client = OpenAI(api_key=api_key)
         
-        response = client.chat.completions.create(
+        response = resilience.call(
+            'api.openai.com',
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a golf commentator. Write ONE factual weather sentence, then humorous sentences about ALL players mentioned, then ONE sentence about season standings. NEVER mention weather in the player commentary. CRITICAL: Only Andy Jakes and Fletcher Jakes are related (father-son). Bruce, Steve, and Hamish are NOT related to anyone - they are friends only. DO NOT invent family relationships. ALWAYS include a joke about Steve being a little cheat, especially if he won the round."},
@@ -874,22 +849,31 @@ Andy maintains his stranglehold on the season with a commanding average, while t
         
         return commentary
         
+    except resilience.CallRejected as e:
+        print(f"Skipping AI commentary: {e}")
+        return None
     except Exception as e:
         print(f"ERROR generating AI commentary: {type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
         return None
 
-def generate_whatsapp_summary(rounds, specific_date=None):
+def generate_whatsapp_summary(rounds, specific_date=None, ctx=None, ratings=None, group_id=DEFAULT_GROUP_ID):
     """Generate WhatsApp formatted summary
     
     Args:
         rounds: List of all rounds
         specific_date: Optional specific date (YYYY-MM-DD) to generate summary for
+        ctx: RequestContext memoizing weather, scorecards and index timelines for this request
+        ratings: Stored player ratings (ratings.load_ratings) - shown in player stats if given
+        group_id: Group the rounds belong to (keys the warm season index cache)
     """
     if not rounds:
         return "No rounds data available"
     
+    if ctx is None:
+        ctx = RequestContext()
+    
     # If specific date provided, filter rounds up to that date and use it as "latest"
     if specific_date:
         print(f"Generating summary for specific date: {specific_date}")
@@ -922,12 +906,8 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     todays_rounds = [r for r in rounds if r['date'].split('-back9')[0] == latest_date_base]
     
     # Determine course (use last round's config for handicap calculations)
-    if latest_round['course'] == 'back9':
-        course_name = "BACK 9"
-        config = BACK_9_CONFIG
-    else:
-        course_name = "FRONT 9"
-        config = FRONT_9_CONFIG
+    config = nine_for_round(latest_round)
+    course_name = "BACK 9" if config['label'] == 'back9' else "FRONT 9"
     
     # Calculate season statistics
     player_stats = {}
@@ -940,12 +920,6 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         round_date = parse_date_flexible(round_data['date'])
         round_year = round_date.year
         
-        # Get course config for this round
-        if round_data['course'] == 'back9':
-            round_config = BACK_9_CONFIG
-        else:
-            round_config = FRONT_9_CONFIG
-        
         # Check if this round is eligible for handicap calculation
         handicap_eligible = round_data.get('handicap_eligible', True)  # Default to True for existing rounds
         
@@ -965,7 +939,7 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             
             # Only add to handicap rounds if eligible
             if handicap_eligible:
-                player_stats[name]['rounds'].append(player)
+                player_stats[name]['rounds'].append({**player, 'pcc': round_data.get('pcc', 0)})
                 player_stats[name]['latest_index'] = player['index']
             
             # Only add to season stats if it's current year (includes ALL courses)
@@ -983,27 +957,19 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     
     # Calculate actual handicap indexes for each player based on their handicap-eligible rounds only
     for name in player_stats:
-        # Calculate handicap index from handicap-eligible rounds only
-        calculated_index = calculate_player_handicap_index(
-            player_stats[name]['rounds'],  # Only handicap-eligible rounds
-            config['slope'],  # Keep using existing slope for stable index calculation
-            config['rating']  # Keep using existing rating for stable index calculation
+        # Index after each handicap-eligible round, computed once per player and request
+        # (existing slope/rating kept for a stable index calculation)
+        timeline = ctx.lookup(
+            'index_timeline', (name, config['slope'], config['rating']),
+            player_index_timeline, player_stats[name]['rounds'], config['slope'], config['rating']
         )
+        calculated_index = timeline[-1] if timeline else 0
         player_stats[name]['calculated_index'] = calculated_index
         
-        # Calculate previous week's index (without today's round) for comparison
-        if len(player_stats[name]['rounds']) > 1:
-            prev_index = calculate_player_handicap_index(
-                player_stats[name]['rounds'][:-1],
-                config['slope'],  # Keep using existing slope for stable index calculation
-                config['rating']  # Keep using existing rating for stable index calculation
-            )
-            prev_ch = calculate_course_handicap(
-                prev_index,
-                BACK_9_CONFIG['slope_display'],
-                BACK_9_CONFIG['rating_display'],
-                BACK_9_CONFIG['par']
-            )
+        # Previous week's index (without today's round) for comparison
+        if len(timeline) > 1:
+            prev_index = timeline[-2]
+            prev_ch = display_course_handicap(BACK_9_CONFIG, prev_index)
             player_stats[name]['prev_index'] = prev_index
             player_stats[name]['prev_ch'] = prev_ch
         else:
@@ -1011,12 +977,7 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             player_stats[name]['prev_ch'] = 0
         
         # Calculate course handicap for Warringah Back 9 (always show this in leaderboard)
-        ch = calculate_course_handicap(
-            calculated_index,
-            BACK_9_CONFIG['slope_display'],
-            BACK_9_CONFIG['rating_display'],
-            BACK_9_CONFIG['par']
-        )
+        ch = display_course_handicap(BACK_9_CONFIG, calculated_index)
         player_stats[name]['latest_ch'] = ch
     
     # Calculate averages (from current season only)
@@ -1059,15 +1020,6 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     scraped_cache = {}
     MAX_SCRAPES = 60  # Safety limit
     scrape_count = 0
-    sc_name_map = {
-        'Andy J.': 'Andy Jakes',
-        'Fletcher J.': 'Fletcher Jakes',
-        'Hamish M.': 'Hamish McNee',
-        'Bruce Kennaway': 'Bruce Kennaway',
-        'Steve': 'Steve',
-        'Steve Lewthwaite': 'Steve',
-        'Steve L.': 'Steve',
-    }
     
     for date_key, round_data in rounds_needing_scrape.items():
         if scrape_count >= MAX_SCRAPES:
@@ -1075,45 +1027,11 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         url = round_data.get('scorecard_url')
         if not url:
             continue
-        try:
-            resp = requests.get(url, timeout=10, verify=False)
-            sc_soup = BeautifulSoup(resp.text, 'html.parser')
-            sc_sections = sc_soup.find_all(string=re.compile(r'\(Index \d+\.\d+\)'))
-            for ps in sc_sections:
-                gp = ps.parent.parent if ps.parent else None
-                if not gp:
-                    continue
-                pt = gp.get_text().strip()
-                sc_match = re.search(r'(.+?)\s*\(Index\s+(\d+\.\d+)\)', pt)
-                if not sc_match:
-                    continue
-                sc_name = sc_name_map.get(sc_match.group(1).strip(), sc_match.group(1).strip())
-                cache_key = f"{date_key}|{sc_name}"
-                if cache_key in scraped_cache:
-                    continue
-                sc_table = gp.find_next('div', class_='score-table')
-                if not sc_table:
-                    continue
-                for row in sc_table.find_all('div', recursive=False):
-                    cells = row.find_all('div')
-                    texts = [c.get_text().strip() for c in cells]
-                    if not texts or texts[0] != 'Score':
-                        continue
-                    all_vals = texts[1::2]
-                    if len(all_vals) >= 19:  # 18-hole card
-                        scraped_cache[f"{date_key}|{sc_name}"] = {
-                            'front9': [int(v) if v and v.isdigit() else 0 for v in all_vals[0:9]],
-                            'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[10:19]]
-                        }
-                    elif len(all_vals) >= 9:  # 9-hole card
-                        scraped_cache[f"{date_key}|{sc_name}"] = {
-                            'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[:9]]
-                        }
-                    break
-            scrape_count += 1
-        except Exception as e:
-            print(f"Scrape failed for {date_key}: {e}")
-            scrape_count += 1
+        # Historical cards keep their shorter timeout (today's card below allows 15 s)
+        card = ctx.lookup('scorecard', url, scrape_scorecard_hole_scores, url, timeout=10)
+        for sc_name, nines in card.items():
+            scraped_cache[f"{date_key}|{sc_name}"] = nines
+        scrape_count += 1
     
     print(f"Scraped hole scores for {scrape_count} historical rounds")
     
@@ -1127,11 +1045,9 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         if round_date.year != current_year:
             continue
         
-        is_back9 = round_data['course'] == 'back9' or '-back9' in round_data['date']
-        pars = BACK_9_PARS if is_back9 else FRONT_9_PARS
-        si_values = BACK_9_SI if is_back9 else FRONT_9_SI
-        hole_numbers = BACK_9_HOLES if is_back9 else FRONT_9_HOLES
-        rd_config = BACK_9_CONFIG if is_back9 else FRONT_9_CONFIG
+        rd_config = nine_for_round(round_data)
+        pars = rd_config['pars']
+        hole_numbers = rd_config['holes']
         
         for player in round_data.get('players', []):
             name = player['name']
@@ -1139,7 +1055,7 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             
             # Fall back to scraped data
             if not hole_scores:
-                nine = 'back9' if is_back9 else 'front9'
+                nine = rd_config['label']
                 cache_key = f"{round_data['date']}|{name}"
                 if cache_key in scraped_cache:
                     hole_scores = scraped_cache[cache_key].get(nine, [])
@@ -1149,16 +1065,11 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             
             # Calculate course handicap at time of round
             player_index = float(player.get('index', 0))
-            ch = calculate_course_handicap(
-                player_index,
-                rd_config['slope_display'],
-                rd_config['rating_display'],
-                rd_config['par']
-            )
+            ch = display_course_handicap(rd_config, player_index)
             
-            # Allocate strokes and calculate Stableford per hole
-            strokes = allocate_strokes(ch, si_values)
-            stb_per_hole = calculate_stableford_per_hole(hole_scores, pars, strokes)
+            # Allocate strokes (precomputed per CH) and calculate Stableford per hole
+            strokes = strokes_for(rd_config, ch)
+            stb_per_hole = stableford_points(hole_scores, pars, strokes)
             
             if name not in player_hole_stats:
                 player_hole_stats[name] = {}
@@ -1222,7 +1133,7 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     
     # Get weather info - strip -back9 suffix if present
     date_for_weather = latest_round['date'].split('-back9')[0]
-    weather_info = get_weather_for_round(date_for_weather, tee_time)
+    weather_info = ctx.lookup('weather', (date_for_weather, tee_time), get_weather_for_round, date_for_weather, tee_time)
     
     if weather_info:
         # Parse weather components
@@ -1308,18 +1219,11 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         # Add course label when playing 9 holes or when 18 holes (label each 9)
         if has_18_holes or (len(todays_rounds) == 1 and not is_other_course):
             # Determine if front or back 9 from course field or date suffix
-            is_back9 = round_data['course'] == 'back9' or '-back9' in round_data['date']
-            if is_back9:
+            if nine_label_for_round(round_data) == 'back9':
                 message += "⛳ `BACK 9`\n"
             else:
                 message += "🚩 `FRONT 9`\n"
         
-        # Get config for this specific round
-        if round_data['course'] == 'back9':
-            round_config = BACK_9_CONFIG
-        else:
-            round_config = FRONT_9_CONFIG
-        
         round_players = sorted(round_data['players'], key=lambda x: x['stableford'], reverse=True)
         
         # Start monospaced block with table format
@@ -1357,66 +1261,21 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         )
         
         # If no stored hole scores, try to scrape from scorecard URL
+        # (memoized - usually already fetched by the historical backfill above)
         scraped_scores = {}
         if not has_stored_scores:
             scorecard_url = latest_round.get('scorecard_url')
             if scorecard_url:
-                try:
-                    print(f"Scraping hole scores from: {scorecard_url}")
-                    resp = requests.get(scorecard_url, timeout=15, verify=False)
-                    sc_soup = BeautifulSoup(resp.text, 'html.parser')
-                    
-                    sc_name_map = {
-                        'Andy J.': 'Andy Jakes',
-                        'Fletcher J.': 'Fletcher Jakes',
-                        'Hamish M.': 'Hamish McNee',
-                        'Bruce Kennaway': 'Bruce Kennaway',
-                        'Steve': 'Steve'
-                    }
-                    
-                    sc_sections = sc_soup.find_all(string=re.compile(r'\(Index \d+\.\d+\)'))
-                    for ps in sc_sections:
-                        gp = ps.parent.parent if ps.parent else None
-                        if not gp:
-                            continue
-                        pt = gp.get_text().strip()
-                        sc_match = re.search(r'(.+?)\s*\(Index\s+(\d+\.\d+)\)', pt)
-                        if not sc_match:
-                            continue
-                        sc_name = sc_name_map.get(sc_match.group(1).strip(), sc_match.group(1).strip())
-                        if sc_name in scraped_scores:
-                            continue
-                        
-                        sc_table = gp.find_next('div', class_='score-table')
-                        if not sc_table:
-                            continue
-                        
-                        for row in sc_table.find_all('div', recursive=False):
-                            cells = row.find_all('div')
-                            texts = [c.get_text().strip() for c in cells]
-                            if not texts or texts[0] != 'Score':
-                                continue
-                            all_vals = texts[1::2]
-                            if len(all_vals) >= 19:  # 18-hole card
-                                scraped_scores[sc_name] = {
-                                    'front9': [int(v) if v and v.isdigit() else 0 for v in all_vals[0:9]],
-                                    'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[10:19]]
-                                }
-                            elif len(all_vals) >= 9:  # 9-hole card
-                                scraped_scores[sc_name] = {
-                                    'back9': [int(v) if v and v.isdigit() else 0 for v in all_vals[:9]]
-                                }
-                            break
-                    print(f"Scraped hole scores for: {list(scraped_scores.keys())}")
-                except Exception as e:
-                    print(f"Could not scrape hole scores: {e}")
+                print(f"Scraping hole scores from: {scorecard_url}")
+                scraped_scores = ctx.lookup('scorecard', scorecard_url, scrape_scorecard_hole_scores, scorecard_url)
+                print(f"Scraped hole scores for: {list(scraped_scores.keys())}")
         
         # Collect highlights across all today's rounds
         player_highlights = {}
         for round_data in todays_rounds:
-            is_back9 = round_data['course'] == 'back9' or '-back9' in round_data['date']
-            pars = BACK_9_PARS if is_back9 else FRONT_9_PARS
-            nine = 'back9' if is_back9 else 'front9'
+            rd_config = nine_for_round(round_data)
+            pars = rd_config['pars']
+            nine = rd_config['label']
             
             for player in round_data['players']:
                 hole_scores = player.get('hole_scores', [])
@@ -1475,18 +1334,12 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     current_year = latest_date_obj.year
     
     # Calculate form guide BEFORE season leaderboard (need for trend indicators)
-    form_guide = {}
-    for name, stats in player_stats.items():
-        last_5 = stats['season_rounds'][-5:] if len(stats['season_rounds']) >= 5 else stats['season_rounds']
-        if last_5:
-            scores = [r['stableford'] for r in last_5]
-            avg_last_5 = sum(scores) / len(scores)
-            trend = "📈" if len(scores) >= 3 and scores[-1] > scores[0] else "📉" if len(scores) >= 3 and scores[-1] < scores[0] else "➡️"
-            form_guide[name] = {
-                'scores': scores,
-                'avg': avg_last_5,
-                'trend': trend
-            }
+    # Last 5/10/20 averages, least-squares slopes and EWMA (form_guide.py);
+    # the trend arrow comes from the last-5 slope. All players in one vectorized pass.
+    form_guide = summarize_forms({
+        name: [r['stableford'] for r in stats['season_rounds']]
+        for name, stats in player_stats.items()
+    })
     
     # Season leaderboard - Split between qualified and non-qualified players
     # Check if after June to apply DNQ logic
@@ -1571,6 +1424,10 @@ def generate_whatsapp_summary(rounds, specific_date=None):
         message += f"─────────────────────────\n"
         message += f"🎯 {stats['rounds_count']} rounds{dnq_text}\n"
         message += f"📊 WHS {stats['calculated_index']:.1f}{index_arrow} | War HCP {stats['latest_ch']}{ch_arrow}\n"
+        rating = ratings['players'].get(name) if ratings else None
+        if rating:
+            rating_arrow = f" ({rating['change']:+.0f})" if abs(rating['change']) >= 0.5 else ""
+            message += f"⚡ Rating {rating['rating']:.0f}{rating_arrow}\n"
         message += f"🏆 PBs: {stats['best_stableford']} stb | {stats['best_gross']} gs\n"
         message += f"📈 Avg: {stats['avg_gross']:.1f}\n"
         # Best/worst hole
@@ -1584,81 +1441,25 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     
     # ========================================
     # YEAR-OVER-YEAR COMPARISON (2026+)
-    # DISABLED - Can be re-enabled later by changing False to: current_year >= 2026
+    # Same period last year comes from the day-of-year prefix index (season_index.py),
+    # one O(1) lookup per player. Set YEAR_OVER_YEAR=false to switch it off.
     # ========================================
-    if False:
+    if YEAR_OVER_YEAR_ENABLED and current_year >= 2026:
         # Get previous year's data for same date range
         prev_year = current_year - 1
         current_day_of_year = latest_date_obj.timetuple().tm_yday
         
-        # Filter previous year rounds up to the same day of year
-        prev_year_rounds = []
-        for r in rounds:
-            round_date = parse_date_flexible(r['date'])
-            if round_date.year == prev_year:
-                day_of_year = round_date.timetuple().tm_yday
-                if day_of_year <= current_day_of_year:
-                    prev_year_rounds.append(r)
-        
-        # Calculate previous year stats
+        # Reused across warm invocations until the rounds change (see get_season_index)
+        season_index = get_season_index(rounds, config['slope'], config['rating'], group_id)
         prev_year_stats = {}
-        if prev_year_rounds:
-            for round_data in prev_year_rounds:
-                for player in round_data['players']:
-                    name = player['name']
-                    if name not in prev_year_stats:
-                        prev_year_stats[name] = {
-                            'total_stableford': 0,
-                            'rounds_count': 0,
-                            'total_gross': 0,
-                            'differentials': []
-                        }
-                    
-                    prev_year_stats[name]['total_stableford'] += player['stableford']
-                    prev_year_stats[name]['rounds_count'] += 1
-                    if player.get('gross', 0) > 0:
-                        prev_year_stats[name]['total_gross'] += player['gross']
-                    
-                    # Calculate differential for handicap
-                    course_key = round_data['course']
-                    if course_key == 'back9':
-                        config = BACK_9_CONFIG
-                    else:
-                        config = FRONT_9_CONFIG
-                    
-                    if player.get('gross', 0) > 0:
-                        diff = calculate_differential(
-                            player['gross'],
-                            config['rating'],
-                            config['slope'],
-                            config['par']
-                        )
-                        prev_year_stats[name]['differentials'].append({
-                            'differential': diff,
-                            'date': round_data['date']
-                        })
-            
-            # Calculate previous year averages and handicaps
-            for name in prev_year_stats:
-                stats = prev_year_stats[name]
-                stats['avg_stableford'] = stats['total_stableford'] / stats['rounds_count']
-                if stats['total_gross'] > 0:
-                    stats['avg_gross'] = stats['total_gross'] / stats['rounds_count']
-                else:
-                    stats['avg_gross'] = 0
-                
-                # Calculate handicap index
-                if stats['differentials']:
-                    sorted_diffs = sorted(stats['differentials'], key=lambda x: x['date'])
-                    differentials = [d['differential'] for d in sorted_diffs]
-                    hc_calc = HandicapCalculator()
-                    stats['handicap_index'] = hc_calc.update_handicap_index(0, differentials)
-                else:
-                    stats['handicap_index'] = 0
+        for name in season_index.players(prev_year):
+            prev_stats = season_index.season_to_date(name, prev_year, current_day_of_year)
+            if prev_stats:
+                prev_year_stats[name] = prev_stats
         
         # Build comparison if we have previous year data
         if prev_year_stats:
-            message += f"*� YEAR-OVER-YEAR COMPARISON:*\n"
+            message += f"\n\n*📊 YEAR-OVER-YEAR COMPARISON:*\n"
             message += f"({current_year} vs {prev_year} - Same Period)\n\n"
             message += "```\n"
             
@@ -1700,7 +1501,25 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             
             message += "```\n\n"
     
-    # Calculate hottest player for AI commentary (best last 5 avg)
+    # Next-round odds: Monte Carlo over each player's hole-by-hole form (predictor.py)
+    # Seeded by the round date so re-requesting the summary gives the same odds
+    predictions = predict_next_round(
+        rounds,
+        {name: stats['calculated_index'] for name, stats in active_players.items()},
+        nine=config,
+        seed=int(latest_date_base.replace('-', ''))
+    )
+    if predictions:
+        message += "\n*🔮 NEXT ROUND ODDS:*\n"
+        message += "```\n"
+        message += "Player      Win  Pod xPts\n"
+        message += "─────────────────────────\n"
+        for name, odds in predictions.items():
+            first_name = get_display_name(name).split()[0]
+            message += f"{first_name:10s} {odds['win'] * 100:3.0f}% {odds['podium'] * 100:3.0f}% {odds['expected_points']:4.1f}\n"
+        message += "```\n"
+    
+    # Fallback for AI commentary without predictions: hottest player (best last 5 avg)
     hottest = max(form_guide.items(), key=lambda x: x[1]['avg']) if form_guide else None
     
     # Prepare handicap change information for today's players
@@ -1722,7 +1541,9 @@ def generate_whatsapp_summary(rounds, specific_date=None):
     try:
         # Prepare prediction text for AI
         ai_prediction_text = None
-        if hottest:
+        if predictions:
+            ai_prediction_text = prediction_text(predictions)
+        elif hottest:
             hottest_name = hottest[0]
             ai_prediction_text = f"{hottest_name} is the favorite for next round (hottest form: {hottest[1]['avg']:.1f} avg last 5)"
         
@@ -1732,7 +1553,8 @@ def generate_whatsapp_summary(rounds, specific_date=None):
             sorted_players, 
             form_data=form_guide,
             prediction_text=ai_prediction_text,
-            handicap_changes=handicap_changes_text
+            handicap_changes=handicap_changes_text,
+            ctx=ctx
         )
         print(f"DEBUG: generate_ai_commentary returned: {commentary is not None}")
         if commentary:
@@ -1788,6 +1610,28 @@ def lambda_handler(event, context):
     {
         "action": "get_summary"
     }
+    OR
+    {
+        "action": "form",
+        "season": "2026",        (optional, default latest season, "all" for every round)
+        "windows": [5, 10, 20],  (optional)
+        "alpha": 0.3             (optional EWMA weight)
+    }
+    OR
+    {
+        "action": "head_to_head",
+        "season": "2026",        (optional, default current year)
+        "player1": "Andy Jakes", (optional - both players for one record, neither for the matrix)
+        "player2": "Fletcher Jakes"
+    }
+    OR
+    {
+        "action": "simulate",
+        "player": "Andy Jakes",
+        "scores": [42, 45],      (optional hypothetical 9-hole gross scores)
+        "cards": [[5, 4, ...]],  (optional hole-by-hole cards, 0 = blob)
+        "target_index": 12.0     (optional, default one War HCP shot lower)
+    }
     """
     print(f"=== Lambda Invoked ===")
     
@@ -1907,10 +1751,122 @@ def lambda_handler(event, context):
         query_params = event.get('queryStringParameters', {}) or {}
         specific_date = query_params.get('date') or body.get('specific_date')
         
-        print(f"Action: {action}")
+        # Which group's partition to read/write
+        group_id = query_params.get('group_id') or body.get('group_id') or DEFAULT_GROUP_ID
+        
+        print(f"Action: {action} (group: {group_id})")
         if specific_date:
             print(f"Specific date requested: {specific_date}")
         
+        if action == 'form':
+            # Form series for charting: rolling averages, slopes and EWMA at every round
+            rounds = get_all_rounds(group_id)
+            season = body.get('season') or query_params.get('season')
+            if not season and rounds:
+                season = rounds[-1]['date'][:4]
+            if season == 'all':
+                season = None
+            try:
+                windows = sorted({int(w) for w in (body.get('windows') or FORM_WINDOWS)})
+                alpha = float(body.get('alpha', EWMA_ALPHA))
+                if not windows or windows[0] < 1 or not 0 < alpha <= 1:
+                    raise ValueError
+            except (TypeError, ValueError):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'windows must be positive integers and alpha in (0, 1]'})
+                }
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'season': season or 'all',
+                    'windows': windows,
+                    'alpha': alpha,
+                    'players': form_series(rounds, season, windows, alpha)
+                })
+            }
+        
+        if action == 'head_to_head':
+            # Pairwise season records from the stored matrix (built on first request)
+            season = str(body.get('season') or query_params.get('season') or datetime.now().year)
+            player1 = body.get('player1') or query_params.get('player1')
+            player2 = body.get('player2') or query_params.get('player2')
+            if not re.fullmatch(r'\d{4}', season):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'season must be a 4-digit year'})
+                }
+            matrix = head_to_head.get_season(table, season, group_id)
+            
+            if player1 and player2:
+                result = {'season': season, 'record': head_to_head.lookup(matrix, player1, player2)}
+            else:
+                pairs = {}
+                for key in sorted(matrix['pairs']):
+                    a, b = key.split('|', 1)
+                    pairs[key] = head_to_head.lookup(matrix, a, b)
+                result = {'season': season, 'rounds': len(matrix['applied_rounds']), 'pairs': pairs}
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps(result)
+            }
+        
+        if action == 'simulate':
+            # What-if index / CH from the cached differential window (no rounds read)
+            player = body.get('player') or query_params.get('player')
+            try:
+                scores = body.get('scores') or []
+                cards = body.get('cards') or []
+                if not isinstance(scores, list) or not isinstance(cards, list) \
+                        or not all(isinstance(card, list) for card in cards):
+                    raise TypeError
+                scores = [int(g) for g in scores]
+                cards = [[int(s or 0) for s in card] for card in cards]
+                target_index = body.get('target_index')
+                target_index = float(target_index) if target_index is not None else None
+                if not player or any(g <= 0 for g in scores):
+                    raise ValueError
+            except (TypeError, ValueError):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'player is required; scores must be a list of positive '
+                                                 'integers and cards a list of hole score lists'})
+                }
+            
+            windows = handicap_window.get_windows(table, group_id)
+            nine = body.get('nine') if body.get('nine') in ('front9', 'back9') else None
+            try:
+                result = handicap_window.simulate(windows, player, scores, cards, nine, target_index)
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': str(e)})
+                }
+            if result is None:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({'error': f'No handicap rounds for {player}'})
+                }
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps(result)
+            }
+        
         if action == 'add_round':
             url = body.get('url')
             if not url:
@@ -1923,7 +1879,6 @@ def lambda_handler(event, context):
             # Example: "I played 26 at Warringah...\nhttps://www.tagheuergolf.com/rounds/..."
             if isinstance(url, str) and 'tagheuergolf.com' in url:
                 # Extract URL using regex
-                import re
                 url_match = re.search(r'https://www\.tagheuergolf\.com/rounds/[A-Za-z0-9-]+', url)
                 if url_match:
                     url = url_match.group(0)
@@ -1951,6 +1906,7 @@ def lambda_handler(event, context):
             # Process each round
             saved_count = 0
             duplicate_count = 0
+            saved_rounds = []
             for rd in rounds_to_process:
                 # Check if round is too old
                 if not is_recent_round(rd['date']):
@@ -1966,40 +1922,55 @@ def lambda_handler(event, context):
                         })
                     }
                 
-                # For 18-hole rounds, need unique storage keys
-                # Store front9 and back9 with date suffixes to avoid overwrite
-                if len(rounds_to_process) == 2:
-                    # 18-hole round - modify dates for storage
-                    if rd['course'] == 'back9':
-                        storage_date = f"{rd['date']}-back9"
-                    else:
-                        storage_date = rd['date']  # front9 uses standard date
-                    display_date = rd['date']  # Keep original for display
-                    
-                    if not check_duplicate_round(storage_date):
-                        rd_copy = rd.copy()
-                        rd_copy['date'] = storage_date
-                        save_round(rd_copy)
-                        saved_count += 1
-                        print(f"✅ New round saved for {display_date} ({rd['course']})")
-                    else:
-                        duplicate_count += 1
-                        print(f"ℹ️ Duplicate round detected for {display_date} ({rd['course']}), skipping save")
+                # Front 9 and back 9 have distinct sort keys (date#course), so
+                # both halves of an 18-hole day are stored under their real date
+                if not check_duplicate_round(rd['date'], rd['course'], group_id):
+                    save_round(rd, group_id)
+                    saved_rounds.append(rd)
+                    saved_count += 1
+                    print(f"✅ New round saved for {rd['date']} ({rd['course']})")
                 else:
-                    # Single 9-hole round - use original logic
-                    if not check_duplicate_round(rd['date']):
-                        save_round(rd)
-                        saved_count += 1
-                        print(f"✅ New round saved for {rd['date']}")
-                    else:
-                        duplicate_count += 1
-                        print(f"ℹ️ Duplicate round detected for {rd['date']}, skipping save")
+                    duplicate_count += 1
+                    print(f"ℹ️ Duplicate round detected for {rd['date']} ({rd['course']}), skipping save")
             
             print(f"Total rounds saved: {saved_count}, duplicates skipped: {duplicate_count}")
+            
+            if saved_rounds:
+                # The day's PCC first, so the handicap windows below include it
+                try:
+                    update_pcc(table, saved_rounds, group_id)
+                except Exception as e:
+                    print(f"PCC update failed (run pcc.py to recalculate): {e}")
+                # Incremental rating update from the new rounds' finishing order
+                try:
+                    update_ratings(table, saved_rounds, group_id)
+                except Exception as e:
+                    print(f"Rating update failed (run ratings.py to replay): {e}")
+                try:
+                    head_to_head.update_head_to_head(table, saved_rounds, group_id)
+                except Exception as e:
+                    print(f"Head-to-head update failed (run head_to_head.py to rebuild): {e}")
+                try:
+                    handicap_window.update_windows(table, saved_rounds, group_id)
+                except Exception as e:
+                    print(f"Handicap window update failed (run handicap_window.py to rebuild): {e}")
         
         # Get all rounds and generate summary
-        rounds = get_all_rounds()
-        summary = generate_whatsapp_summary(rounds, specific_date=specific_date)
+        rounds = get_all_rounds(group_id)
+        ctx = RequestContext()
+        
+        # Ratings are current, so only shown on the latest summary (one GetItem, no history scan)
+        ratings = None
+        if not specific_date:
+            try:
+                ratings = ctx.lookup('ratings', group_id, load_ratings, table, group_id)
+            except Exception as e:
+                print(f"Could not load ratings: {e}")
+        
+        summary = generate_whatsapp_summary(rounds, specific_date=specific_date, ctx=ctx, ratings=ratings,
+                                            group_id=group_id)
+        print(f"External lookups this request: {ctx.stats()}")
+        print(f"External hosts (this container): {resilience.stats()}")
         
         return {
             'statusCode': 200,
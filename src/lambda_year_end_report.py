@@ -6,8 +6,8 @@ import json
 import boto3
 import os
 from datetime import datetime
-from collections import defaultdict
-from decimal import Decimal
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID
+from year_end_engine import compute_season, fetch_season_rounds, render_report, render_footer, get_display_name
 
 OPENAI_ENABLED = False
 try:
@@ -21,18 +21,7 @@ except Exception as e:
 
 # Initialize DynamoDB
 dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
-table = dynamodb.Table('golf-rounds')
-
-def parse_date(date_str):
-    """Parse date from string, handling -back9 suffix"""
-    clean_date = date_str.split('-back9')[0]
-    return datetime.strptime(clean_date, '%Y-%m-%d')
-
-def get_display_name(name):
-    """Convert database names to display names"""
-    if name == "Steve":
-        return "Steve Lewthwaite"
-    return name
+table = dynamodb.Table(TABLE_NAME)
 
 def lambda_handler(event, context):
     """
@@ -40,19 +29,17 @@ def lambda_handler(event, context):
     
     Query params:
     - year: Year to generate report for (default: current year)
+    - group_id: Group to report on (default: GROUP_ID env var)
     """
     
     # Get year from query params or use current year
     query_params = event.get('queryStringParameters', {}) or {}
     year = query_params.get('year', str(datetime.now().year))
+    group_id = query_params.get('group_id') or DEFAULT_GROUP_ID
     
     try:
-        # Get all rounds
-        response = table.scan()
-        rounds = response.get('Items', [])
-        
-        # Filter for specified year
-        rounds_year = [r for r in rounds if r['date'].startswith(str(year))]
+        # Get this season's rounds (Query on the group partition, sort key prefix = year)
+        rounds_year = fetch_season_rounds(table, group_id, [year])
         
         if not rounds_year:
             return {
@@ -62,100 +49,9 @@ def lambda_handler(event, context):
                 })
             }
         
-        # Calculate comprehensive stats
-        player_stats = defaultdict(lambda: {
-            'rounds': [],
-            'total_points': 0,
-            'best_score': 0,
-            'worst_score': 100,
-            'monthly_wins': defaultdict(int),
-            'front9_points': [],
-            'back9_points': [],
-            'winning_rounds': 0,
-            'podium_finishes': 0
-        })
-        
-        # Process each round
-        for round_data in rounds_year:
-            round_date = parse_date(round_data['date'])
-            month = round_date.strftime('%B')
-            
-            # NOTE: Database labels are BACKWARDS
-            course_field = round_data.get('course', 'back9')
-            is_back9_in_reality = (course_field == 'front9' or '-back9' in round_data['date'])
-            
-            # Get winner of this round
-            round_players = sorted(round_data['players'], key=lambda x: int(x['stableford']), reverse=True)
-            
-            for rank, player in enumerate(round_players, 1):
-                name = player['name']
-                points = int(player['stableford'])
-                
-                player_stats[name]['rounds'].append({
-                    'date': round_date,
-                    'points': points,
-                    'month': month,
-                    'nine': 'back9' if is_back9_in_reality else 'front9'
-                })
-                player_stats[name]['total_points'] += points
-                player_stats[name]['best_score'] = max(player_stats[name]['best_score'], points)
-                player_stats[name]['worst_score'] = min(player_stats[name]['worst_score'], points)
-                
-                if is_back9_in_reality:
-                    player_stats[name]['back9_points'].append(points)
-                else:
-                    player_stats[name]['front9_points'].append(points)
-                
-                # Track wins and podiums
-                if rank == 1:
-                    player_stats[name]['winning_rounds'] += 1
-                    player_stats[name]['monthly_wins'][month] += 1
-                if rank <= 3:
-                    player_stats[name]['podium_finishes'] += 1
-        
-        # Calculate averages and additional metrics
-        for name, stats in player_stats.items():
-            rounds_count = len(stats['rounds'])
-            if rounds_count > 0:
-                stats['avg'] = stats['total_points'] / rounds_count
-                stats['rounds_count'] = rounds_count
-                
-                # Calculate consistency (standard deviation)
-                avg = stats['avg']
-                variance = sum((r['points'] - avg) ** 2 for r in stats['rounds']) / rounds_count
-                stats['std_dev'] = variance ** 0.5
-                
-                # Front 9 vs Back 9 performance
-                if stats['front9_points']:
-                    stats['front9_avg'] = sum(stats['front9_points']) / len(stats['front9_points'])
-                if stats['back9_points']:
-                    stats['back9_avg'] = sum(stats['back9_points']) / len(stats['back9_points'])
-                
-                # Calculate streaks
-                sorted_rounds = sorted(stats['rounds'], key=lambda x: x['date'])
-                current_streak = 0
-                best_streak = 0
-                prev_points = None
-                
-                for r in sorted_rounds:
-                    if prev_points is None or r['points'] >= prev_points:
-                        current_streak += 1
-                        best_streak = max(best_streak, current_streak)
-                    else:
-                        current_streak = 0
-                    prev_points = r['points']
-                
-                stats['best_improving_streak'] = best_streak
-                
-                # Win rate
-                stats['win_rate'] = (stats['winning_rounds'] / rounds_count * 100) if rounds_count > 0 else 0
-        
-        # Sort players by average
-        sorted_players = sorted(
-            [(name, stats) for name, stats in player_stats.items() if stats['rounds_count'] >= 10],
-            key=lambda x: x[1]['avg'],
-            reverse=True
-        )
+        # Single-pass season aggregation (shared with generate_year_end_report.py)
+        summary = compute_season(rounds_year, year)
+        sorted_players = summary['standings']
         
         if not sorted_players:
             return {
@@ -165,120 +61,12 @@ def lambda_handler(event, context):
                 })
             }
         
-        # Most consistent player
-        most_consistent = min(sorted_players, key=lambda x: x[1]['std_dev'])
-        
-        # Best improving streak
-        best_streaker = max(sorted_players, key=lambda x: x[1]['best_improving_streak'])
-        
-        # Most wins
-        most_wins = max(sorted_players, key=lambda x: x[1]['winning_rounds'])
+        most_consistent = summary['most_consistent']
+        best_streaker = summary['best_streaker']
+        most_wins = summary['most_wins']
         
         # Generate Report
-        report = f"""⛳ *{year} SEASON REVIEW*
-━ *WARRINGAH GC* ━
-
-*📊 SEASON OVERVIEW*
-```
-Total Rounds: {len(rounds_year)}
-Qualified Players: {len(sorted_players)}
-Season: Jan - Dec {year}
-```
-
-*🏅 FINAL STANDINGS*
-```
-🥇 {get_display_name(sorted_players[0][0])}
-   Average:  {sorted_players[0][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[0][1]['rounds_count']}
-   Total:    {sorted_players[0][1]['total_points']} pts
-   Best:     {sorted_players[0][1]['best_score']} pts
-   Wins:     {sorted_players[0][1]['winning_rounds']} ({sorted_players[0][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[0][1]['podium_finishes']}
-
-🥈 {get_display_name(sorted_players[1][0])}
-   Average:  {sorted_players[1][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[1][1]['rounds_count']}
-   Total:    {sorted_players[1][1]['total_points']} pts
-   Best:     {sorted_players[1][1]['best_score']} pts
-   Wins:     {sorted_players[1][1]['winning_rounds']} ({sorted_players[1][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[1][1]['podium_finishes']}
-
-🥉 {get_display_name(sorted_players[2][0])}
-   Average:  {sorted_players[2][1]['avg']:.2f} pts
-   Rounds:   {sorted_players[2][1]['rounds_count']}
-   Total:    {sorted_players[2][1]['total_points']} pts
-   Best:     {sorted_players[2][1]['best_score']} pts
-   Wins:     {sorted_players[2][1]['winning_rounds']} ({sorted_players[2][1]['win_rate']:.1f}%)
-   Podiums:  {sorted_players[2][1]['podium_finishes']}
-```
-
-*🎯 CONSISTENCY AWARD*
-```
-{get_display_name(most_consistent[0])}
-Std Dev: {most_consistent[1]['std_dev']:.2f}
-```
-
-*🔥 HOT STREAK AWARD*
-```
-{get_display_name(best_streaker[0])}
-{best_streaker[1]['best_improving_streak']} consecutive improving rounds
-```
-
-*🏆 MOST ROUND WINS*
-```
-{get_display_name(most_wins[0])}
-{most_wins[1]['winning_rounds']} victories ({most_wins[1]['win_rate']:.1f}% win rate)
-```
-
-*📅 MONTHLY DOMINANCE*
-```
-"""
-        
-        months = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-        for month in months:
-            # Find who won most in this month
-            month_leaders = [(name, stats['monthly_wins'][month]) for name, stats in player_stats.items() if stats['monthly_wins'][month] > 0]
-            if month_leaders:
-                month_leaders.sort(key=lambda x: x[1], reverse=True)
-                top_winner = month_leaders[0]
-                if top_winner[1] > 0:
-                    winner_first_name = get_display_name(top_winner[0]).split()[0]
-                    report += f"{month[:3]}: {winner_first_name} ({top_winner[1]} wins)\n"
-        
-        report += "```\n\n*🎲 SEASON HIGHLIGHTS*\n```\n"
-        
-        # Highest single round
-        highest_round = max(
-            [(name, max(stats['rounds'], key=lambda x: x['points'])) for name, stats in player_stats.items() if stats['rounds']],
-            key=lambda x: x[1]['points']
-        )
-        report += f"🌟 Best Round:\n"
-        report += f"   {get_display_name(highest_round[0])}\n"
-        report += f"   {highest_round[1]['points']} pts on {highest_round[1]['date'].strftime('%b %d')}\n\n"
-        
-        # Most rounds played
-        most_active = max(sorted_players, key=lambda x: x[1]['rounds_count'])
-        report += f"💪 Most Active:\n"
-        report += f"   {get_display_name(most_active[0])}\n"
-        report += f"   {most_active[1]['rounds_count']} rounds played\n\n"
-        
-        # Biggest improvement
-        for name, stats in sorted_players:
-            recent_5 = stats['rounds'][-5:] if len(stats['rounds']) >= 5 else []
-            early_5 = stats['rounds'][:5] if len(stats['rounds']) >= 5 else []
-            if recent_5 and early_5:
-                recent_avg = sum(r['points'] for r in recent_5) / len(recent_5)
-                early_avg = sum(r['points'] for r in early_5) / len(early_5)
-                stats['improvement'] = recent_avg - early_avg
-        
-        if any('improvement' in stats for name, stats in sorted_players):
-            most_improved = max([(name, stats) for name, stats in sorted_players if 'improvement' in stats], key=lambda x: x[1]['improvement'])
-            if most_improved[1]['improvement'] > 0:
-                report += f"📈 Most Improved:\n"
-                report += f"   {get_display_name(most_improved[0])}\n"
-                report += f"   +{most_improved[1]['improvement']:.1f} pts improvement\n"
-        
-        report += "```\n\n"
+        report = render_report(summary)
         
         # Generate AI Commentary
         if OPENAI_ENABLED:
@@ -289,33 +77,17 @@ Std Dev: {most_consistent[1]['std_dev']:.2f}
                     client = OpenAI(api_key=api_key)
                     
                     # Build context for AI
-                    champion_name = get_display_name(sorted_players[0][0])
-                    champion_avg = sorted_players[0][1]['avg']
-                    champion_wins = sorted_players[0][1]['winning_rounds']
-                    runner_up = get_display_name(sorted_players[1][0])
-                    runner_up_avg = sorted_players[1][1]['avg']
-                    runner_up_wins = sorted_players[1][1]['winning_rounds']
-                    third_place = get_display_name(sorted_players[2][0])
-                    third_avg = sorted_players[2][1]['avg']
-                    
-                    # Calculate quarterly standings to show lead changes
-                    quarters = {'Q1': [], 'Q2': [], 'Q3': [], 'Q4': []}
-                    quarter_leaders = []
-                    
-                    for name, stats in player_stats.items():
-                        for qname, months in [('Q1', ['January', 'February', 'March']), 
-                                              ('Q2', ['April', 'May', 'June']),
-                                              ('Q3', ['July', 'August', 'September']),
-                                              ('Q4', ['October', 'November', 'December'])]:
-                            q_rounds = [r for r in stats['rounds'] if r['month'] in months]
-                            if q_rounds:
-                                q_avg = sum(r['points'] for r in q_rounds) / len(q_rounds)
-                                quarters[qname].append((name, q_avg, len(q_rounds)))
+                    podium = [(get_display_name(name), stats) for name, stats in sorted_players[:3]]
+                    standings_text = "\n".join(
+                        f"{place}. {name}: {stats['avg']:.2f} avg, {stats['winning_rounds']} wins, {stats['rounds_count']} rounds"
+                        for place, (name, stats) in enumerate(podium, 1)
+                    )
                     
-                    for q in ['Q1', 'Q2', 'Q3', 'Q4']:
-                        if quarters[q]:
-                            leader = max(quarters[q], key=lambda x: x[1])
-                            quarter_leaders.append(f"{q}: {get_display_name(leader[0])} ({leader[1]:.1f} avg)")
+                    # Quarterly leaders show how the lead changed
+                    quarter_leaders = [
+                        f"{q}: {get_display_name(name)} ({q_avg:.1f} avg)"
+                        for q, name, q_avg in summary['quarter_leaders']
+                    ]
                     
                     lead_changes_text = " → ".join(quarter_leaders) if quarter_leaders else "Consistent throughout"
                     
@@ -333,9 +105,7 @@ Std Dev: {most_consistent[1]['std_dev']:.2f}
                     prompt = f"""Generate a comprehensive 2-3 paragraph AI commentary for the {year} golf season wrap-up.
 
 FINAL STANDINGS:
-1. {champion_name}: {champion_avg:.2f} avg, {champion_wins} wins, {sorted_players[0][1]['rounds_count']} rounds
-2. {runner_up}: {runner_up_avg:.2f} avg, {runner_up_wins} wins, {sorted_players[1][1]['rounds_count']} rounds  
-3. {third_place}: {third_avg:.2f} avg, {sorted_players[2][1]['winning_rounds']} wins, {sorted_players[2][1]['rounds_count']} rounds
+{standings_text}
 
 QUARTERLY LEADERS (showing how the lead changed):
 {lead_changes_text}
@@ -345,7 +115,7 @@ INDIVIDUAL PERFORMANCES:
 
 AWARDS: {awards_text}
 
-TOTAL ROUNDS: {len(rounds_year)}
+TOTAL ROUNDS: {summary['total_rounds']}
 
 IMPORTANT NOTES:
 - The group plays almost exclusively on the BACK 9 at Warringah GC (9-hole rounds only)
@@ -392,11 +162,7 @@ Keep it fun, slightly cheeky but respectful, and make it feel like a sports wrap
         else:
             print("OpenAI not enabled")
         
-        report += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        report += f"*THANK YOU FOR AN AMAZING*\n"
-        report += f"*{year} SEASON! 🏆*\n"
-        report += f"*SEE YOU IN {int(year)+1}! ⛳*\n"
-        report += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        report += render_footer(year)
         
         return {
             'statusCode': 200,
@@ -406,7 +172,7 @@ Keep it fun, slightly cheeky but respectful, and make it feel like a sports wrap
             'body': json.dumps({
                 'summary': report,
                 'year': year,
-                'total_rounds': len(rounds_year),
+                'total_rounds': summary['total_rounds'],
                 'qualified_players': len(sorted_players)
             })
         }
@@ -0,0 +1,352 @@
+"""
+Rounds Table Migration
+Rewrites every item of a source table into a destination table through a
+pluggable transform. Built for key-schema changes such as moving the legacy
+date-keyed golf-rounds table onto the group-partitioned golf-rounds-v2.
+
+- Parallel segmented Scan of the source (one worker per segment)
+- Each item goes through a transform function (item -> item, list of items, or None to skip)
+- Writes go through batch_writer, flushed at the end of every scanned page
+- A checkpoint file records each segment's LastEvaluatedKey, so an interrupted run resumes;
+  it is removed once every segment has finished
+- A verification pass compares item counts and checksums of source (transformed) vs destination
+
+Usage:
+    python migrate_rounds.py                                  # golf-rounds -> golf-rounds-v2
+    python migrate_rounds.py --segments 8 --group-id my-group
+    python migrate_rounds.py --transform mymodule:my_transform
+    python migrate_rounds.py --verify-only
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from rounds_table import TABLE_NAME, DEFAULT_GROUP_ID, base_date, make_round_key
+
+REGION = 'ap-southeast-2'
+LEGACY_TABLE_NAME = 'golf-rounds'
+
+
+# ─── Transforms ─────────────────────────────────────────────────────────────
+
+def identity(item):
+    """Copy the item unchanged"""
+    return item
+
+
+def to_group_partition(item, group_id=DEFAULT_GROUP_ID):
+    """
+    Legacy date-keyed round -> group-partitioned round.
+    "2025-12-22-back9" becomes date "2025-12-22" with round_key "2025-12-22#back9",
+    marked split_18 so year-end tooling still knows it's a real back 9.
+    """
+    date_str = item['date']
+    course = item.get('course', 'back9')
+    new_item = dict(item)
+    if '-back9' in date_str:
+        course = 'back9'
+        new_item['split_18'] = True
+    new_item['date'] = base_date(date_str)
+    new_item['course'] = course
+    new_item['group_id'] = group_id
+    new_item['round_key'] = make_round_key(date_str, course)
+    return new_item
+
+
+TRANSFORMS = {
+    'identity': identity,
+    'group_partition': to_group_partition,
+}
+
+
+def load_transform(spec, group_id):
+    """Resolve a transform by registry name or "module:function" path"""
+    if spec in TRANSFORMS:
+        fn = TRANSFORMS[spec]
+        return partial(fn, group_id=group_id) if fn is to_group_partition else fn
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f"Unknown transform '{spec}' (use one of {sorted(TRANSFORMS)} or module:function)")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def apply_transform(transform, item):
+    """Run a transform and normalise its result to a list of items"""
+    result = transform(item)
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return result
+    return [result]
+
+
+# ─── Checkpoint ─────────────────────────────────────────────────────────────
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def encode_key(key):
+    """LastEvaluatedKey -> JSON-safe DynamoDB JSON"""
+    if key is None:
+        return None
+    return {k: _serializer.serialize(v) for k, v in key.items()}
+
+
+def decode_key(key):
+    """DynamoDB JSON -> LastEvaluatedKey"""
+    if key is None:
+        return None
+    return {k: _deserializer.deserialize(v) for k, v in key.items()}
+
+
+class Checkpoint:
+    """Per-segment scan progress persisted to a JSON file after every page"""
+
+    def __init__(self, path, run_info, total_segments):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = None
+
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('run') == run_info and saved.get('total_segments') == total_segments:
+                self.state = saved
+                print(f"↻ Resuming from checkpoint {path}")
+            else:
+                print(f"⚠️  Checkpoint {path} is for a different run - starting fresh")
+
+        if self.state is None:
+            self.state = {
+                'run': run_info,
+                'total_segments': total_segments,
+                'segments': {
+                    str(i): {'last_key': None, 'done': False, 'scanned': 0, 'written': 0}
+                    for i in range(total_segments)
+                },
+            }
+
+    def segment(self, segment):
+        return self.state['segments'][str(segment)]
+
+    def advance(self, segment, last_key, scanned, written):
+        """Record a fully written page for a segment"""
+        with self.lock:
+            seg = self.segment(segment)
+            seg['last_key'] = encode_key(last_key)
+            seg['done'] = last_key is None
+            seg['scanned'] += scanned
+            seg['written'] += written
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        """Delete the checkpoint file once every segment is done - nothing left to resume"""
+        if self.path and all(s['done'] for s in self.state['segments'].values()) and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def totals(self):
+        segments = self.state['segments'].values()
+        return sum(s['scanned'] for s in segments), sum(s['written'] for s in segments)
+
+
+# ─── Migration ──────────────────────────────────────────────────────────────
+
+def scan_pages(table, segment, total_segments, start_key=None):
+    """Yield (items, last_evaluated_key) for one scan segment"""
+    kwargs = {'Segment': segment, 'TotalSegments': total_segments}
+    if start_key:
+        kwargs['ExclusiveStartKey'] = start_key
+    while True:
+        response = table.scan(**kwargs)
+        last_key = response.get('LastEvaluatedKey')
+        yield response.get('Items', []), last_key
+        if not last_key:
+            break
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def _table(name, region):
+    # boto3 resources are not thread safe - one session per worker
+    return boto3.session.Session().resource('dynamodb', region_name=region, verify=False).Table(name)
+
+
+def migrate_segment(segment, args, transform, checkpoint):
+    """Copy one scan segment, checkpointing after each written page"""
+    seg_state = checkpoint.segment(segment)
+    if seg_state['done']:
+        return
+
+    source = _table(args.source, args.region)
+    dest = _table(args.dest, args.region)
+    key_names = [k['AttributeName'] for k in dest.key_schema]
+
+    for items, last_key in scan_pages(source, segment, args.segments, decode_key(seg_state['last_key'])):
+        written = 0
+        # Flush at the end of the page so the checkpoint never runs ahead of the data
+        with dest.batch_writer(overwrite_by_pkeys=key_names) as batch:
+            for item in items:
+                for new_item in apply_transform(transform, item):
+                    batch.put_item(Item=new_item)
+                    written += 1
+        checkpoint.advance(segment, last_key, len(items), written)
+
+
+def run_migration(args, transform):
+    run_info = {'source': args.source, 'dest': args.dest, 'transform': args.transform, 'group_id': args.group_id}
+    checkpoint = Checkpoint(args.checkpoint, run_info, args.segments)
+
+    start = time.time()
+    done = threading.Event()
+
+    def report_progress():
+        while not done.wait(5):
+            scanned, written = checkpoint.totals()
+            elapsed = time.time() - start
+            print(f"  ... {scanned} scanned, {written} written ({scanned / elapsed:.0f} items/s)")
+
+    reporter = threading.Thread(target=report_progress, daemon=True)
+    reporter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=args.segments) as pool:
+            futures = [pool.submit(migrate_segment, i, args, transform, checkpoint) for i in range(args.segments)]
+            for future in futures:
+                future.result()
+    finally:
+        done.set()
+
+    checkpoint.remove()  # finished cleanly - nothing to resume
+    scanned, written = checkpoint.totals()
+    print(f"✅ Migration complete: {scanned} scanned, {written} written in {time.time() - start:.1f}s")
+
+
+# ─── Verification ───────────────────────────────────────────────────────────
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Unserializable value: {value!r}")
+
+
+def item_checksum(item):
+    """Stable content hash of an item"""
+    canonical = json.dumps(item, sort_keys=True, default=_json_default)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _parallel_scan(table_name, region, total_segments, handle_items):
+    def scan_segment(segment):
+        table = _table(table_name, region)
+        for items, _ in scan_pages(table, segment, total_segments):
+            handle_items(items)
+
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        for future in [pool.submit(scan_segment, i) for i in range(total_segments)]:
+            future.result()
+
+
+def verify_migration(args, transform):
+    """Compare transformed source items against the destination by count and checksum"""
+    print("🔍 Verifying...")
+    dest_keys = [k['AttributeName'] for k in _table(args.dest, args.region).key_schema]
+    lock = threading.Lock()
+
+    expected = {}
+
+    def collect_expected(items):
+        hashes = {}
+        for item in items:
+            for new_item in apply_transform(transform, item):
+                hashes[tuple(str(new_item[k]) for k in dest_keys)] = item_checksum(new_item)
+        with lock:
+            expected.update(hashes)
+
+    actual = {}
+
+    def collect_actual(items):
+        hashes = {tuple(str(item[k]) for k in dest_keys): item_checksum(item) for item in items}
+        with lock:
+            actual.update(hashes)
+
+    _parallel_scan(args.source, args.region, args.segments, collect_expected)
+    _parallel_scan(args.dest, args.region, args.segments, collect_actual)
+
+    missing = [key for key in expected if key not in actual]
+    mismatched = [key for key in expected if key in actual and actual[key] != expected[key]]
+    extra = len(set(actual) - set(expected))
+
+    expected_digest = hashlib.sha256(''.join(sorted(expected.values())).encode()).hexdigest()
+    actual_digest = hashlib.sha256(
+        ''.join(sorted(actual[key] for key in expected if key in actual)).encode()
+    ).hexdigest()
+
+    print(f"  Expected items:  {len(expected)}")
+    print(f"  Found in dest:   {len(expected) - len(missing)}")
+    print(f"  Missing:         {len(missing)}")
+    print(f"  Checksum diffs:  {len(mismatched)}")
+    print(f"  Other dest items: {extra}")
+    print(f"  Digest source/dest: {expected_digest[:16]} / {actual_digest[:16]}")
+
+    for key in (missing + mismatched)[:10]:
+        print(f"    ✗ {key}")
+
+    ok = not missing and not mismatched
+    print("✅ Verification passed" if ok else "❌ Verification FAILED")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate golf rounds to a new table layout')
+    parser.add_argument('--source', default=LEGACY_TABLE_NAME, help='Source table name')
+    parser.add_argument('--dest', default=TABLE_NAME, help='Destination table name')
+    parser.add_argument('--transform', default='group_partition',
+                        help=f"Transform name ({', '.join(sorted(TRANSFORMS))}) or module:function")
+    parser.add_argument('--group-id', default=DEFAULT_GROUP_ID, help='group_id for the group_partition transform')
+    parser.add_argument('--segments', type=int, default=4, help='Parallel scan segments')
+    parser.add_argument('--checkpoint', default='migration_checkpoint.json', help='Checkpoint file path')
+    parser.add_argument('--region', default=REGION)
+    parser.add_argument('--verify-only', action='store_true', help='Skip copying, only verify')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the verification pass')
+    args = parser.parse_args()
+
+    from load_credentials import load_credentials
+    load_credentials()
+
+    transform = load_transform(args.transform, args.group_id)
+
+    print("=" * 70)
+    print(f"MIGRATE {args.source} -> {args.dest}")
+    print(f"Transform: {args.transform} | Segments: {args.segments} | Checkpoint: {args.checkpoint}")
+    print("=" * 70)
+
+    if not args.verify_only:
+        run_migration(args, transform)
+    if not args.no_verify:
+        if not verify_migration(args, transform):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
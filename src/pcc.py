@@ -0,0 +1,198 @@
+"""
+Playing Conditions Calculation
+Field-based PCC per day and nine, computed from how everyone scored.
+
+WHS adjusts differentials when the field as a whole scores well away from
+what its handicaps predict. Here every handicap-eligible score gets a
+residual: its 18-hole-equivalent differential minus the player's index at
+the time, less the calibration - the typical gap between the two (an index
+is the best 8 of 20 x 0.96, so an average day sits a few strokes above it).
+Residuals are grouped by (date, nine) and averaged in one vectorized pass.
+
+As in WHS a day's PCC is fixed once it is set. The calibration is the median
+gap over the history, frozen in one item per group (round_key "META#pcc");
+add_round computes PCC for the saved rounds only, against that stored value,
+and never rewrites older rounds. Recalibrating (and restating past PCC) is
+only done by the explicit backfill below.
+
+Our fields are 2-5 players rather than the hundreds WHS expects, so a day's
+mean is shrunk towards zero by n / (n + PCC_PRIOR) before it is turned into
+an adjustment of -1, 0 or +1..+3, and days with fewer than MIN_FIELD scores
+get 0. The result is stored on each round item as `pcc` and used as WHS
+does, Differential = 113 / Slope x (AGS - CR - PCC): a hard day (positive
+PCC) lowers everyone's differential, an easy day (-1) raises it.
+
+Usage:
+    python pcc.py [group_id]     # recalibrate and store PCC for the whole history
+"""
+
+import sys
+from decimal import Decimal
+
+from course_registry import nine_for_round
+from rounds_table import (DEFAULT_GROUP_ID, META_PREFIX, TABLE_NAME, make_round_key, query_rounds,
+                          split_round_key)
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+    print("numpy not available - playing conditions will not be calculated")
+
+# Rounds on or before this date keep PCC 0 (indices already published without it)
+PCC_START_DATE = "2025-12-14"
+# Fewest scores on a day/nine before a PCC is calculated
+MIN_FIELD = 3
+# Pseudo-scores of "normal conditions" the day's mean is shrunk towards
+PCC_PRIOR = 4
+# Differential strokes of shrunk mean residual per PCC step
+PCC_STEP = 3.0
+PCC_MIN = -1
+PCC_MAX = 3
+
+CALIBRATION_KEY = f"{META_PREFIX}pcc"
+
+
+def _round_key(round_data):
+    return round_data.get('round_key') or make_round_key(round_data['date'], round_data['course'])
+
+
+def _score_rows(rounds):
+    """(round key, differential, index at the time) for every handicap-eligible score"""
+    keys, differentials, indices = [], [], []
+    for round_data in rounds:
+        if not round_data.get('handicap_eligible', True):
+            continue
+        nine = nine_for_round(round_data)
+        for player in round_data.get('players', []):
+            gross = int(player.get('gross', 0) or 0)
+            if gross <= 0:
+                continue
+            keys.append(_round_key(round_data))
+            differentials.append((gross * 2 - nine['rating'] * 2) * (113 / nine['slope']))
+            indices.append(float(player.get('index', 0) or 0))
+    return keys, differentials, indices
+
+
+def calibrate(rounds):
+    """Median differential - index gap over rounds (None if there are no scores or no numpy)"""
+    if not NUMPY_ENABLED:
+        return None
+    _, differentials, indices = _score_rows(rounds)
+    if not differentials:
+        return None
+    return float(np.median(np.array(differentials) - np.array(indices)))
+
+
+def compute_pcc(rounds, calibration=None):
+    """
+    {round_key: pcc} for every handicap-eligible round (one pass, vectorized),
+    measured against calibration (default: the median gap of these rounds).
+    Returns {} if numpy is unavailable.
+    """
+    if not NUMPY_ENABLED:
+        return {}
+    keys, differentials, indices = _score_rows(rounds)
+    if not keys:
+        return {}
+
+    # Each round key is one date and nine, so it is the grouping key
+    days, group = np.unique(np.array(keys), return_inverse=True)
+    residuals = np.array(differentials) - np.array(indices)
+    residuals -= np.median(residuals) if calibration is None else calibration
+
+    counts = np.bincount(group, minlength=len(days))
+    means = np.bincount(group, weights=residuals, minlength=len(days)) / counts
+    shrunk = means * counts / (counts + PCC_PRIOR)
+    pcc = np.clip(np.round(shrunk / PCC_STEP), PCC_MIN, PCC_MAX).astype(int)
+    pcc[counts < MIN_FIELD] = 0
+
+    return {
+        key: int(value) if split_round_key(key)[0] > PCC_START_DATE else 0
+        for key, value in zip(days.tolist(), pcc.tolist())
+    }
+
+
+def store_pcc(table, rounds, pccs, group_id=DEFAULT_GROUP_ID):
+    """Write pcc onto round items whose stored value differs; returns the round keys updated"""
+    updated = []
+    for round_data in rounds:
+        key = _round_key(round_data)
+        if key not in pccs:
+            continue
+        value = pccs[key]
+        if round_data.get('pcc') is not None and int(round_data['pcc']) == value:
+            continue
+        round_data['pcc'] = value
+        table.update_item(
+            Key={'group_id': group_id, 'round_key': key},
+            UpdateExpression='SET pcc = :pcc',
+            ExpressionAttributeValues={':pcc': Decimal(value)},
+        )
+        updated.append(key)
+    return updated
+
+
+def load_calibration(table, group_id=DEFAULT_GROUP_ID):
+    """Stored calibration for a group (None if never calibrated)"""
+    item = table.get_item(Key={'group_id': group_id, 'round_key': CALIBRATION_KEY}).get('Item')
+    return float(item['calibration']) if item else None
+
+
+def save_calibration(table, calibration, group_id=DEFAULT_GROUP_ID):
+    table.put_item(Item={
+        'group_id': group_id,
+        'round_key': CALIBRATION_KEY,
+        'calibration': Decimal(str(round(calibration, 3))),
+    })
+
+
+def backfill_pcc(table, group_id=DEFAULT_GROUP_ID):
+    """
+    Recalibrate on a group's whole history, store the new calibration and every
+    PCC that changed (past differentials move - rebuild the handicap windows after)
+    """
+    rounds = query_rounds(table, group_id)
+    calibration = calibrate(rounds)
+    if calibration is None:
+        print("PCC: no scores to calibrate on")
+        return {}
+    pccs = compute_pcc(rounds, calibration)
+    updated = store_pcc(table, rounds, pccs, group_id)
+    save_calibration(table, calibration, group_id)
+    adjusted = sum(1 for value in pccs.values() if value)
+    print(f"PCC: {len(pccs)} rounds, {adjusted} adjusted, {len(updated)} items updated "
+          f"(calibration {calibration:.2f})")
+    return pccs
+
+
+def update_pcc(table, new_rounds, group_id=DEFAULT_GROUP_ID):
+    """
+    PCC for newly saved rounds (add_round path) against the stored calibration.
+
+    Only the saved rounds' (date, nine) keys are computed and written; older
+    rounds keep the PCC they were published with. A group that has never been
+    calibrated is calibrated once on the rounds before the earliest new one.
+    Sets round_data['pcc'] on new_rounds and returns the keys stored.
+    """
+    calibration = load_calibration(table, group_id)
+    if calibration is None:
+        first = min(_round_key(r) for r in new_rounds)
+        calibration = calibrate([r for r in query_rounds(table, group_id) if _round_key(r) < first])
+        if calibration is None:
+            return []
+        save_calibration(table, calibration, group_id)
+    return store_pcc(table, new_rounds, compute_pcc(new_rounds, calibration), group_id)
+
+
+if __name__ == '__main__':
+    import boto3
+
+    group_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_GROUP_ID
+    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+    table = dynamodb.Table(TABLE_NAME)
+    backfill_pcc(table, group_id)
+    # Recalibration restates past differentials - the cached windows are stale
+    from handicap_window import rebuild_windows
+    rebuild_windows(table, group_id)
@@ -0,0 +1,148 @@
+"""
+Next-Round Predictor
+Monte Carlo win / podium / expected-points odds for the next round.
+
+Each player's recent stored hole_scores give an empirical distribution of
+gross-to-par on every hole of the nine. A simulated round draws one value
+per hole, applies the strokes the player gets today (allocate_strokes at
+their current Course Handicap) and scores Stableford the same way the
+summary does. All players and simulations are drawn at once with NumPy,
+so tens of thousands of rounds take a few milliseconds.
+
+Holes a player has too few scores on fall back to their scores on every
+hole of the same par. Players without enough hole-by-hole rounds are left
+out of the simulation.
+"""
+
+from course_registry import allocate_strokes, display_course_handicap, net_stableford, nine_for_round
+from rounds_table import round_sort_key
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+    print("numpy not available - next-round predictions will be skipped")
+
+# Simulated next rounds per prediction
+SIMULATIONS = 20000
+# Most recent hole-by-hole rounds sampled per player (current form)
+HISTORY_ROUNDS = 20
+# Minimum hole-by-hole rounds on the nine before a player is simulated
+MIN_ROUNDS = 3
+# Minimum scores on a hole before it is sampled on its own (else pooled by par)
+MIN_HOLE_SAMPLES = 3
+# Gross-to-par used for blobs / missing holes (always 0 Stableford points)
+BLOB_TO_PAR = 9
+
+
+def hole_history(rounds, nine_label, history_rounds=HISTORY_ROUNDS):
+    """
+    {name: [[gross-to-par per hole] * rounds]} from stored hole_scores on one nine,
+    most recent history_rounds rounds per player (handicap-eligible rounds only)
+    """
+    history = {}
+    for round_data in sorted(rounds, key=round_sort_key):
+        if not round_data.get('handicap_eligible', True):
+            continue
+        nine = nine_for_round(round_data)
+        if nine['label'] != nine_label:
+            continue
+        for player in round_data.get('players', []):
+            hole_scores = player.get('hole_scores') or []
+            if len(hole_scores) != len(nine['pars']):
+                continue
+            to_par = [int(s) - par if int(s) > 0 else BLOB_TO_PAR for s, par in zip(hole_scores, nine['pars'])]
+            history.setdefault(player['name'], []).append(to_par)
+    return {name: rows[-history_rounds:] for name, rows in history.items()}
+
+
+def _sample_matrix(rows, pars):
+    """(holes, max samples) padded matrix of gross-to-par values plus per-hole counts"""
+    per_hole = [[row[h] for row in rows] for h in range(len(pars))]
+    by_par = {}
+    for h, par in enumerate(pars):
+        by_par.setdefault(par, []).extend(per_hole[h])
+    samples = [
+        per_hole[h] if len(per_hole[h]) >= MIN_HOLE_SAMPLES else by_par[par]
+        for h, par in enumerate(pars)
+    ]
+    width = max(len(s) for s in samples)
+    matrix = np.full((len(pars), width), BLOB_TO_PAR, dtype=np.int16)
+    for h, values in enumerate(samples):
+        matrix[h, :len(values)] = values
+    return matrix, np.array([len(s) for s in samples], dtype=np.float32)
+
+
+def predict_next_round(rounds, current_indices, nine=None, simulations=SIMULATIONS, seed=None):
+    """
+    Simulate the next round for every player with enough hole-by-hole history
+
+    rounds:          round items (any order)
+    current_indices: {name: handicap index} - the players in the field
+    nine:            course_registry nine to simulate (default: the latest round's)
+    Returns {name: {'win', 'podium', 'expected_points', 'rounds_sampled', 'course_handicap'}}
+    sorted by win probability, or None if numpy is unavailable / nobody qualifies
+    """
+    if not NUMPY_ENABLED or not rounds:
+        return None
+    if nine is None:
+        nine = nine_for_round(max(rounds, key=round_sort_key))
+
+    history = hole_history(rounds, nine['label'])
+    players = [name for name in current_indices if len(history.get(name, [])) >= MIN_ROUNDS]
+    if len(players) < 2:
+        return None
+
+    rng = np.random.default_rng(seed)
+    pars = nine['pars']
+    num_holes = len(pars)
+
+    offsets = np.arange(num_holes, dtype=np.int32)
+    totals = np.empty((len(players), simulations), dtype=np.int16)
+    course_handicaps = {}
+    for p, name in enumerate(players):
+        matrix, counts = _sample_matrix(history[name], pars)
+        ch = display_course_handicap(nine, current_indices[name])
+        course_handicaps[name] = ch
+        strokes = np.array(allocate_strokes(ch, nine['si']), dtype=np.int16)[:, None]
+
+        # Score every sample once at today's strokes (gross-to-par less strokes is
+        # net-to-par; blobs score 0), then draw points directly
+        points = net_stableford(matrix - strokes).astype(np.int8).ravel()
+        # One draw per (simulation, hole): column index into that hole's samples, flattened
+        # (float32 draws; the minimum guards against u * count rounding up to count)
+        draws = rng.random((simulations, num_holes), dtype=np.float32) * counts
+        picks = np.minimum(draws, counts - 1).astype(np.int32)
+        picks += offsets * matrix.shape[1]
+        totals[p] = points[picks].sum(axis=1, dtype=np.int16)
+
+    # Win share splits ties; podium = at least the third-best total (fewer than 3 strictly ahead)
+    best = totals.max(axis=0)
+    leaders = totals == best
+    win = (leaders / leaders.sum(axis=0)).mean(axis=1)
+    podium_places = min(3, len(players))
+    third = np.partition(totals, -podium_places, axis=0)[-podium_places]
+    podium = (totals >= third).mean(axis=1)
+    expected = totals.mean(axis=1)
+
+    results = {
+        name: {
+            'win': float(win[p]),
+            'podium': float(podium[p]),
+            'expected_points': float(expected[p]),
+            'rounds_sampled': len(history[name]),
+            'course_handicap': course_handicaps[name],
+        }
+        for p, name in enumerate(players)
+    }
+    return dict(sorted(results.items(), key=lambda x: x[1]['win'], reverse=True))
+
+
+def prediction_text(predictions, simulations=SIMULATIONS, top=3):
+    """One-line summary of the favourites for the AI prompt"""
+    favourites = [
+        f"{name} {odds['win'] * 100:.0f}% to win ({odds['expected_points']:.1f} expected pts)"
+        for name, odds in list(predictions.items())[:top]
+    ]
+    return f"Simulated {simulations:,} next rounds from hole-by-hole form: " + ", ".join(favourites)
@@ -0,0 +1,56 @@
+"""
+Rate Limiting
+Thread-safe token bucket for pacing requests to external sites.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second. Each request takes one token; when the bucket is empty, acquire()
+sleeps just long enough for the next token, so a pool of workers sharing a
+bucket never exceeds the rate (after an initial burst of `capacity`).
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket shared by any number of threads"""
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available right now; returns False instead of waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take tokens, sleeping until they are available
+        Returns False if that would take longer than timeout seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
@@ -0,0 +1,195 @@
+"""
+Player Ratings
+Elo-style rating from each round's finishing order, so beating a strong
+field counts for more than topping a weak one.
+
+Each round is scored as a multi-player game: a player's actual score is
+the share of the field they beat on Stableford (ties count half), and their
+expected score comes from their rating against the mean rating of the rest
+of the field. One round is one O(players in round) update. New players
+move faster (provisional K) until they have PROVISIONAL_ROUNDS rounds,
+a light Glicko-style confidence ramp.
+
+Ratings live in one aggregate item per group (round_key "META#ratings")
+next to the rounds. add_round applies new rounds incrementally; a round
+arriving out of play order, or a lost concurrent update, triggers a replay.
+
+Usage:
+    python ratings.py [group_id]     # rebuild ratings from history (one streaming pass)
+"""
+
+import sys
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr
+
+from rounds_table import (DEFAULT_GROUP_ID, META_PREFIX, NINE_ORDER, TABLE_NAME, iter_rounds, make_round_key,
+                          round_sort_key, split_round_key)
+
+RATINGS_KEY = f"{META_PREFIX}ratings"
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+# Higher K while a player's rating is still settling
+K_PROVISIONAL = 40.0
+PROVISIONAL_ROUNDS = 10
+
+
+def new_state():
+    return {'players': {}, 'last_round_key': None, 'rounds_applied': 0}
+
+
+def _play_order(round_key):
+    date_str, course = split_round_key(round_key)
+    return date_str, NINE_ORDER.get(course, 0)
+
+
+def _round_key(round_data):
+    return round_data.get('round_key') or make_round_key(round_data['date'], round_data['course'])
+
+
+def apply_round(state, round_data):
+    """
+    Update ratings in place from one round's finishing order
+    Returns {name: rating change} (empty for rounds with fewer than 2 players)
+    """
+    field = [(p['name'], int(p['stableford'])) for p in round_data.get('players', [])]
+    state['last_round_key'] = _round_key(round_data)
+    state['rounds_applied'] += 1
+    n = len(field)
+    if n < 2:
+        return {}
+
+    players = state['players']
+    for name, _ in field:
+        if name not in players:
+            players[name] = {'rating': INITIAL_RATING, 'rounds': 0, 'change': 0.0}
+
+    total_rating = sum(players[name]['rating'] for name, _ in field)
+
+    # Share of the field beaten: sort once, ties take the average position
+    ordered = sorted(points for _, points in field)
+    beaten = {}
+    i = 0
+    while i < n:
+        j = i
+        while j < n and ordered[j] == ordered[i]:
+            j += 1
+        beaten[ordered[i]] = (i + (j - i - 1) / 2) / (n - 1)
+        i = j
+
+    changes = {}
+    for name, points in field:
+        player = players[name]
+        field_mean = (total_rating - player['rating']) / (n - 1)
+        expected = 1 / (1 + 10 ** ((field_mean - player['rating']) / 400))
+        k = K_PROVISIONAL if player['rounds'] < PROVISIONAL_ROUNDS else K_FACTOR
+        changes[name] = k * (beaten[points] - expected)
+
+    # Apply after computing every expectation so the field mean is pre-round for all
+    for name, change in changes.items():
+        player = players[name]
+        player['rating'] += change
+        player['rounds'] += 1
+        player['change'] = change
+    return changes
+
+
+def load_ratings(table, group_id=DEFAULT_GROUP_ID):
+    """Ratings state for a group (new state if none stored yet)"""
+    item = table.get_item(Key={'group_id': group_id, 'round_key': RATINGS_KEY}).get('Item')
+    if not item:
+        return new_state()
+    return {
+        'players': {
+            name: {'rating': float(p['rating']), 'rounds': int(p['rounds']), 'change': float(p['change'])}
+            for name, p in item.get('players', {}).items()
+        },
+        'last_round_key': item.get('last_round_key'),
+        'rounds_applied': int(item.get('rounds_applied', 0)),
+    }
+
+
+def save_ratings(table, state, group_id=DEFAULT_GROUP_ID, expected_rounds_applied=None):
+    """
+    Store the ratings item. With expected_rounds_applied the write only succeeds if
+    nobody else has applied rounds since the state was loaded (raises ConditionalCheckFailed)
+    """
+    item = {
+        'group_id': group_id,
+        'round_key': RATINGS_KEY,
+        'players': {
+            name: {
+                'rating': Decimal(str(round(p['rating'], 2))),
+                'rounds': p['rounds'],
+                'change': Decimal(str(round(p['change'], 2))),
+            }
+            for name, p in state['players'].items()
+        },
+        'last_round_key': state['last_round_key'],
+        'rounds_applied': state['rounds_applied'],
+    }
+    kwargs = {'Item': item}
+    if expected_rounds_applied is not None:
+        condition = Attr('round_key').not_exists()
+        if expected_rounds_applied:
+            condition = Attr('rounds_applied').eq(expected_rounds_applied)
+        kwargs['ConditionExpression'] = condition
+    table.put_item(**kwargs)
+
+
+def iter_rounds_in_play_order(table, group_id=DEFAULT_GROUP_ID):
+    """
+    Stream a group's rounds in play order. Sort keys order "back9" before
+    "front9" within a day, so only one day's rounds are buffered and re-sorted.
+    """
+    day, buffered = None, []
+    for item in iter_rounds(table, group_id):
+        item_day = split_round_key(_round_key(item))[0]
+        if item_day != day and buffered:
+            yield from sorted(buffered, key=round_sort_key)
+            buffered = []
+        day = item_day
+        buffered.append(item)
+    yield from sorted(buffered, key=round_sort_key)
+
+
+def replay_ratings(table, group_id=DEFAULT_GROUP_ID):
+    """Rebuild ratings from the group's full history in one streaming pass and store them"""
+    state = new_state()
+    for round_data in iter_rounds_in_play_order(table, group_id):
+        apply_round(state, round_data)
+    save_ratings(table, state, group_id)
+    print(f"Replayed {state['rounds_applied']} rounds -> ratings for {len(state['players'])} players")
+    return state
+
+
+def update_ratings(table, new_rounds, group_id=DEFAULT_GROUP_ID):
+    """
+    Apply newly saved rounds to the stored ratings (add_round path)
+    Falls back to a full replay if a round is older than the last one applied
+    or another request updated the ratings in the meantime
+    """
+    state = load_ratings(table, group_id)
+    loaded_count = state['rounds_applied']
+    for round_data in sorted(new_rounds, key=round_sort_key):
+        last_key = state['last_round_key']
+        if last_key and _play_order(_round_key(round_data)) <= _play_order(last_key):
+            print(f"Round {_round_key(round_data)} is not after {last_key} - replaying ratings")
+            return replay_ratings(table, group_id)
+        apply_round(state, round_data)
+
+    try:
+        save_ratings(table, state, group_id, expected_rounds_applied=loaded_count)
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        print("Ratings changed during update - replaying ratings")
+        return replay_ratings(table, group_id)
+    return state
+
+
+if __name__ == '__main__':
+    import boto3
+
+    group_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_GROUP_ID
+    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+    replay_ratings(dynamodb.Table(TABLE_NAME), group_id)
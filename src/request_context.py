@@ -0,0 +1,44 @@
+"""
+Request Context
+Memoizes external lookups (weather, shortened URLs, scorecard scrapes) and
+expensive derived data (index timelines) for the life of one invocation.
+
+One RequestContext is created per Lambda request and passed through the
+summary pipeline, so a lookup needed in several places - e.g. the header
+weather and the AI prompt weather - runs once. Failed or empty results
+(None, {}, []) are not memoized, so a later lookup - e.g. today's card with
+its longer timeout after a historical scrape timed out - tries again.
+Counters record how many times each lookup actually ran and how many times
+the memo answered.
+"""
+
+from collections import Counter
+
+
+class RequestContext:
+    """Per-request memo of external lookups, with call/hit counters"""
+
+    def __init__(self):
+        self._memo = {}
+        self.calls = Counter()      # lookups that ran, per kind
+        self.hits = Counter()       # lookups answered from the memo, per kind
+
+    def lookup(self, kind, key, fetch, *args, **kwargs):
+        """
+        Return fetch(*args, **kwargs), running it at most once per (kind, key)
+        Failures are the fetcher's to handle; an empty / None result is returned but not memoized
+        """
+        memo_key = (kind, key)
+        if memo_key in self._memo:
+            self.hits[kind] += 1
+            return self._memo[memo_key]
+        self.calls[kind] += 1
+        value = fetch(*args, **kwargs)
+        if value is not None and value != {} and value != []:
+            self._memo[memo_key] = value
+        return value
+
+    def stats(self):
+        """{kind: {'calls': n, 'hits': n}} for logging"""
+        return {kind: {'calls': self.calls[kind], 'hits': self.hits[kind]}
+                for kind in sorted(set(self.calls) | set(self.hits))}
@@ -0,0 +1,179 @@
+"""
+Resilience
+Per-host circuit breakers, rate limits and latency histograms for the
+Lambda's external calls (Tag Heuer, Open-Meteo, TinyURL, OpenAI).
+
+State lives at module level, so it survives across warm invocations of the
+same container. After FAILURE_THRESHOLD consecutive failures a host's
+breaker opens and calls to it are rejected immediately, without waiting out
+the timeout, for RESET_TIMEOUT seconds. After that one trial call is let
+through (half-open): success closes the breaker, failure opens it again.
+A call that finds the host's token bucket empty waits for a token, so serial
+loops (the summary's historical scrapes) are paced rather than dropped; it is
+only rejected if the wait would exceed rate_wait seconds.
+
+Rejections raise CallRejected. Callers already catch exceptions from these
+calls and fall back (long URL, no weather, no commentary), so the summary
+renders straight away instead of stalling on a dead dependency.
+
+    response = resilience.get(url, timeout=5)
+    result = resilience.call('api.openai.com', client.chat.completions.create, ...)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlparse
+
+import requests
+
+from rate_limit import TokenBucket
+
+# Consecutive failures before a breaker opens
+FAILURE_THRESHOLD = 3
+# Seconds an open breaker rejects calls before a trial call
+RESET_TIMEOUT = 60
+
+# Latency histogram bucket upper bounds (ms); the last bucket is everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Per-host rate limits: sustained requests per second and burst
+HOST_LIMITS = {
+    'www.tagheuergolf.com': {'rate': 2, 'capacity': 5},
+    'archive-api.open-meteo.com': {'rate': 5, 'capacity': 10},
+    'tinyurl.com': {'rate': 5, 'capacity': 10},
+    'api.openai.com': {'rate': 1, 'capacity': 3},
+}
+DEFAULT_LIMIT = {'rate': 5, 'capacity': 10}
+# Longest a call waits for a rate-limit token before it is rejected (seconds)
+RATE_LIMIT_WAIT = 5
+
+
+class CallRejected(Exception):
+    """A call was skipped because the host's breaker is open or its rate limit is spent"""
+
+
+class HostGuard:
+    """Circuit breaker, token bucket and latency histogram for one host"""
+
+    def __init__(self, host, rate, capacity):
+        self.host = host
+        self.bucket = TokenBucket(rate, capacity)
+        self.state = 'closed'
+        self.failures = 0           # consecutive
+        self.opened_at = 0.0
+        self.counts = {'success': 0, 'failure': 0, 'rejected_open': 0, 'rejected_rate': 0}
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def before_call(self, rate_wait=RATE_LIMIT_WAIT):
+        """
+        Wait for a rate-limit token (up to rate_wait seconds)
+        Raise CallRejected if the breaker is open or the wait would be longer
+        """
+        with self._lock:
+            if self.state == 'open':
+                if time.time() - self.opened_at < RESET_TIMEOUT:
+                    self.counts['rejected_open'] += 1
+                    raise CallRejected(f"{self.host}: circuit open after {self.failures} failures")
+                self.state = 'half_open'
+            elif self.state == 'half_open':
+                # A trial call is already in flight
+                self.counts['rejected_open'] += 1
+                raise CallRejected(f"{self.host}: circuit half-open, trial call in progress")
+        if not self.bucket.acquire(timeout=rate_wait):
+            with self._lock:
+                self.counts['rejected_rate'] += 1
+                if self.state == 'half_open':
+                    self.state = 'open'
+            raise CallRejected(f"{self.host}: rate limit wait over {rate_wait}s")
+
+    def record(self, ok, elapsed_ms):
+        with self._lock:
+            self.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            if ok:
+                self.counts['success'] += 1
+                self.failures = 0
+                self.state = 'closed'
+                return
+            self.counts['failure'] += 1
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= FAILURE_THRESHOLD:
+                if self.state != 'open':
+                    print(f"Circuit opened for {self.host} after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.time()
+
+    def percentile_ms(self, fraction):
+        """Upper bound of the histogram bucket holding the given fraction of calls"""
+        total = sum(self.histogram)
+        if not total:
+            return None
+        running = 0
+        for i, count in enumerate(self.histogram):
+            running += count
+            if running >= fraction * total:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else float('inf')
+
+    def stats(self):
+        return {
+            'state': self.state,
+            **self.counts,
+            'p50_ms': self.percentile_ms(0.5),
+            'p95_ms': self.percentile_ms(0.95),
+        }
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def guard_for(host):
+    """The container-wide HostGuard for a host (created on first use)"""
+    with _guards_lock:
+        if host not in _guards:
+            limit = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            _guards[host] = HostGuard(host, limit['rate'], limit['capacity'])
+        return _guards[host]
+
+
+def call(host, fn, *args, rate_wait=RATE_LIMIT_WAIT, **kwargs):
+    """
+    Run fn(*args, **kwargs) behind the host's breaker and rate limit
+    Exceptions from fn count as failures and are re-raised; rejections raise CallRejected
+    """
+    guard = guard_for(host)
+    guard.before_call(rate_wait)
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception:
+        guard.record(False, (time.perf_counter() - started) * 1000)
+        raise
+    guard.record(True, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def get(url, rate_wait=RATE_LIMIT_WAIT, **kwargs):
+    """
+    requests.get behind the URL's host guard
+    429 and 5xx responses count as failures but are still returned to the caller
+    """
+    guard = guard_for(urlparse(url).hostname or url)
+    guard.before_call(rate_wait)
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, **kwargs)
+    except Exception:
+        guard.record(False, (time.perf_counter() - started) * 1000)
+        raise
+    guard.record(response.status_code < 500 and response.status_code != 429,
+                 (time.perf_counter() - started) * 1000)
+    return response
+
+
+def stats():
+    """{host: breaker state, outcome counts and p50/p95 latency} for logging"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.host: guard.stats() for guard in guards}
@@ -0,0 +1,102 @@
+"""
+Rounds Table
+Key schema and query helpers for the golf-rounds table.
+
+Items are partitioned by group so one deployment can serve many groups:
+- Partition key: group_id   (e.g. "warringah-saturday")
+- Sort key:      round_key  ("YYYY-MM-DD#<course>", e.g. "2025-12-22#back9")
+
+Front 9 and back 9 on the same day get distinct sort keys, so the old
+"-back9" date suffix is no longer needed for new rounds.
+"""
+
+import os
+from boto3.dynamodb.conditions import Key
+
+TABLE_NAME = os.environ.get('ROUNDS_TABLE', 'golf-rounds-v2')
+DEFAULT_GROUP_ID = os.environ.get('GROUP_ID', 'warringah-saturday')
+
+KEY_SEPARATOR = '#'
+# Non-round items (aggregates etc.) sort after every date-prefixed round key
+META_PREFIX = 'META#'
+
+KEY_SCHEMA = [
+    {'AttributeName': 'group_id', 'KeyType': 'HASH'},
+    {'AttributeName': 'round_key', 'KeyType': 'RANGE'},
+]
+ATTRIBUTE_DEFINITIONS = [
+    {'AttributeName': 'group_id', 'AttributeType': 'S'},
+    {'AttributeName': 'round_key', 'AttributeType': 'S'},
+]
+
+# Play order of the nines within a day (front 9 first on 18-hole days)
+NINE_ORDER = {'front9': 0, 'back9': 1}
+
+
+def base_date(date_str):
+    """Strip the legacy -back9 suffix from a stored date"""
+    return date_str.split('-back9')[0]
+
+
+def make_round_key(date_str, course):
+    """Sort key for a round: date#course"""
+    return f"{base_date(date_str)}{KEY_SEPARATOR}{course}"
+
+
+def split_round_key(round_key):
+    """Inverse of make_round_key: returns (date, course)"""
+    date_str, _, course = round_key.partition(KEY_SEPARATOR)
+    return date_str, course
+
+
+def round_item_key(group_id, date_str, course):
+    """Full primary key for a round item"""
+    return {'group_id': group_id, 'round_key': make_round_key(date_str, course)}
+
+
+def round_sort_key(round_data):
+    """Chronological ordering for rounds (date, then front 9 before back 9)"""
+    course = round_data.get('course', '')
+    if '-back9' in round_data['date']:
+        course = 'back9'
+    return (base_date(round_data['date']), NINE_ORDER.get(course, 0))
+
+
+def iter_rounds(table, group_id, prefix=None):
+    """
+    Yield a group's round items page by page using Query (never Scan).
+    prefix narrows the sort key range, e.g. "2025" for one season.
+    """
+    if prefix:
+        condition = Key('group_id').eq(group_id) & Key('round_key').begins_with(prefix)
+    else:
+        condition = Key('group_id').eq(group_id) & Key('round_key').lt(META_PREFIX)
+
+    kwargs = {'KeyConditionExpression': condition}
+    while True:
+        response = table.query(**kwargs)
+        for item in response.get('Items', []):
+            yield item
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            break
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def query_rounds(table, group_id, prefix=None):
+    """All round items for a group (optionally one season), in play order"""
+    rounds = list(iter_rounds(table, group_id, prefix))
+    rounds.sort(key=round_sort_key)
+    return rounds
+
+
+def create_rounds_table(dynamodb, table_name=TABLE_NAME):
+    """Create the group-partitioned rounds table (on-demand billing)"""
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=KEY_SCHEMA,
+        AttributeDefinitions=ATTRIBUTE_DEFINITIONS,
+        BillingMode='PAY_PER_REQUEST',
+    )
+    table.wait_until_exists()
+    return table
@@ -0,0 +1,181 @@
+"""
+Season Index
+Per-player, per-season cumulative stats keyed by day of year.
+
+For every (player, season) the index holds prefix sums over day of year
+(1-366) of Stableford points, rounds played, gross totals and gross-scored
+rounds, plus a snapshot of the player's WHS index at the end of each day.
+"Season to date as of day N" - e.g. the same period last year - is then an
+O(1) lookup instead of a re-filter of every round.
+
+Built in one pass from the rounds already loaded. get_season_index keeps the
+last build per group in the warm Lambda container, checked against a
+fingerprint of every value the index reads, so summaries only rebuild it
+after the group's rounds change.
+
+The index timeline applies the WHS soft/hard caps against the Low Handicap
+Index (lowest index in the 365 days up to each round), as
+calculate_player_handicap_index and handicap_window do.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+
+from handicap import HandicapCalculator, WHS_WINDOW
+from rounds_table import DEFAULT_GROUP_ID, base_date, round_sort_key
+
+DAYS_IN_YEAR = 366
+LHI_DAYS = 365
+
+# Warm-container cache: (group_id, slope, rating) -> (fingerprint, SeasonIndex)
+_warm_index = {}
+
+
+def day_of_year(date_str):
+    """(year, day of year) for a stored round date"""
+    d = datetime.fromisoformat(base_date(date_str)[:10])
+    return d.year, d.timetuple().tm_yday
+
+
+def _prefix(daily):
+    total = 0
+    out = []
+    for value in daily:
+        total += value
+        out.append(total)
+    return out
+
+
+class SeasonIndex:
+    """
+    Day-of-year prefix sums per player and season
+
+    slope/rating are the 9-hole values used for the index timeline, the same
+    ones generate_whatsapp_summary passes to calculate_player_handicap_index
+    """
+
+    def __init__(self, rounds, slope, rating):
+        self._seasons = {}
+        self._build(rounds, slope, rating)
+
+    def _build(self, rounds, slope, rating):
+        hc_calc = HandicapCalculator()
+        daily = {}          # (name, year) -> per-day deltas
+        index_events = {}   # name -> [(year, day, index after that round)]
+        windows = {}        # name -> last WHS_WINDOW differentials
+        lhi_history = {}    # name -> deque of (date, uncapped index) from the last LHI_DAYS
+
+        for round_data in sorted(rounds, key=round_sort_key):
+            year, day = day_of_year(round_data['date'])
+            date_str = base_date(round_data['date'])[:10]
+            lhi_cutoff = (datetime.fromisoformat(date_str) - timedelta(days=LHI_DAYS)).strftime('%Y-%m-%d')
+            handicap_eligible = round_data.get('handicap_eligible', True)
+            pcc = int(round_data.get('pcc', 0) or 0)
+
+            for player in round_data['players']:
+                name = player['name']
+                season = daily.get((name, year))
+                if season is None:
+                    season = daily[(name, year)] = {
+                        'points': [0] * (DAYS_IN_YEAR + 1),
+                        'rounds': [0] * (DAYS_IN_YEAR + 1),
+                        'gross': [0] * (DAYS_IN_YEAR + 1),
+                        'gross_rounds': [0] * (DAYS_IN_YEAR + 1),
+                    }
+                season['points'][day] += int(player['stableford'])
+                season['rounds'][day] += 1
+
+                gross = int(player.get('gross', 0) or 0)
+                if handicap_eligible and gross > 0:
+                    season['gross'][day] += gross
+                    season['gross_rounds'][day] += 1
+
+                    # Same 18-hole-equivalent differential as calculate_player_handicap_index
+                    differential = round((gross * 2 - rating * 2 - pcc) * (113 / slope), 1)
+                    window = windows.get(name)
+                    if window is None:
+                        window = windows[name] = deque(maxlen=WHS_WINDOW)
+                    window.append(differential)
+                    if len(window) < 3:
+                        index_events.setdefault(name, []).append((year, day, 0.0))
+                        continue
+                    index = hc_calc.update_handicap_index(0, list(window))
+
+                    # Low Handicap Index: lowest uncapped index in the year up to this round
+                    history = lhi_history.get(name)
+                    if history is None:
+                        history = lhi_history[name] = deque()
+                    history.append((date_str, index))
+                    while history[0][0] < lhi_cutoff:
+                        history.popleft()
+                    low_index = min(value for _, value in history)
+                    if index - low_index > 3.0:
+                        # Caps only bite on rises of more than 3
+                        index = hc_calc.update_handicap_index(0, list(window), low_handicap_index=low_index)
+                    index_events.setdefault(name, []).append((year, day, index))
+
+        for (name, year), season in daily.items():
+            self._seasons[(name, year)] = {key: _prefix(values) for key, values in season.items()}
+
+        # Index timeline: forward-filled per day, carried over from the previous season
+        for (name, year), season in self._seasons.items():
+            timeline = [0.0] * (DAYS_IN_YEAR + 1)
+            current = 0.0
+            events = index_events.get(name, [])
+            i = 0
+            while i < len(events) and events[i][0] < year:
+                current = events[i][2]
+                i += 1
+            for day in range(DAYS_IN_YEAR + 1):
+                while i < len(events) and events[i][0] == year and events[i][1] == day:
+                    current = events[i][2]
+                    i += 1
+                timeline[day] = current
+            season['index'] = timeline
+
+    def players(self, year):
+        """Players with at least one round in the season"""
+        return {name for (name, y) in self._seasons if y == year}
+
+    def season_to_date(self, name, year, day):
+        """
+        Season stats for a player from 1 January up to and including day of year
+        Returns None if the player has no rounds in that period
+        """
+        season = self._seasons.get((name, year))
+        if season is None:
+            return None
+        day = max(0, min(day, DAYS_IN_YEAR))
+        rounds_count = season['rounds'][day]
+        if rounds_count == 0:
+            return None
+        gross_rounds = season['gross_rounds'][day]
+        return {
+            'rounds_count': rounds_count,
+            'total_stableford': season['points'][day],
+            'avg_stableford': season['points'][day] / rounds_count,
+            'avg_gross': season['gross'][day] / gross_rounds if gross_rounds else 0,
+            'handicap_index': season['index'][day],
+        }
+
+
+def _fingerprint(rounds):
+    """Every value SeasonIndex reads from the rounds, hashed"""
+    return hash(tuple(
+        (round_data.get('round_key') or round_data['date'], round_data['date'],
+         round_data.get('handicap_eligible', True), int(round_data.get('pcc', 0) or 0),
+         tuple((p['name'], int(p['stableford']), int(p.get('gross', 0) or 0)) for p in round_data['players']))
+        for round_data in rounds
+    ))
+
+
+def get_season_index(rounds, slope, rating, group_id=DEFAULT_GROUP_ID):
+    """SeasonIndex for a group's rounds, reused across warm invocations until any round changes"""
+    fingerprint = _fingerprint(rounds)
+    key = (group_id, slope, rating)
+    cached = _warm_index.get(key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    season_index = SeasonIndex(rounds, slope, rating)
+    _warm_index[key] = (fingerprint, season_index)
+    return season_index
@@ -5,11 +5,35 @@ Generate detailed statistics reports for players
 
 from excel_handler import ExcelHandler
 from datetime import datetime
+from head_to_head import build_matrix, lookup
 
 
 class StatsReporter:
     def __init__(self, excel_handler):
         self.excel = excel_handler
+        self._h2h = None        # {season: pairwise matrix} for the rows below
+        self._h2h_rows = None
+    
+    def _head_to_head_matrix(self, year):
+        """
+        Pairwise season matrix built from the sheet in one pass,
+        rebuilt only when the sheet's rows are reloaded
+        """
+        rows = self.excel.get_rows()
+        if self._h2h_rows is not rows:
+            rounds = {}
+            for row in rows:
+                round_date = ExcelHandler._parse_row_date(row[0])
+                if round_date is None or not row[1] or row[4] is None:
+                    continue
+                date_str = round_date.strftime('%Y-%m-%d')
+                round_data = rounds.setdefault((date_str, row[2]), {
+                    'date': date_str, 'course': row[2], 'round_key': f"{date_str}#{row[2]}", 'players': []
+                })
+                round_data['players'].append({'name': row[1], 'stableford': row[4]})
+            self._h2h = build_matrix(rounds.values())
+            self._h2h_rows = rows
+        return self._h2h.get(str(year))
     
     def generate_leaderboard(self, year=None):
         """
@@ -124,6 +148,15 @@ class StatsReporter:
         report += f"{'Avg Stableford':<25} {p1_stats['avg_stableford']:<15.1f} {p2_stats['avg_stableford']:<15.1f}\n"
         report += f"{'Best Gross':<25} {p1_stats['best_gross']:<15} {p2_stats['best_gross']:<15}\n"
         
+        # Rounds played together (from the precomputed pairwise matrix)
+        matrix = self._head_to_head_matrix(year)
+        record = lookup(matrix, player1, player2) if matrix else None
+        if record:
+            report += "\n"
+            report += f"Played together: {record['rounds']} rounds\n"
+            report += f"Record: {record['wins']}W-{record['losses']}L-{record['ties']}T for {player1}\n"
+            report += f"Avg margin: {record['avg_margin']:+.1f} pts\n"
+        
         return report
     
     def generate_whatsapp_leaderboard(self, year=None):
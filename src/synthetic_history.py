@@ -0,0 +1,388 @@
+"""
+Synthetic History
+Realistic rounds for scale testing: N players x M seasons in exactly the
+DynamoDB item shape the Lambda stores and reads.
+
+- Weekly Saturday rounds, mostly on the back 9. Attendance is random, and
+  everyone who turns up goes in the one round item for that nine.
+- Hole-by-hole scores are drawn from each player's ability, weighted by the
+  hole's 18-hole stroke index, so hard holes cost more shots. Blobs are
+  stored as 0. Gross, Stableford and the stored index follow from the scores
+  the same way the live system derives them.
+- Some 18-hole days are split into front and back 9 items, marked split_18.
+  A share of their back 9 halves use the legacy "YYYY-MM-DD-back9" date
+  (and no marker) instead.
+- Occasional other-course rounds are stored with handicap_eligible False and
+  a course_display_name.
+- hole_scores are missing on 18-hole splits, before HOLE_SCORES_FROM and on
+  a random share of cards, as in the real history.
+
+Items can be written to JSON (one file per season, numbers loaded back as
+Decimal like boto3 returns them) or served from LocalTable. LocalTable is
+an in-memory stand-in that answers the Query calls rounds_table makes, with
+paging. To run the Lambda against it:
+
+    import lambda_function
+    lambda_function.table = LocalTable(generate_history(players=500, seasons=3))
+    rounds = lambda_function.get_all_rounds()
+
+Usage:
+    python synthetic_history.py --players 500 --seasons 3 --out synthetic/
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import And, AttributeExists, AttributeNotExists, BeginsWith, Between, Equals, \
+    GreaterThan, GreaterThanEquals, LessThan, LessThanEquals
+
+from course_registry import display_course_handicap, get_nine, stableford_points, strokes_for
+from handicap import HandicapCalculator, WHS_WINDOW
+from rounds_table import DEFAULT_GROUP_ID, round_item_key
+
+# Share of Saturdays each player turns up
+ATTENDANCE = 0.6
+# Share of rounds played on the front 9 instead of the back 9
+FRONT_9_RATE = 0.2
+# Share of days that are 18 holes, stored as front 9 + back 9 items
+SPLIT_18_RATE = 0.08
+# Share of those back 9 halves stored under the legacy "-back9" date
+LEGACY_BACK9_RATE = 0.5
+# Share of weeks with an extra other-course round (midweek)
+OTHER_COURSE_RATE = 0.05
+OTHER_COURSES = ('Avondale', 'Long Reef', 'Bayview', 'Manly')
+# Share of cards without hole_scores after HOLE_SCORES_FROM; none before it
+MISSING_HOLE_SCORES_RATE = 0.1
+HOLE_SCORES_FROM = '2025-06-01'
+# Chance of a blob (pick-up, stored as 0) on any hole
+BLOB_RATE = 0.02
+# Stroke sd per hole for a scratch player; higher handicaps are more erratic
+HOLE_SD = 0.8
+
+FIRST_NAMES = ('Andy', 'Bruce', 'Fletcher', 'Hamish', 'Steve', 'Mark', 'Julian', 'Eddie', 'Jo', 'Tom',
+               'Pete', 'Sam', 'Chris', 'Nick', 'Rob', 'Dave', 'Matt', 'Ben', 'Luke', 'Greg')
+
+_hc_calc = HandicapCalculator()
+
+
+def _player_name(i):
+    """Unique first word, since the summary tables show first names only"""
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    lap = i // len(FIRST_NAMES)
+    return f"{first}{lap + 1 if lap else ''} Synthetic"
+
+
+def _first_saturday(year):
+    day = date(year, 1, 1)
+    return day + timedelta(days=(5 - day.weekday()) % 7)
+
+
+class _Golfer:
+    """A synthetic player: drifting ability plus the WHS index their scores earn"""
+
+    def __init__(self, name, rng):
+        self.name = name
+        self.ability = rng.uniform(4, 32)      # typical 18-hole strokes over par, less 2
+        self.index = round(self.ability, 1)    # published index until 3 differentials exist
+        self.differentials = []
+
+    def card(self, nine, rng):
+        """Hole-by-hole scores (0 = blob) and adjusted gross for one nine"""
+        ch = display_course_handicap(nine, self.index)
+        strokes = strokes_for(nine, ch)
+        # Expected shots over par on the nine, spread towards the low stroke index holes
+        over_par = (self.ability + 2) / 2
+        weights = [19 - si for si in nine['si']]
+        total_weight = sum(weights)
+        sd = HOLE_SD + self.ability / 30
+        scores, gross = [], 0
+        for par, weight, s in zip(nine['pars'], weights, strokes):
+            if rng.random() < BLOB_RATE:
+                scores.append(0)
+                gross += par + 2 + s                 # net double bogey
+                continue
+            score = max(1, round(par + over_par * weight / total_weight + rng.gauss(0, sd)))
+            scores.append(score)
+            gross += min(score, par + 2 + s)
+        return scores, gross, ch
+
+    def post(self, nine, gross, rng):
+        """Record the differential and update the index, as the summary calculates it"""
+        differential = round((gross * 2 - nine['rating'] * 2) * (113 / nine['slope']), 1)
+        self.differentials = (self.differentials + [differential])[-WHS_WINDOW:]
+        self.index = _hc_calc.update_handicap_index(self.index, self.differentials)
+        self.ability = min(40, max(0, self.ability + rng.gauss(0, 0.3)))
+
+
+def _player_entry(golfer, nine, rng, day, keep_hole_scores=True):
+    scores, gross, ch = golfer.card(nine, rng)
+    strokes = strokes_for(nine, ch)
+    stableford = sum(stableford_points(scores, nine['pars'], strokes))
+    entry = {
+        'name': golfer.name,
+        'index': Decimal(str(golfer.index)),
+        'gross': Decimal(gross),
+        'stableford': Decimal(stableford),
+    }
+    if keep_hole_scores and day >= HOLE_SCORES_FROM and rng.random() >= MISSING_HOLE_SCORES_RATE:
+        entry['hole_scores'] = [Decimal(s) for s in scores]
+    return entry, gross
+
+
+def _round_item(group_id, date_str, course, entries, rng, extra=None):
+    item = {
+        **round_item_key(group_id, date_str, course),
+        'date': date_str,
+        'time_utc': f"{rng.randint(19, 23):02d}:{rng.choice(('00', '10', '20', '30', '40', '50'))}",
+        'course': course,
+        'players': entries,
+        'scorecard_url': f"https://www.tagheuergolf.com/rounds/synthetic-{date_str}-{course}",
+    }
+    item.update(extra or {})
+    return item
+
+
+def generate_history(players=5, seasons=2, start_year=2025, group_id=DEFAULT_GROUP_ID, seed=42):
+    """Round items for `players` golfers over `seasons` years of weekly rounds, in play order"""
+    rng = random.Random(seed)
+    golfers = [_Golfer(_player_name(i), rng) for i in range(players)]
+    back9, front9 = get_nine('back9'), get_nine('front9')
+    items = []
+
+    for year in range(start_year, start_year + seasons):
+        day = _first_saturday(year)
+        while day.year == year:
+            date_str = day.isoformat()
+            field = [g for g in golfers if rng.random() < ATTENDANCE] or [rng.choice(golfers)]
+
+            if rng.random() < SPLIT_18_RATE:
+                # 18 holes: Tag Heuer card split into two items, no hole_scores on split players
+                for nine, course in ((front9, 'front9'), (back9, 'back9')):
+                    entries = []
+                    for golfer in field:
+                        entry, gross = _player_entry(golfer, nine, rng, date_str, keep_hole_scores=False)
+                        entries.append(entry)
+                        golfer.post(nine, gross, rng)
+                    stored_date, extra = date_str, {'split_18': True}
+                    if course == 'back9' and rng.random() < LEGACY_BACK9_RATE:
+                        stored_date, extra = f"{date_str}-back9", {}
+                    items.append(_round_item(group_id, stored_date, course, entries, rng, extra))
+            else:
+                nine, course = (front9, 'front9') if rng.random() < FRONT_9_RATE else (back9, 'back9')
+                entries = []
+                for golfer in field:
+                    entry, gross = _player_entry(golfer, nine, rng, date_str)
+                    entries.append(entry)
+                    golfer.post(nine, gross, rng)
+                items.append(_round_item(group_id, date_str, course, entries, rng))
+
+            if rng.random() < OTHER_COURSE_RATE:
+                # Midweek away round: Stableford only, never counts for handicap
+                course_name = rng.choice(OTHER_COURSES)
+                away = rng.sample(field, max(1, len(field) // 3))
+                entries = [{
+                    'name': g.name,
+                    'index': Decimal(str(g.index)),
+                    'gross': Decimal(0),
+                    'stableford': Decimal(max(4, round(rng.gauss(15, 4)))),
+                } for g in away]
+                items.append(_round_item(
+                    group_id, (day + timedelta(days=3)).isoformat(),
+                    f"other_{course_name.lower().replace(' ', '_')}", entries, rng,
+                    {'handicap_eligible': False, 'course_display_name': course_name},
+                ))
+            day += timedelta(weeks=1)
+    return items
+
+
+# ─── Output ─────────────────────────────────────────────────────────────────
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def write_json(items, out_dir):
+    """One JSON file of items per season (rounds_YYYY.json); returns the paths written"""
+    os.makedirs(out_dir, exist_ok=True)
+    by_season = {}
+    for item in items:
+        by_season.setdefault(item['date'][:4], []).append(item)
+    paths = []
+    for season, season_items in sorted(by_season.items()):
+        path = os.path.join(out_dir, f"rounds_{season}.json")
+        with open(path, 'w') as f:
+            json.dump(season_items, f, default=_json_default)
+        paths.append(path)
+    return paths
+
+
+def load_json(paths):
+    """Items from write_json files, numbers as Decimal (as boto3 returns them)"""
+    items = []
+    for path in paths:
+        with open(path) as f:
+            items.extend(json.load(f, parse_float=Decimal, parse_int=Decimal))
+    return items
+
+
+# ─── Local table stand-in ───────────────────────────────────────────────────
+
+_COMPARISONS = {
+    Equals: lambda a, b: a == b,
+    LessThan: lambda a, b: a < b,
+    LessThanEquals: lambda a, b: a <= b,
+    GreaterThan: lambda a, b: a > b,
+    GreaterThanEquals: lambda a, b: a >= b,
+    BeginsWith: lambda a, b: isinstance(a, str) and a.startswith(b),
+}
+
+
+def _matches(condition, item):
+    """
+    Evaluate a boto3 Key or Attr condition (comparisons, begins_with, between,
+    exists / not_exists, AND) against an item
+    """
+    values = condition.get_expression()['values']
+    if isinstance(condition, And):
+        return _matches(values[0], item) and _matches(values[1], item)
+    if isinstance(condition, (AttributeExists, AttributeNotExists)):
+        return (values[0].name in item) == isinstance(condition, AttributeExists)
+    value = item.get(values[0].name)
+    if value is None:
+        return False
+    if isinstance(condition, Between):
+        return values[1] <= value <= values[2]
+    return _COMPARISONS[type(condition)](value, values[1])
+
+
+class ConditionalCheckFailedException(Exception):
+    """Raised like the boto3 client error when a ConditionExpression fails"""
+
+
+class _Exceptions:
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+
+
+class _Meta:
+    class client:
+        exceptions = _Exceptions
+
+
+def _set_path(item, path, value, names):
+    """Assign value at an update path such as 'pcc' or 'players[2].#n' (names maps #placeholders)"""
+    parts = []
+    for part in path.split('.'):
+        name, *indices = part.replace(']', '').split('[')
+        parts.append(names.get(name, name))
+        parts.extend(int(i) for i in indices)
+    target = item
+    for part in parts[:-1]:
+        target = target[part]
+    target[parts[-1]] = value
+
+
+class _BatchWriter:
+    def __init__(self, table):
+        self._table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item):
+        self._table.put_item(Item=Item)
+
+
+class LocalTable:
+    """
+    In-memory stand-in for the rounds Table resource: put_item, get_item,
+    batch_writer and key-condition query with paging (page_size items per
+    page, like DynamoDB's 1 MB pages). Items are copied in and out, as if serialised.
+    put_item and update_item honour a boto3 ConditionExpression built with Attr
+    and raise meta.client.exceptions.ConditionalCheckFailedException like
+    boto3; update_item supports "SET path = :value, ..." expressions.
+    """
+
+    meta = _Meta
+
+    def __init__(self, items=(), page_size=1000):
+        self.page_size = page_size
+        self._items = {}
+        for item in items:
+            self.put_item(Item=item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _check(self, key, condition):
+        if condition is not None and not _matches(condition, self._items.get(key, {})):
+            raise ConditionalCheckFailedException(f"Condition failed on {key}")
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        key = (Item['group_id'], Item['round_key'])
+        self._check(key, ConditionExpression)
+        self._items[key] = copy.deepcopy(Item)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues=None,
+                    ExpressionAttributeNames=None, ConditionExpression=None, **kwargs):
+        key = (Key['group_id'], Key['round_key'])
+        self._check(key, ConditionExpression)
+        item = self._items.setdefault(key, dict(Key))
+        action, _, assignments = UpdateExpression.strip().partition(' ')
+        if action.upper() != 'SET':
+            raise NotImplementedError(f"LocalTable only supports SET updates: {UpdateExpression}")
+        for assignment in assignments.split(','):
+            path, _, placeholder = (part.strip() for part in assignment.partition('='))
+            _set_path(item, path, copy.deepcopy(ExpressionAttributeValues[placeholder]),
+                      ExpressionAttributeNames or {})
+        return {}
+
+    def get_item(self, Key, **kwargs):
+        item = self._items.get((Key['group_id'], Key['round_key']))
+        return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def batch_writer(self):
+        return _BatchWriter(self)
+
+    def query(self, KeyConditionExpression, ExclusiveStartKey=None, Limit=None, **kwargs):
+        keys = sorted(key for key, item in self._items.items() if _matches(KeyConditionExpression, item))
+        if ExclusiveStartKey:
+            start = (ExclusiveStartKey['group_id'], ExclusiveStartKey['round_key'])
+            keys = [key for key in keys if key > start]
+        page = keys[:min(Limit or self.page_size, self.page_size)]
+        response = {'Items': [copy.deepcopy(self._items[key]) for key in page], 'Count': len(page)}
+        if len(keys) > len(page):
+            response['LastEvaluatedKey'] = {'group_id': page[-1][0], 'round_key': page[-1][1]}
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic round history')
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--seasons', type=int, default=2)
+    parser.add_argument('--start-year', type=int, default=2025)
+    parser.add_argument('--group-id', default=DEFAULT_GROUP_ID)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='synthetic')
+    args = parser.parse_args()
+
+    items = generate_history(args.players, args.seasons, args.start_year, args.group_id, args.seed)
+    paths = write_json(items, args.out)
+    player_rounds = sum(len(item['players']) for item in items)
+    print(f"Generated {len(items)} rounds ({player_rounds} player rounds) for {args.players} players")
+    for path in paths:
+        print(f"  {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Year-End Report Engine
+Season aggregation shared by the year-end CLI (generate_year_end_report.py)
+and the year-end Lambda (lambda_year_end_report.py).
+
+All stats for a season - averages, std dev, front/back splits, streaks,
+wins, podiums, monthly and quarterly leaders, best round, improvement -
+come from a single pass over the season's rounds. compute_seasons handles
+several years in that same pass.
+"""
+
+from datetime import datetime
+
+from course_registry import real_nine_for_round
+from rounds_table import query_rounds, round_sort_key
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+          'September', 'October', 'November', 'December']
+QUARTERS = [('Q1', MONTHS[0:3]), ('Q2', MONTHS[3:6]), ('Q3', MONTHS[6:9]), ('Q4', MONTHS[9:12])]
+QUARTER_OF_MONTH = {month: q for q, months in QUARTERS for month in months}
+
+# Minimum rounds to appear in the standings
+MIN_QUALIFYING_ROUNDS = 10
+# Rounds compared at each end of the season for "Most Improved"
+IMPROVEMENT_WINDOW = 5
+
+
+def parse_date(date_str):
+    """Parse date from string, handling -back9 suffix"""
+    clean_date = date_str.split('-back9')[0]
+    return datetime.strptime(clean_date, '%Y-%m-%d')
+
+
+def get_display_name(name):
+    """Convert database names to display names"""
+    if name == "Steve":
+        return "Steve Lewthwaite"
+    return name
+
+
+def _new_player():
+    return {
+        'rounds_count': 0,
+        'total_points': 0,
+        'sum_squares': 0,
+        'best_score': 0,
+        'worst_score': 100,
+        'best_round': None,
+        'front9_total': 0,
+        'front9_count': 0,
+        'back9_total': 0,
+        'back9_count': 0,
+        'winning_rounds': 0,
+        'podium_finishes': 0,
+        'monthly_wins': {},
+        'quarter_totals': {},
+        'quarter_counts': {},
+        'current_streak': 0,
+        'best_improving_streak': 0,
+        'prev_points': None,
+        'early_points': [],
+        'recent_points': [],
+    }
+
+
+class SeasonAccumulator:
+    """Running stats for one season, fed one round at a time in date order"""
+
+    def __init__(self, year):
+        self.year = str(year)
+        self.total_rounds = 0
+        self.monthly_rounds = {}
+        self.players = {}
+
+    def add_round(self, round_data):
+        # fromisoformat on the YYYY-MM-DD prefix is much cheaper than strptime
+        round_date = datetime.fromisoformat(round_data['date'][:10])
+        month = MONTHS[round_date.month - 1]
+        quarter = QUARTER_OF_MONTH[month]
+
+        self.total_rounds += 1
+        self.monthly_rounds[month] = self.monthly_rounds.get(month, 0) + 1
+
+        # NOTE: Database labels are BACKWARDS - "front9" in DB = Back 9 in reality
+        # (except 18-hole halves, see real_nine_for_round)
+        is_back9_in_reality = real_nine_for_round(round_data) == 'back9'
+
+        # Rank by Stableford (stable sort: ties keep card order)
+        round_players = sorted(round_data['players'], key=lambda x: int(x['stableford']), reverse=True)
+
+        for rank, player in enumerate(round_players, 1):
+            name = player['name']
+            points = int(player['stableford'])
+            stats = self.players.get(name)
+            if stats is None:
+                stats = self.players[name] = _new_player()
+
+            stats['rounds_count'] += 1
+            stats['total_points'] += points
+            stats['sum_squares'] += points * points
+            stats['worst_score'] = min(stats['worst_score'], points)
+            if points > stats['best_score']:
+                stats['best_score'] = points
+            if stats['best_round'] is None or points > stats['best_round']['points']:
+                stats['best_round'] = {'date': round_date, 'points': points}
+
+            if is_back9_in_reality:
+                stats['back9_total'] += points
+                stats['back9_count'] += 1
+            else:
+                stats['front9_total'] += points
+                stats['front9_count'] += 1
+
+            stats['quarter_totals'][quarter] = stats['quarter_totals'].get(quarter, 0) + points
+            stats['quarter_counts'][quarter] = stats['quarter_counts'].get(quarter, 0) + 1
+
+            # Track wins and podiums
+            if rank == 1:
+                stats['winning_rounds'] += 1
+                stats['monthly_wins'][month] = stats['monthly_wins'].get(month, 0) + 1
+            if rank <= 3:
+                stats['podium_finishes'] += 1
+
+            # Improving streak: consecutive rounds scoring at least the previous one
+            if stats['prev_points'] is None or points >= stats['prev_points']:
+                stats['current_streak'] += 1
+                stats['best_improving_streak'] = max(stats['best_improving_streak'], stats['current_streak'])
+            else:
+                stats['current_streak'] = 0
+            stats['prev_points'] = points
+
+            if len(stats['early_points']) < IMPROVEMENT_WINDOW:
+                stats['early_points'].append(points)
+            stats['recent_points'].append(points)
+            if len(stats['recent_points']) > IMPROVEMENT_WINDOW:
+                stats['recent_points'].pop(0)
+
+    def finalize(self):
+        """Derived metrics, standings and awards for the season"""
+        for stats in self.players.values():
+            n = stats['rounds_count']
+            stats['avg'] = stats['total_points'] / n
+            # Population std dev from running sums (exact integer numerator)
+            stats['std_dev'] = ((n * stats['sum_squares'] - stats['total_points'] ** 2) / (n * n)) ** 0.5
+            if stats['front9_count']:
+                stats['front9_avg'] = stats['front9_total'] / stats['front9_count']
+            if stats['back9_count']:
+                stats['back9_avg'] = stats['back9_total'] / stats['back9_count']
+            stats['win_rate'] = stats['winning_rounds'] / n * 100
+            stats['quarter_avgs'] = {
+                q: stats['quarter_totals'][q] / stats['quarter_counts'][q] for q in stats['quarter_totals']
+            }
+            if n >= IMPROVEMENT_WINDOW:
+                stats['improvement'] = (sum(stats['recent_points']) - sum(stats['early_points'])) / IMPROVEMENT_WINDOW
+
+        standings = sorted(
+            [(name, stats) for name, stats in self.players.items() if stats['rounds_count'] >= MIN_QUALIFYING_ROUNDS],
+            key=lambda x: x[1]['avg'],
+            reverse=True
+        )
+
+        summary = {
+            'year': self.year,
+            'total_rounds': self.total_rounds,
+            'monthly_rounds': self.monthly_rounds,
+            'players': self.players,
+            'standings': standings,
+            'most_consistent': None,
+            'best_streaker': None,
+            'most_wins': None,
+            'most_active': None,
+            'most_improved': None,
+            'highest_round': None,
+            'monthly_leaders': [],
+            'quarter_leaders': [],
+        }
+
+        if standings:
+            summary['most_consistent'] = min(standings, key=lambda x: x[1]['std_dev'])
+            summary['best_streaker'] = max(standings, key=lambda x: x[1]['best_improving_streak'])
+            summary['most_wins'] = max(standings, key=lambda x: x[1]['winning_rounds'])
+            summary['most_active'] = max(standings, key=lambda x: x[1]['rounds_count'])
+            improvers = [(name, stats) for name, stats in standings if 'improvement' in stats]
+            if improvers:
+                summary['most_improved'] = max(improvers, key=lambda x: x[1]['improvement'])
+
+        if self.players:
+            summary['highest_round'] = max(
+                ((name, stats['best_round']) for name, stats in self.players.items()),
+                key=lambda x: x[1]['points']
+            )
+
+        for month in MONTHS:
+            leaders = [(name, stats['monthly_wins'][month]) for name, stats in self.players.items()
+                       if stats['monthly_wins'].get(month, 0) > 0]
+            if leaders:
+                name, wins = max(leaders, key=lambda x: x[1])
+                summary['monthly_leaders'].append((month, name, wins))
+
+        for q, _ in QUARTERS:
+            entries = [(name, stats['quarter_avgs'][q]) for name, stats in self.players.items()
+                       if q in stats['quarter_avgs']]
+            if entries:
+                name, q_avg = max(entries, key=lambda x: x[1])
+                summary['quarter_leaders'].append((q, name, q_avg))
+
+        return summary
+
+
+def compute_seasons(rounds, years=None):
+    """
+    One pass over rounds (any order) -> {year: season summary}
+    years limits the output to those seasons (strings or ints)
+    """
+    wanted = {str(y) for y in years} if years else None
+    accumulators = {}
+    for round_data in sorted(rounds, key=round_sort_key):
+        year = round_data['date'][:4]
+        if wanted is not None and year not in wanted:
+            continue
+        acc = accumulators.get(year)
+        if acc is None:
+            acc = accumulators[year] = SeasonAccumulator(year)
+        acc.add_round(round_data)
+    return {year: acc.finalize() for year, acc in sorted(accumulators.items())}
+
+
+def compute_season(rounds, year):
+    """Season summary for one year (None if no rounds)"""
+    return compute_seasons(rounds, [year]).get(str(year))
+
+
+def fetch_season_rounds(table, group_id, years):
+    """Rounds for the given seasons, one Query per season prefix"""
+    rounds = []
+    for year in years:
+        rounds.extend(query_rounds(table, group_id, prefix=str(year)))
+    return rounds
+
+
+def _standing_block(medal, name, stats):
+    return (f"{medal} {get_display_name(name)}\n"
+            f"   Average:  {stats['avg']:.2f} pts\n"
+            f"   Rounds:   {stats['rounds_count']}\n"
+            f"   Total:    {stats['total_points']} pts\n"
+            f"   Best:     {stats['best_score']} pts\n"
+            f"   Wins:     {stats['winning_rounds']} ({stats['win_rate']:.1f}%)\n"
+            f"   Podiums:  {stats['podium_finishes']}\n")
+
+
+def render_report(summary):
+    """WhatsApp-formatted season review (everything before AI commentary and footer)"""
+    year = summary['year']
+    standings = summary['standings']
+    most_consistent = summary['most_consistent']
+    best_streaker = summary['best_streaker']
+    most_wins = summary['most_wins']
+
+    podium = "\n".join(
+        _standing_block(medal, name, stats)
+        for medal, (name, stats) in zip(['🥇', '🥈', '🥉'], standings)
+    )
+
+    report = f"""⛳ *{year} SEASON REVIEW*
+━ *WARRINGAH GC* ━
+
+*📊 SEASON OVERVIEW*
+```
+Total Rounds: {summary['total_rounds']}
+Qualified Players: {len(standings)}
+Season: Jan - Dec {year}
+```
+
+*🏅 FINAL STANDINGS*
+```
+{podium}```
+
+*🎯 CONSISTENCY AWARD*
+```
+{get_display_name(most_consistent[0])}
+Std Dev: {most_consistent[1]['std_dev']:.2f}
+```
+
+*🔥 HOT STREAK AWARD*
+```
+{get_display_name(best_streaker[0])}
+{best_streaker[1]['best_improving_streak']} consecutive improving rounds
+```
+
+*🏆 MOST ROUND WINS*
+```
+{get_display_name(most_wins[0])}
+{most_wins[1]['winning_rounds']} victories ({most_wins[1]['win_rate']:.1f}% win rate)
+```
+
+*📅 MONTHLY DOMINANCE*
+```
+"""
+
+    for month, name, wins in summary['monthly_leaders']:
+        winner_first_name = get_display_name(name).split()[0]
+        report += f"{month[:3]}: {winner_first_name} ({wins} wins)\n"
+
+    report += "```\n\n*🎲 SEASON HIGHLIGHTS*\n```\n"
+
+    # Highest single round
+    name, best_round = summary['highest_round']
+    report += f"🌟 Best Round:\n"
+    report += f"   {get_display_name(name)}\n"
+    report += f"   {best_round['points']} pts on {best_round['date'].strftime('%b %d')}\n\n"
+
+    # Most rounds played
+    most_active = summary['most_active']
+    report += f"💪 Most Active:\n"
+    report += f"   {get_display_name(most_active[0])}\n"
+    report += f"   {most_active[1]['rounds_count']} rounds played\n\n"
+
+    # Biggest improvement
+    most_improved = summary['most_improved']
+    if most_improved and most_improved[1]['improvement'] > 0:
+        report += f"📈 Most Improved:\n"
+        report += f"   {get_display_name(most_improved[0])}\n"
+        report += f"   +{most_improved[1]['improvement']:.1f} pts improvement\n"
+
+    report += "```\n\n"
+    return report
+
+
+def render_footer(year):
+    """Sign-off block for the season review"""
+    report = f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+    report += f"*THANK YOU FOR AN AMAZING*\n"
+    report += f"*{year} SEASON! 🏆*\n"
+    report += f"*SEE YOU IN {int(year)+1}! ⛳*\n"
+    report += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+    return report
@@ -0,0 +1,8 @@
+"""
+Shared setup for the unit tests: modules are imported from src/ by bare name, as the Lambda does
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-southeast-2')
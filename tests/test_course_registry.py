@@ -0,0 +1,20 @@
+"""
+Shared per-hole Stableford: one definition for the Lambda, predictor, head-to-head and scripts
+"""
+import numpy as np
+
+from course_registry import get_nine, net_stableford, stableford_points, strokes_for
+
+BACK_9 = get_nine('back9')
+
+
+def test_stableford_points_per_hole():
+    # Par 5, 4, 3 ... with a stroke on SI <= 9 (holes 10, 11, 15, 18)
+    strokes = strokes_for(BACK_9, 9)
+    scores = [4, 5, 6, 0, 3, 6, 4, None, 2]
+    assert stableford_points(scores, BACK_9['pars'], strokes) == [4, 2, 0, 0, 2, 1, 2, 0, 4]
+
+
+def test_net_stableford_caps():
+    assert [net_stableford(n) for n in (-4, -2, -1, 0, 1, 2, 7)] == [4, 4, 3, 2, 1, 0, 0]
+    assert net_stableford(np.array([-3, 0, 5])).tolist() == [4, 2, 0]
@@ -0,0 +1,62 @@
+"""
+Form guide: the numpy matrix path and the per-player RollingForm path give the same form
+"""
+import random
+
+import pytest
+
+import form_guide
+from form_guide import form_series, summarize_form, summarize_forms
+
+
+def history(seed=7):
+    rng = random.Random(seed)
+    # Field sizes from a single round (no slope) to longer than every window
+    lengths = {'Andy': 1, 'Bruce': 2, 'Steve': 3, 'Dave': 12, 'Mick': 27}
+    rounds = []
+    for day in range(max(lengths.values())):
+        date = f"2026-{1 + day // 28:02d}-{1 + day % 28:02d}"
+        players = [{'name': name, 'stableford': rng.randint(4, 24)}
+                   for name, n in lengths.items() if day >= max(lengths.values()) - n]
+        rounds.append({'date': date, 'course': 'back9', 'players': players})
+    return rounds
+
+
+def assert_same(numpy_value, rolling_value, path='form'):
+    if isinstance(rolling_value, dict):
+        assert numpy_value.keys() == rolling_value.keys(), path
+        for key in rolling_value:
+            assert_same(numpy_value[key], rolling_value[key], f"{path}[{key!r}]")
+    elif isinstance(rolling_value, list):
+        assert len(numpy_value) == len(rolling_value), path
+        for i, (a, b) in enumerate(zip(numpy_value, rolling_value)):
+            assert_same(a, b, f"{path}[{i}]")
+    elif isinstance(rolling_value, float):
+        # Series values are rounded to 2-3 places, where the two paths may round a tie differently
+        assert numpy_value == pytest.approx(rolling_value, abs=1e-3), path
+    else:
+        assert numpy_value == rolling_value, path
+
+
+def both_paths(monkeypatch, compute):
+    with_numpy = compute()
+    monkeypatch.setattr(form_guide, 'NUMPY_ENABLED', False)
+    return with_numpy, compute()
+
+
+def test_summarize_forms_paths_agree(monkeypatch):
+    points = {name: [p for _, p in entries] for name, entries in form_guide.player_scores(history()).items()}
+    with_numpy, rolling = both_paths(monkeypatch, lambda: summarize_forms(points))
+    assert_same(with_numpy, rolling)
+    assert rolling['Andy']['slope'] is None and rolling['Steve']['slope'] is not None
+
+
+def test_form_series_paths_agree(monkeypatch):
+    with_numpy, rolling = both_paths(monkeypatch, lambda: form_series(history()))
+    assert_same(with_numpy, rolling)
+    assert len(rolling['Mick']['dates']) == 27
+
+
+def test_summarize_forms_matches_single_player():
+    points = [18, 12, 20, 15, 22, 9, 17]
+    assert_same(summarize_forms({'Andy': points})['Andy'], summarize_form(points))
@@ -0,0 +1,92 @@
+"""
+What-if simulator: bad cards are rejected and a short window has no index
+"""
+from datetime import datetime
+
+import pytest
+
+from handicap_window import build_windows, simulate
+
+AS_OF = datetime(2026, 3, 1)
+
+
+def windows_for(grosses):
+    rounds = [{
+        'date': f"2026-02-{day:02d}",
+        'course': 'back9',
+        'round_key': f"2026-02-{day:02d}#back9",
+        'players': [{'name': 'Steve', 'gross': gross, 'index': 15.0, 'stableford': 15}],
+    } for day, gross in enumerate(grosses, 1)]
+    return build_windows(rounds)
+
+
+@pytest.mark.parametrize('card', [
+    [4, 5, -3, 4, 5, 4, 4, 4, 4],
+    [4, 5, 99, 4, 5, 4, 4, 4, 4],
+    [4, 5, 4],
+])
+def test_bad_card_rejected(card):
+    with pytest.raises(ValueError):
+        simulate(windows_for([45] * 5), 'Steve', cards=[card], as_of=AS_OF)
+
+
+def test_absurd_gross_rejected():
+    with pytest.raises(ValueError):
+        simulate(windows_for([45] * 5), 'Steve', scores=[5], as_of=AS_OF)
+
+
+def test_too_few_rounds_has_no_index():
+    result = simulate(windows_for([45]), 'Steve', scores=[44], as_of=AS_OF)
+    assert result['current'] == {'index': None, 'capped_index': None, 'ch': None}
+    assert result['after']['index'] is None
+    assert result['target']['gross_needed'] is None
+
+
+def test_third_round_gives_an_index():
+    result = simulate(windows_for([45, 46]), 'Steve', cards=[[5] * 9], as_of=AS_OF)
+    assert result['current']['index'] is None
+    assert result['steps'][0]['gross'] == 45
+    assert result['after']['index'] is not None
+
+
+def test_concurrent_updates_keep_both_rounds():
+    import handicap_window
+    from handicap_window import WINDOWS_KEY, get_windows, rebuild_windows, update_windows
+    from rounds_table import DEFAULT_GROUP_ID
+    from synthetic_history import LocalTable
+
+    history = [{
+        'group_id': DEFAULT_GROUP_ID,
+        'date': f"2026-02-{day:02d}",
+        'course': 'back9',
+        'round_key': f"2026-02-{day:02d}#back9",
+        'players': [{'name': 'Steve', 'gross': 45, 'index': 15.0, 'stableford': 15},
+                    {'name': 'Andy', 'gross': 47, 'index': 18.0, 'stableford': 14}],
+    } for day in range(1, 6)]
+    table = LocalTable(history)
+    rebuild_windows(table)
+
+    def saved(day, name, gross):
+        return {'date': f"2026-03-{day:02d}", 'course': 'back9', 'round_key': f"2026-03-{day:02d}#back9",
+                'players': [{'name': name, 'gross': gross, 'index': 15.0, 'stableford': 15}]}
+
+    # Another add_round commits between this one's read and its write
+    read_item = table.get_item
+    interleaved = []
+
+    def get_item(Key, **kwargs):
+        response = read_item(Key=Key, **kwargs)
+        if Key['round_key'] == WINDOWS_KEY and 'ProjectionExpression' not in kwargs and not interleaved:
+            interleaved.append(True)
+            update_windows(table, [saved(7, 'Andy', 40)])
+        return response
+
+    table.get_item = get_item
+    update_windows(table, [saved(7, 'Steve', 41)])
+    table.get_item = read_item
+
+    handicap_window._warm_windows.clear()
+    windows = get_windows(table)
+    assert len(windows['players']['Steve']['differentials']) == 6
+    assert len(windows['players']['Andy']['differentials']) == 6
+    assert windows['version'] == 3
@@ -0,0 +1,143 @@
+"""
+Head-to-head matrix: pair records, match play, lookup from either side and versioned season writes
+"""
+from head_to_head import (H2H_PREFIX, apply_round, build_matrix, get_season, load_season, lookup, pair_key,
+                          rebuild_season, season_key, update_head_to_head)
+from rounds_table import DEFAULT_GROUP_ID
+from synthetic_history import LocalTable
+
+PARS = [5, 4, 3, 4, 3, 4, 4, 3, 4]
+
+
+def player(name, stableford, hole_scores=None):
+    # Index 0: no strokes, so net points per hole are gross points
+    entry = {'name': name, 'stableford': stableford, 'index': 0}
+    if hole_scores:
+        entry['hole_scores'] = hole_scores
+    return entry
+
+
+def round_item(date, *players, course='back9'):
+    return {
+        'group_id': DEFAULT_GROUP_ID,
+        'date': date,
+        'course': course,
+        'round_key': f"{date}#{course}",
+        'players': list(players),
+    }
+
+
+HISTORY = [
+    round_item('2026-02-07', player('Bruce', 15), player('Andy', 20), player('Steve', 12)),
+    round_item('2026-02-14', player('Andy', 18), player('Bruce', 18)),
+    round_item('2026-02-21', player('Bruce', 22), player('Steve', 14)),
+]
+
+
+def test_pair_records_are_from_the_first_name_side():
+    season = build_matrix(HISTORY)['2026']
+    assert set(season['pairs']) == {'Andy|Bruce', 'Andy|Steve', 'Bruce|Steve'}
+    andy_bruce = season['pairs']['Andy|Bruce']
+    assert (andy_bruce['rounds'], andy_bruce['wins'], andy_bruce['losses'], andy_bruce['ties']) == (2, 1, 0, 1)
+    assert andy_bruce['margin'] == 5
+    assert season['pairs']['Bruce|Steve']['wins'] == 2
+    # No hole_scores: no match play
+    assert andy_bruce['match_rounds'] == 0
+
+
+def test_round_is_applied_once():
+    season = build_matrix(HISTORY)['2026']
+    assert not apply_round(season, HISTORY[0])
+    assert season['pairs']['Andy|Bruce']['rounds'] == 2
+
+
+def test_seasons_are_kept_apart():
+    seasons = build_matrix(HISTORY + [round_item('2025-11-01', player('Andy', 10), player('Bruce', 30))])
+    assert seasons['2025']['pairs']['Andy|Bruce']['losses'] == 1
+    assert seasons['2026']['pairs']['Andy|Bruce']['losses'] == 0
+
+
+def test_match_play_from_hole_scores():
+    andy = list(PARS)  # 2 points a hole
+    bruce = [par + 1 for par in PARS]  # 1 point a hole...
+    bruce[0] = 3  # ...but an eagle on the par 5
+    bruce[1] = 4  # and a halved par 4
+    season = build_matrix([round_item('2026-03-07', player('Andy', 18), player('Bruce', 12, bruce)),
+                           round_item('2026-03-14', player('Andy', 18, andy), player('Bruce', 12, bruce))])['2026']
+    record = season['pairs']['Andy|Bruce']
+    assert record['rounds'] == 2 and record['match_rounds'] == 1
+    assert (record['holes_won'], record['holes_lost'], record['holes_halved']) == (7, 1, 1)
+    assert (record['matches_won'], record['matches_lost'], record['matches_halved']) == (1, 0, 0)
+
+
+def test_lookup_flips_for_the_second_name():
+    season = build_matrix(HISTORY)['2026']
+    andy = lookup(season, 'Andy', 'Bruce')
+    bruce = lookup(season, 'Bruce', 'Andy')
+    assert (andy['wins'], andy['losses'], andy['margin']) == (1, 0, 5)
+    assert (bruce['wins'], bruce['losses'], bruce['margin']) == (0, 1, -5)
+    assert bruce['player'] == 'Bruce' and bruce['opponent'] == 'Andy'
+    assert bruce['avg_margin'] == -2.5
+    assert pair_key('Bruce', 'Andy') == pair_key('Andy', 'Bruce')
+
+
+def test_lookup_of_strangers_is_none():
+    assert lookup(build_matrix(HISTORY)['2026'], 'Andy', 'Nobody') is None
+
+
+def test_rebuild_stores_a_versioned_season():
+    table = LocalTable(HISTORY)
+    rebuild_season(table, 2026)
+    stored = load_season(table, '2026')
+    assert stored['version'] == 1
+    assert stored['applied_rounds'] == {r['round_key'] for r in HISTORY}
+    assert stored['pairs'] == build_matrix(HISTORY)['2026']['pairs']
+    rebuild_season(table, 2026)
+    assert load_season(table, '2026')['version'] == 2
+
+
+def test_get_season_builds_on_first_use():
+    table = LocalTable(HISTORY)
+    assert load_season(table, '2026') is None
+    assert get_season(table, '2026')['pairs'] == build_matrix(HISTORY)['2026']['pairs']
+    assert table.get_item(Key={'group_id': DEFAULT_GROUP_ID, 'round_key': season_key('2026')}).get('Item')
+    assert season_key('2026') == f"{H2H_PREFIX}2026"
+
+
+def test_update_folds_new_rounds_in():
+    table = LocalTable(HISTORY[:2])
+    rebuild_season(table, '2026')
+    table.put_item(Item=HISTORY[2])
+    update_head_to_head(table, [HISTORY[2]])
+    stored = load_season(table, '2026')
+    assert stored['version'] == 2
+    assert stored['pairs'] == build_matrix(HISTORY)['2026']['pairs']
+    # Applying the same round again writes nothing
+    update_head_to_head(table, [HISTORY[2]])
+    assert load_season(table, '2026')['version'] == 2
+
+
+def test_concurrent_updates_keep_both_rounds():
+    table = LocalTable(HISTORY[:2])
+    rebuild_season(table, '2026')
+    late = round_item('2026-02-21', player('Andy', 25), player('Steve', 5), course='front9')
+
+    # Another add_round commits between this one's read and its write
+    read_item = table.get_item
+
+    def get_item(Key, **kwargs):
+        response = read_item(Key=Key, **kwargs)
+        if Key['round_key'] == season_key('2026'):
+            table.get_item = read_item
+            table.put_item(Item=HISTORY[2])
+            update_head_to_head(table, [HISTORY[2]])
+        return response
+
+    table.get_item = get_item
+    table.put_item(Item=late)
+    update_head_to_head(table, [late])
+
+    stored = load_season(table, '2026')
+    assert stored['version'] == 3
+    assert stored['applied_rounds'] == {r['round_key'] for r in HISTORY + [late]}
+    assert stored['pairs'] == build_matrix(HISTORY + [late])['2026']['pairs']
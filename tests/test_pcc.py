@@ -0,0 +1,82 @@
+"""
+Playing Conditions Calculation: a hard day (positive PCC) must lower differentials
+"""
+from course_registry import get_nine
+from handicap_window import differential
+from pcc import PCC_START_DATE, compute_pcc
+from season_index import SeasonIndex
+
+BACK_9 = get_nine('back9')
+HARD_DAY = '2026-03-07'
+
+
+def field_round(date, gross, pcc=None):
+    round_data = {
+        'date': date,
+        'course': 'back9',
+        'round_key': f"{date}#back9",
+        'players': [{'name': f"Player {i}", 'gross': gross, 'index': 10.0, 'stableford': 15} for i in range(5)],
+    }
+    if pcc is not None:
+        round_data['pcc'] = pcc
+    return round_data
+
+
+def test_positive_pcc_lowers_differential():
+    assert differential(50, BACK_9, pcc=2) < differential(50, BACK_9)
+    assert differential(50, BACK_9, pcc=-1) > differential(50, BACK_9)
+
+
+def test_pcc_matches_whs_formula():
+    # 113 / Slope x (AGS - CR - PCC) on the 18-hole equivalent
+    expected = round((50 * 2 - BACK_9['rating'] * 2 - 2) * 113 / BACK_9['slope'], 1)
+    assert differential(50, BACK_9, pcc=2) == expected
+
+
+def test_hard_day_gets_positive_pcc():
+    normal = [field_round(f"2026-02-{day:02d}", 45) for day in range(1, 22)]
+    hard = field_round(HARD_DAY, 60)
+    pccs = compute_pcc(normal + [hard])
+    assert HARD_DAY > PCC_START_DATE
+    assert pccs[hard['round_key']] > 0
+
+
+def test_lambda_index_subtracts_pcc():
+    from lambda_function import calculate_player_handicap_index
+
+    # Low scores, so the index stays clear of the LHI caps
+    rounds = [{'date': f"2026-02-{day:02d}", 'gross': 36} for day in range(1, 9)]
+    hard = [dict(r, pcc=3) for r in rounds]
+    plain = calculate_player_handicap_index(rounds, BACK_9['slope'], BACK_9['rating'])
+    adjusted = calculate_player_handicap_index(hard, BACK_9['slope'], BACK_9['rating'])
+    assert adjusted < plain
+
+
+def test_season_index_subtracts_pcc():
+    rounds = [field_round(f"2026-02-{day:02d}", 48) for day in range(1, 9)]
+    hard = [dict(r, pcc=3) for r in rounds]
+    plain = SeasonIndex(rounds, BACK_9['slope'], BACK_9['rating'])
+    adjusted = SeasonIndex(hard, BACK_9['slope'], BACK_9['rating'])
+    assert (adjusted.season_to_date('Player 0', 2026, 59)['handicap_index']
+            < plain.season_to_date('Player 0', 2026, 59)['handicap_index'])
+
+
+def test_add_round_pcc_leaves_earlier_rounds_alone():
+    from pcc import backfill_pcc, update_pcc
+    from rounds_table import DEFAULT_GROUP_ID
+    from synthetic_history import LocalTable
+
+    history = [field_round(f"2026-02-{day:02d}", 45) for day in range(1, 22)]
+    table = LocalTable({'group_id': DEFAULT_GROUP_ID, **r} for r in history)
+    backfill_pcc(table)
+    before = {item['round_key']: item.get('pcc') for item in table._items.values()}
+
+    # A run of hard days would move a recalibrated median; add_round must not
+    for day in range(1, 8):
+        hard = field_round(f"2026-03-{day:02d}", 60)
+        table.put_item(Item={'group_id': DEFAULT_GROUP_ID, **hard})
+        assert update_pcc(table, [hard]) == [hard['round_key']]
+        assert hard['pcc'] > 0
+
+    after = {key: item.get('pcc') for key, item in table._items.items() if key[1] in before}
+    assert {key[1]: value for key, value in after.items()} == before
@@ -0,0 +1,105 @@
+"""
+Player ratings: the Elo update, incremental add_round updates and the replay fallbacks
+"""
+import pytest
+
+from ratings import (INITIAL_RATING, K_PROVISIONAL, RATINGS_KEY, apply_round, load_ratings, new_state,
+                     replay_ratings, update_ratings)
+from rounds_table import DEFAULT_GROUP_ID
+from synthetic_history import LocalTable
+
+
+def round_item(date, points, course='back9'):
+    return {
+        'group_id': DEFAULT_GROUP_ID,
+        'date': date,
+        'course': course,
+        'round_key': f"{date}#{course}",
+        'players': [{'name': name, 'stableford': stableford} for name, stableford in points.items()],
+    }
+
+
+HISTORY = [
+    round_item('2026-02-07', {'Andy': 20, 'Bruce': 15, 'Steve': 12}),
+    round_item('2026-02-14', {'Andy': 18, 'Bruce': 18, 'Steve': 10}),
+    round_item('2026-02-21', {'Bruce': 22, 'Steve': 14}),
+]
+
+
+def ratings_of(state):
+    # Stored ratings are rounded to 2 places, and incremental updates continue from them
+    return {name: pytest.approx(p['rating'], abs=0.05) for name, p in state['players'].items()}
+
+
+def test_winner_takes_from_loser():
+    state = new_state()
+    changes = apply_round(state, round_item('2026-02-07', {'Andy': 20, 'Bruce': 15}))
+    assert changes == {'Andy': K_PROVISIONAL / 2, 'Bruce': -K_PROVISIONAL / 2}
+    assert state['players']['Andy']['rating'] == INITIAL_RATING + K_PROVISIONAL / 2
+
+
+def test_tie_between_equals_changes_nothing():
+    state = new_state()
+    assert apply_round(state, round_item('2026-02-07', {'Andy': 18, 'Bruce': 18})) == {'Andy': 0, 'Bruce': 0}
+
+
+def test_solo_round_counts_but_rates_nobody():
+    state = new_state()
+    assert apply_round(state, round_item('2026-02-07', {'Andy': 18})) == {}
+    assert state['rounds_applied'] == 1 and state['players'] == {}
+
+
+def test_beating_a_stronger_field_gains_more():
+    state = new_state()
+    state['players'] = {
+        'Weak': {'rating': 1400.0, 'rounds': 20, 'change': 0.0},
+        'Strong': {'rating': 1600.0, 'rounds': 20, 'change': 0.0},
+    }
+    upset = apply_round(state, round_item('2026-02-07', {'Weak': 20, 'Strong': 15}))
+    assert upset['Weak'] > 10 > -upset['Strong'] - 10
+
+
+def test_incremental_updates_match_a_replay():
+    table = LocalTable(HISTORY[:1])
+    replay_ratings(table)
+    for round_data in HISTORY[1:]:
+        table.put_item(Item=round_data)
+        update_ratings(table, [round_data])
+    incremental = load_ratings(table)
+    assert incremental['rounds_applied'] == len(HISTORY)
+    assert ratings_of(incremental) == ratings_of(replay_ratings(LocalTable(HISTORY)))
+
+
+def test_back_dated_round_replays():
+    table = LocalTable(HISTORY[1:])
+    replay_ratings(table)
+    table.put_item(Item=HISTORY[0])
+    state = update_ratings(table, [HISTORY[0]])
+    assert state['last_round_key'] == HISTORY[-1]['round_key']
+    assert ratings_of(state) == ratings_of(replay_ratings(LocalTable(HISTORY)))
+
+
+def test_lost_conditional_put_replays():
+    table = LocalTable(HISTORY[:2])
+    replay_ratings(table)
+    late = round_item('2026-02-21', {'Andy': 25, 'Steve': 5}, course='front9')
+
+    # Another add_round stores its rounds between this update's read and write
+    read_item = table.get_item
+
+    def get_item(Key, **kwargs):
+        response = read_item(Key=Key, **kwargs)
+        if Key['round_key'] == RATINGS_KEY:
+            table.get_item = read_item
+            table.put_item(Item=HISTORY[2])
+            update_ratings(table, [HISTORY[2]])
+        return response
+
+    table.get_item = get_item
+    table.put_item(Item=late)
+    state = update_ratings(table, [late])
+
+    stored = load_ratings(table)
+    assert stored['rounds_applied'] == 4
+    assert ratings_of(stored) == ratings_of(state)
+    assert ratings_of(stored) == ratings_of(replay_ratings(LocalTable(HISTORY + [late])))
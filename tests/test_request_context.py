@@ -0,0 +1,33 @@
+"""
+Request context: lookups run once per key, failed or empty results are retried
+"""
+from request_context import RequestContext
+
+
+def test_lookup_memoizes_per_key():
+    ctx = RequestContext()
+    calls = []
+
+    def fetch(value):
+        calls.append(value)
+        return {'value': value}
+
+    assert ctx.lookup('scorecard', 'a', fetch, 1) == {'value': 1}
+    assert ctx.lookup('scorecard', 'a', fetch, 2) == {'value': 1}
+    assert ctx.lookup('scorecard', 'b', fetch, 3) == {'value': 3}
+    assert calls == [1, 3]
+    assert ctx.stats() == {'scorecard': {'calls': 2, 'hits': 1}}
+
+
+def test_empty_result_is_retried():
+    ctx = RequestContext()
+    results = iter([{}, None, {'Steve': [4, 5]}])
+
+    def scrape(timeout):
+        return next(results)
+
+    assert ctx.lookup('scorecard', 'url', scrape, timeout=10) == {}
+    assert ctx.lookup('scorecard', 'url', scrape, timeout=15) is None
+    assert ctx.lookup('scorecard', 'url', scrape, timeout=15) == {'Steve': [4, 5]}
+    assert ctx.lookup('scorecard', 'url', scrape, timeout=15) == {'Steve': [4, 5]}
+    assert ctx.calls['scorecard'] == 3
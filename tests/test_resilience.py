@@ -0,0 +1,135 @@
+"""
+Circuit breakers and token buckets on a fake clock: open, half-open, reset and rate-limit waits
+"""
+import pytest
+
+import rate_limit
+import resilience
+from rate_limit import TokenBucket
+from resilience import FAILURE_THRESHOLD, RESET_TIMEOUT, CallRejected
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances the clock instead of blocking"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    time = perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, 'time', fake)
+    monkeypatch.setattr(resilience, 'time', fake)
+    monkeypatch.setattr(resilience, '_guards', {})
+    return fake
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+def test_bucket_bursts_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+    assert bucket.acquire()
+    assert clock.slept == [0.5]
+
+
+def test_bucket_refill_is_capped(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 60
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+
+
+def test_bucket_gives_up_past_timeout(clock):
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.acquire()
+    assert not bucket.acquire(timeout=5)
+    assert clock.slept == []
+    assert bucket.acquire(timeout=10)
+    assert clock.slept == [pytest.approx(10)]
+
+
+def test_breaker_opens_after_threshold(clock):
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            resilience.call('flaky.example', fail)
+    with pytest.raises(CallRejected, match='circuit open'):
+        resilience.call('flaky.example', lambda: 'ok')
+    stats = resilience.stats()['flaky.example']
+    assert stats['state'] == 'open'
+    assert stats['failure'] == FAILURE_THRESHOLD and stats['rejected_open'] == 1
+
+
+def test_half_open_trial_success_closes(clock):
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            resilience.call('flaky.example', fail)
+    clock.now += RESET_TIMEOUT
+    assert resilience.call('flaky.example', lambda: 'ok') == 'ok'
+    assert resilience.stats()['flaky.example']['state'] == 'closed'
+    # A single failure after the reset does not reopen it
+    with pytest.raises(ConnectionError):
+        resilience.call('flaky.example', fail)
+    assert resilience.call('flaky.example', lambda: 'ok') == 'ok'
+
+
+def test_half_open_trial_failure_reopens(clock):
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            resilience.call('flaky.example', fail)
+    clock.now += RESET_TIMEOUT
+    with pytest.raises(ConnectionError):
+        resilience.call('flaky.example', fail)
+    assert resilience.stats()['flaky.example']['state'] == 'open'
+    clock.now += RESET_TIMEOUT - 1
+    with pytest.raises(CallRejected):
+        resilience.call('flaky.example', lambda: 'ok')
+
+
+def test_half_open_lets_one_trial_through(clock):
+    guard = resilience.guard_for('flaky.example')
+    for _ in range(FAILURE_THRESHOLD):
+        guard.record(False, 10)
+    clock.now += RESET_TIMEOUT
+    guard.before_call()
+    with pytest.raises(CallRejected, match='half-open'):
+        guard.before_call()
+
+
+def test_rate_limit_waits_then_rejects_past_rate_wait(clock, monkeypatch):
+    monkeypatch.setitem(resilience.HOST_LIMITS, 'slow.example', {'rate': 0.1, 'capacity': 1})
+    assert resilience.call('slow.example', lambda: 'first') == 'first'
+    # The next token is 10 s away
+    with pytest.raises(CallRejected, match='rate limit wait over 5s'):
+        resilience.call('slow.example', lambda: 'second')
+    assert clock.slept == []
+    assert resilience.call('slow.example', lambda: 'second', rate_wait=15) == 'second'
+    assert clock.slept == [pytest.approx(10)]
+    assert resilience.stats()['slow.example']['rejected_rate'] == 1
+
+
+def test_get_counts_server_errors_as_failures(clock, monkeypatch):
+    class Response:
+        status_code = 503
+
+    monkeypatch.setattr(resilience.requests, 'get', lambda url, **kwargs: Response())
+    for _ in range(FAILURE_THRESHOLD):
+        assert resilience.get('https://down.example/page').status_code == 503
+    with pytest.raises(CallRejected):
+        resilience.get('https://down.example/page')
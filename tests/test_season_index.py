@@ -0,0 +1,32 @@
+"""
+Warm season index: one cached build per group, rebuilt only when that group's rounds change
+"""
+from course_registry import get_nine
+from season_index import get_season_index
+
+BACK_9 = get_nine('back9')
+
+
+def group_rounds(gross):
+    return [{
+        'date': f"2026-02-{day:02d}",
+        'course': 'back9',
+        'round_key': f"2026-02-{day:02d}#back9",
+        'players': [{'name': 'Steve', 'gross': gross, 'index': 15.0, 'stableford': 15}],
+    } for day in range(1, 8)]
+
+
+def test_groups_do_not_evict_each_other():
+    first, second = group_rounds(45), group_rounds(50)
+    a = get_season_index(first, BACK_9['slope'], BACK_9['rating'], 'group-a')
+    b = get_season_index(second, BACK_9['slope'], BACK_9['rating'], 'group-b')
+    assert a is not b
+    assert get_season_index(first, BACK_9['slope'], BACK_9['rating'], 'group-a') is a
+    assert get_season_index(second, BACK_9['slope'], BACK_9['rating'], 'group-b') is b
+
+
+def test_changed_rounds_rebuild():
+    rounds = group_rounds(45)
+    a = get_season_index(rounds, BACK_9['slope'], BACK_9['rating'], 'group-c')
+    rounds[-1]['players'][0]['stableford'] = 20
+    assert get_season_index(rounds, BACK_9['slope'], BACK_9['rating'], 'group-c') is not a